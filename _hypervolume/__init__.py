@@ -11,4 +11,211 @@
 #    GNU Lesser General Public License for more details.
 #
 #    You should have received a copy of the GNU Lesser General Public
-#    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
\ No newline at end of file
+#    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+"""Hypervolume engines. The compiled :mod:`hv` extension (``fpli_hv``) is
+used when it can be imported, otherwise the pure python :mod:`pyhv` version
+is used. The Monte Carlo estimation of :mod:`approx` can be selected for
+many objectives. The active engine is reported by :data:`backend`. The
+exclusive contribution of every point is computed by :func:`contributions`,
+the one of a single point by :func:`contribution`.
+"""
+
+from multiprocessing import cpu_count
+
+try:
+    import numpy
+except ImportError:
+    numpy = False
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+_backends = {}
+
+try:
+    # try importing the C version
+    from _hypervolume import hv as _c_hv
+    _backends["c"] = _c_hv
+except ImportError:
+    pass
+
+#: Name of the engine used by :func:`hypervolume`, ``"c"``, ``"python"`` or
+#: ``"approx"``.
+backend = None
+
+#: Number of objectives from which the ``"approx"`` engine estimates the
+#: hypervolume, the exact engine is used for fewer objectives.
+APPROX_MIN_OBJECTIVES = 4
+
+
+def set_backend(name, **options):
+    """Select the engine used by :func:`hypervolume`, *name* is ``"c"``,
+    ``"python"`` or ``"approx"``. The *options* of the ``"approx"`` engine
+    are those of :func:`approx.configure`, e.g. ``error=0.01`` or
+    ``samples=100000``. Raises :class:`ValueError` if the engine is not
+    available or does not take options.
+    """
+    global backend
+    if name == "python" and name not in _backends:
+        # fallback on python version, imported only when needed since it
+        # warns about being slow
+        from _hypervolume import pyhv
+        _backends["python"] = pyhv
+    if name == "approx" and name not in _backends:
+        from _hypervolume import approx
+        _backends["approx"] = approx
+    if name not in _backends:
+        raise ValueError("Hypervolume backend %r is not available" % (name,))
+    if name == "approx":
+        _backends[name].configure(**options)
+    elif options:
+        raise ValueError("Hypervolume backend %r takes no options" % (name,))
+    backend = name
+
+
+def _exact_backend():
+    if "c" in _backends:
+        return "c"
+    if "python" not in _backends:
+        from _hypervolume import pyhv
+        _backends["python"] = pyhv
+    return "python"
+
+
+def hypervolume(pointset, ref):
+    """Return the hypervolume of *pointset* according to the reference point
+    *ref*, using the active engine. Minimization is implicitly assumed.
+
+    With the C engine a C-contiguous :class:`numpy.ndarray` of ``float64`` is
+    read in place, without copying it point by point. The ``"approx"``
+    engine uses the exact one below :data:`APPROX_MIN_OBJECTIVES` objectives.
+    """
+    name = backend
+    if name == "approx" and len(ref) < APPROX_MIN_OBJECTIVES:
+        name = _exact_backend()
+    if name == "c":
+        if numpy:
+            pointset = numpy.ascontiguousarray(pointset, dtype=numpy.float64)
+        return _backends["c"].hypervolume(pointset, ref)
+    return _backends[name].hypervolume(pointset, ref)
+
+
+def contributions(pointset, ref):
+    """Return the exclusive hypervolume contribution of every point of
+    *pointset* according to the reference point *ref*: the hypervolume lost
+    if the point is removed. Points which are not strictly better than *ref*
+    in every objective, weakly dominated points and copies of the same point
+    contribute 0. Minimization is implicitly assumed.
+
+    The contributions are always exact, whatever the active engine. The C
+    engine computes them in one pass, in O(n log n) for two and three
+    objectives and with one ``fpli_hv`` call per point otherwise. Without
+    it, the contribution of a point is the volume of its box minus the
+    hypervolume of the other points clipped to it. A :class:`numpy.ndarray`
+    is returned when numpy is available, a list otherwise.
+    """
+    if "c" in _backends:
+        if numpy:
+            pointset = numpy.ascontiguousarray(pointset, dtype=numpy.float64)
+            if pointset.size == 0:
+                return numpy.zeros(len(pointset))
+        elif not pointset:
+            return []
+        result = _backends["c"].contributions(pointset, ref)
+    else:
+        result = _contributions(pointset, ref)
+    return numpy.array(result, dtype=numpy.float64) if numpy else result
+
+
+def _contributions(pointset, ref):
+    points = [[float(v) for v in point] for point in pointset]
+    hypervolume = _backends[_exact_backend()].hypervolume
+    result = [0.0] * len(points)
+    for i, p in enumerate(points):
+        if not all(a < r for a, r in zip(p, ref)):
+            continue
+        others = []
+        for j, q in enumerate(points):
+            if j == i:
+                continue
+            if all(b <= a for a, b in zip(p, q)):
+                break
+            clipped = [max(a, b) for a, b in zip(p, q)]
+            if all(c < r for c, r in zip(clipped, ref)):
+                others.append(clipped)
+        else:
+            box = 1.0
+            for a, r in zip(p, ref):
+                box *= r - a
+            result[i] = box - hypervolume(others, ref) if others else box
+    return result
+
+
+def contribution(point, pointset, ref):
+    """Return the exclusive hypervolume contribution of *point* to *pointset*
+    according to the reference point *ref*: the hypervolume it adds to the
+    points. It is 0 if *point* is weakly dominated by one of them, a copy
+    included, or not strictly better than *ref* in every objective.
+    Minimization is implicitly assumed.
+
+    The contribution is always exact, whatever the active engine. The points
+    worse than *point* in one objective only bound the part of its box they
+    do not cover, the other points clipped to that part, usually a few, then
+    give the hypervolume to subtract: it takes O(n) and one small
+    hypervolume computation. The C engine reads a C-contiguous
+    :class:`numpy.ndarray` of ``float64`` in place.
+    """
+    if "c" in _backends:
+        if numpy:
+            pointset = numpy.ascontiguousarray(pointset, dtype=numpy.float64)
+            if pointset.ndim != 2:
+                pointset = pointset.reshape(-1, len(point))
+        return _backends["c"].contribution(point, pointset, ref)
+    return _contribution(point, pointset, ref)
+
+
+def _contribution(point, pointset, ref):
+    p = [float(v) for v in point]
+    upper = [float(r) for r in ref]
+    points = [[float(v) for v in q] for q in pointset]
+    for q in points:
+        worse = [k for k, (a, b) in enumerate(zip(q, p)) if a > b]
+        if not worse:
+            return 0.0
+        if len(worse) == 1:
+            upper[worse[0]] = min(upper[worse[0]], q[worse[0]])
+    if not all(a < u for a, u in zip(p, upper)):
+        return 0.0
+    clipped = []
+    for q in points:
+        c = [max(a, b) for a, b in zip(q, p)]
+        if all(a < u for a, u in zip(c, upper)):
+            clipped.append(c)
+    box = 1.0
+    for a, u in zip(p, upper):
+        box *= u - a
+    hypervolume = _backends[_exact_backend()].hypervolume
+    return box - hypervolume(clipped, upper) if clipped else box
+
+
+def hypervolume_many(fronts, ref, workers=None):
+    """Return the list of the hypervolumes of every point set in *fronts*
+    according to the same reference point *ref*. The C engine releases the
+    GIL while computing, so the fronts are spread over a pool of *workers*
+    threads (the number of CPUs by default). With the python engine they are
+    computed one after the other.
+    """
+    fronts = list(fronts)
+    if workers is None:
+        workers = cpu_count()
+    if (backend != "c" or ThreadPoolExecutor is None or workers < 2 or
+            len(fronts) < 2):
+        return [hypervolume(front, ref) for front in fronts]
+    with ThreadPoolExecutor(max_workers=min(workers, len(fronts))) as executor:
+        return list(executor.map(lambda front: hypervolume(front, ref), fronts))
+
+
+set_backend("c" if "c" in _backends else "python")
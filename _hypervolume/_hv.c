@@ -537,13 +537,23 @@ typedef struct dlnode {
 #endif
 } dlnode_t;
 
-static avl_tree_t *tree;
 #if VARIANT < 4
 int stop_dimension = 1; /* default: stop on dimension 2 */
 #else
 int stop_dimension = 2; /* default: stop on dimension 3 */
 #endif
 
+/*
+  State of one hypervolume computation. Every call of fpli_hv () owns its
+  context, so concurrent calls (e.g. from several threads) do not share
+  anything. stop_dimension is copied from the global default when the
+  computation starts.
+*/
+typedef struct hv_context {
+    avl_tree_t *tree;
+    int stop_dimension;
+} hv_context_t;
+
 static int compare_node(const void *p1, const void* p2)
 {
     const double x1 = *((*(const dlnode_t **)p1)->x);
@@ -643,11 +653,11 @@ static void free_cdllist(dlnode_t * head)
     free(head);
 }
 
-static void delete (dlnode_t *nodep, int dim, double * bound __variant3_only)
+static void delete (const hv_context_t *ctx, dlnode_t *nodep, int dim, double * bound __variant3_only)
 {
     int i;
 
-    for (i = stop_dimension; i < dim; i++) {
+    for (i = ctx->stop_dimension; i < dim; i++) {
         nodep->prev[i]->next[i] = nodep->next[i];
         nodep->next[i]->prev[i] = nodep->prev[i];
 #if VARIANT >= 3
@@ -658,22 +668,22 @@ static void delete (dlnode_t *nodep, int dim, double * bound __variant3_only)
 }
 
 #if VARIANT >= 2
-static void delete_dom (dlnode_t *nodep, int dim)
+static void delete_dom (const hv_context_t *ctx, dlnode_t *nodep, int dim)
 {
     int i;
 
-    for (i = stop_dimension; i < dim; i++) {
+    for (i = ctx->stop_dimension; i < dim; i++) {
         nodep->prev[i]->next[i] = nodep->next[i];
         nodep->next[i]->prev[i] = nodep->prev[i];
     }
 }
 #endif
 
-static void reinsert (dlnode_t *nodep, int dim, double * bound __variant3_only)
+static void reinsert (const hv_context_t *ctx, dlnode_t *nodep, int dim, double * bound __variant3_only)
 {
     int i;
 
-    for (i = stop_dimension; i < dim; i++) {
+    for (i = ctx->stop_dimension; i < dim; i++) {
         nodep->prev[i]->next[i] = nodep;
         nodep->next[i]->prev[i] = nodep;
 #if VARIANT >= 3
@@ -684,10 +694,10 @@ static void reinsert (dlnode_t *nodep, int dim, double * bound __variant3_only)
 }
 
 #if VARIANT >= 2
-static void reinsert_dom (dlnode_t *nodep, int dim)
+static void reinsert_dom (const hv_context_t *ctx, dlnode_t *nodep, int dim)
 {
     int i;
-    for (i = stop_dimension; i < dim; i++) {
+    for (i = ctx->stop_dimension; i < dim; i++) {
         dlnode_t *p = nodep->prev[i];
         p->next[i] = nodep;
         nodep->next[i]->prev[i] = nodep;
@@ -701,13 +711,15 @@ static void reinsert_dom (dlnode_t *nodep, int dim)
 #endif
 
 static double
-hv_recursive(dlnode_t *list, int dim, int c, const double * ref,
-             double * bound)
+hv_recursive(hv_context_t *ctx, dlnode_t *list, int dim, int c,
+             const double * ref, double * bound)
 {
+    avl_tree_t *tree = ctx->tree;
+
     /* ------------------------------------------------------
        General case for dimensions higher than stop_dimension
        ------------------------------------------------------ */
-    if ( dim > stop_dimension ) {
+    if ( dim > ctx->stop_dimension ) {
         dlnode_t *p0 = list;
         dlnode_t *p1 = list->prev[dim];
         double hyperv = 0;
@@ -733,18 +745,18 @@ hv_recursive(dlnode_t *list, int dim, int c, const double * ref,
             p0 = p1;
 #if VARIANT >=2
             if (p0->ignore >= dim)
-                delete_dom(p0, dim);
+                delete_dom(ctx, p0, dim);
             else
-                delete(p0, dim, bound);
+                delete(ctx, p0, dim, bound);
 #else
-            delete(p0, dim, bound);
+            delete(ctx, p0, dim, bound);
 #endif
             p1 = p0->prev[dim];
             c--;
         }
 
 #if VARIANT == 1
-        hypera = hv_recursive(list, dim-1, c, ref, bound);
+        hypera = hv_recursive(ctx, list, dim-1, c, ref, bound);
 
 #elif VARIANT == 2
         int i;
@@ -760,7 +772,7 @@ hv_recursive(dlnode_t *list, int dim, int c, const double * ref,
             if (p1->ignore >= dim)
                 p1->area[dim] = p1->prev[dim]->area[dim];
             else {
-                p1->area[dim] = hv_recursive(list, dim - 1, c, ref, bound);
+                p1->area[dim] = hv_recursive(ctx, list, dim - 1, c, ref, bound);
                 /* At this point, p1 is the point with the highest value in
                    dimension dim in the list, so if it is dominated in
                    dimension dim-1, so it is also dominated in dimension
@@ -787,18 +799,18 @@ hv_recursive(dlnode_t *list, int dim, int c, const double * ref,
             c++;
 #if VARIANT >= 2
             if (p0->ignore >= dim) {
-                reinsert_dom (p0, dim);
+                reinsert_dom (ctx, p0, dim);
                 p0->area[dim] = p1->area[dim];
             } else {
 #endif
-                reinsert (p0, dim, bound);
+                reinsert (ctx, p0, dim, bound);
 #if VARIANT >= 2
-                p0->area[dim] = hv_recursive (list, dim-1, c, ref, bound);
+                p0->area[dim] = hv_recursive (ctx, list, dim-1, c, ref, bound);
                 if (p0->ignore == (dim - 1))
                     p0->ignore = dim;
             }
 #elif VARIANT == 1
-            hypera = hv_recursive (list, dim-1, c, ref, NULL);
+            hypera = hv_recursive (ctx, list, dim-1, c, ref, NULL);
 #endif
             p1 = p0;
             p0 = p0->next[dim];
@@ -1455,6 +1467,7 @@ void reorder_list(dlnode_t *list, int d, int *order)
 
 double fpli_hv(double *data, int d, int n, const double *ref)
 {
+    hv_context_t ctx;
     dlnode_t *list;
     double hyperv;
     double * bound = NULL;
@@ -1465,8 +1478,9 @@ double fpli_hv(double *data, int d, int n, const double *ref)
     for (i = 0; i < d; i++) bound[i] = -DBL_MAX;
 #endif
 
-    tree  = avl_alloc_tree ((avl_compare_t) compare_tree_asc,
-                            (avl_freeitem_t) NULL);
+    ctx.stop_dimension = stop_dimension;
+    ctx.tree  = avl_alloc_tree ((avl_compare_t) compare_tree_asc,
+                                (avl_freeitem_t) NULL);
 
     list = setup_cdllist(data, d, n);
 
@@ -1479,11 +1493,11 @@ double fpli_hv(double *data, int d, int n, const double *ref)
         for (i = 0; i < d; i++)
             hyperv *= ref[i] - p->x[i];
     } else {
-        hyperv = hv_recursive(list, d-1, n, ref, bound);
+        hyperv = hv_recursive(&ctx, list, d-1, n, ref, bound);
     }
     /* Clean up.  */
     free_cdllist (list);
-    free (tree);  /* The nodes are freed by free_cdllist ().  */
+    free (ctx.tree);  /* The nodes are freed by free_cdllist ().  */
     free (bound); 
 
     return hyperv;
@@ -1495,6 +1509,7 @@ double fpli_hv(double *data, int d, int n, const double *ref)
 double fpli_hv_order(double *data, int d, int n, const double *ref, int *order,
                      double *order_time, double *hv_time)
 {
+    hv_context_t ctx;
     dlnode_t *list;
     double hyperv;
     double * bound = NULL;
@@ -1507,8 +1522,9 @@ double fpli_hv_order(double *data, int d, int n, const double *ref, int *order,
     for (i = 0; i < d; i++) bound[i] = -DBL_MAX;
 #endif
 
-    tree  = avl_alloc_tree ((avl_compare_t) compare_tree_asc,
-                            (avl_freeitem_t) NULL);
+    ctx.stop_dimension = stop_dimension;
+    ctx.tree  = avl_alloc_tree ((avl_compare_t) compare_tree_asc,
+                                (avl_freeitem_t) NULL);
 
     list = setup_cdllist(data, d, n);
 
@@ -1539,11 +1555,11 @@ double fpli_hv_order(double *data, int d, int n, const double *ref, int *order,
             for (i = 0; i < d; i++)
                 hyperv *= ref[i] - p->x[i];
         } else {
-            hyperv = hv_recursive(list, d-1, n, ref, bound);
+            hyperv = hv_recursive(&ctx, list, d-1, n, ref, bound);
         }
         /* Clean up.  */
         free_cdllist (list);
-        free (tree);  /* The nodes are freed by free_cdllist ().  */
+        free (ctx.tree);  /* The nodes are freed by free_cdllist ().  */
         free (bound);
         free (ref_ord);
 
@@ -43,6 +43,8 @@
 extern "C" {
 #endif
 
+/* Default dimension where the recursion stops, read when a computation
+   starts. fpli_hv () itself keeps no global state and is reentrant. */
 extern int stop_dimension;
 double fpli_hv(double *data, int d, int n, const double *ref);
 
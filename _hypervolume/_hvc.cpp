@@ -0,0 +1,393 @@
+/*
+ * This file is part of DEAP.
+ *
+ * DEAP is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of
+ * the License, or (at your option) any later version.
+ *
+ * DEAP is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+ */
+
+#include <algorithm>
+#include <map>
+#include <vector>
+
+#include "_hv.h"
+#include "_hvc.h"
+
+namespace {
+
+// Orders point indices lexicographically on the objectives taken in the
+// order of keys, so that a point comes after every point weakly dominating
+// it and identical points are next to each other
+struct Lexicographic {
+    const double *data;
+    int d;
+    std::vector<int> keys;
+
+    bool operator()(int a, int b) const {
+        for(size_t k = 0; k < keys.size(); ++k){
+            double va = data[a * d + keys[k]], vb = data[b * d + keys[k]];
+            if(va != vb)
+                return va < vb;
+        }
+        return a < b;
+    }
+};
+
+bool same(const double *data, int d, int a, int b){
+    for(int k = 0; k < d; ++k)
+        if(data[a * d + k] != data[b * d + k])
+            return false;
+    return true;
+}
+
+// Sorts the points inside the reference box and returns them without the
+// copies of identical points, whose contributions are marked as zero in
+// repeated
+std::vector<int> sortedDistinct(const double *data, int d, int n, const double *ref,
+                                const std::vector<int> &keys, std::vector<bool> &repeated){
+    std::vector<int> order;
+    for(int i = 0; i < n; ++i){
+        bool inside = true;
+        for(int k = 0; k < d && inside; ++k)
+            inside = data[i * d + k] < ref[k];
+        if(inside)
+            order.push_back(i);
+    }
+    Lexicographic less = {data, d, keys};
+    std::sort(order.begin(), order.end(), less);
+
+    std::vector<int> distinct;
+    for(size_t j = 0; j < order.size(); ++j){
+        if(!distinct.empty() && same(data, d, distinct.back(), order[j])){
+            repeated[distinct.back()] = true;
+            repeated[order[j]] = true;
+        } else {
+            distinct.push_back(order[j]);
+        }
+    }
+    return distinct;
+}
+
+void contributions2d(const double *data, int n, const double *ref, double *result){
+    std::vector<bool> repeated(n, false);
+    std::vector<int> keys(2);
+    keys[0] = 0; keys[1] = 1;
+    std::vector<int> order = sortedDistinct(data, 2, n, ref, keys, repeated);
+
+    // The points are sorted by increasing x: a point is on the staircase of
+    // the non-dominated points if its y is lower than those before it, and
+    // the points following it up to the next step are dominated by it. The
+    // contribution of a step is the rectangle between its neighbours minus
+    // the area of those of the points dominated by it alone, which are
+    // below the previous step.
+    double top = ref[1];
+    size_t j = 0;
+    while(j < order.size()){
+        int i = order[j];
+        size_t next = j + 1;
+        while(next < order.size() && data[order[next] * 2 + 1] >= data[i * 2 + 1])
+            ++next;
+        double right = next < order.size() ? data[order[next] * 2] : ref[0];
+        double area = (right - data[i * 2]) * (top - data[i * 2 + 1]);
+
+        // Staircase of the points dominated by this step alone, whose area
+        // is added up once the next point of the staircase is known
+        int last = -1;
+        for(size_t k = j + 1; k < next; ++k){
+            int q = order[k];
+            double y = data[q * 2 + 1];
+            if(y < top && (last < 0 || y < data[last * 2 + 1])){
+                if(last >= 0)
+                    area -= (data[q * 2] - data[last * 2]) * (top - data[last * 2 + 1]);
+                last = q;
+            }
+        }
+        if(last >= 0)
+            area -= (right - data[last * 2]) * (top - data[last * 2 + 1]);
+
+        if(!repeated[i])
+            result[i] = area;
+        top = data[i * 2 + 1];
+        j = next;
+    }
+}
+
+// Point of the 2-D staircase of the 3-D sweep, with the staircase of the
+// points it dominates alone in the (x, y) plane. The area of the rectangle
+// between its neighbours which is not dominated by those points is its
+// contribution to the slice, last changed at the height since. The area of
+// the staircase is the rectangle from its first point to (right, top) minus
+// the areas below its points, inner holding those of all but the last one.
+struct Step {
+    int index;
+    double right, top, since;
+    std::map<double, int> below;    // by x
+    double inner;
+};
+
+class Sweep3d {
+public:
+    Sweep3d(const double *data, const double *ref, double *contribution)
+        : data(data), ref(ref), contribution(contribution) {}
+
+    void add(int i){
+        double x = X(i), y = Y(i), z = Z(i);
+        Stairs::iterator it = stairs.upper_bound(x);
+        if(it != stairs.begin()){
+            Stairs::iterator left = it;
+            --left;
+            if(Y(left->second.index) <= y){
+                // Dominated in the plane by a step, it only changes the
+                // slice of that step if no other one dominates it
+                if(y < left->second.top)
+                    addBelow(left->second, i, z);
+                return;
+            }
+        }
+
+        // Steps dominated in the plane by the new point leave the staircase
+        // and make the staircase below it, their own one being dominated by
+        // two points from now on
+        Step step;
+        step.index = i;
+        step.right = ref[0];
+        step.top = ref[1];
+        step.since = z;
+        step.inner = 0.0;
+        it = stairs.lower_bound(x);
+        while(it != stairs.end() && Y(it->second.index) >= y){
+            grow(it->second, z);
+            insertBelow(step, step.below.end(), it->second.index);
+            stairs.erase(it++);
+        }
+
+        if(it != stairs.end()){
+            // The points below the right neighbour which are higher than
+            // the new point are dominated by it too
+            Step &right = it->second;
+            grow(right, z);
+            right.top = y;
+            while(!right.below.empty() && Y(right.below.begin()->second) >= y)
+                eraseBelow(right, right.below.begin());
+            step.right = X(right.index);
+        }
+        if(it != stairs.begin()){
+            // As are those below the left neighbour on its right
+            Stairs::iterator before = it;
+            --before;
+            Step &left = before->second;
+            grow(left, z);
+            left.right = x;
+            while(!left.below.empty() && (--left.below.end())->first >= x)
+                eraseBelow(left, --left.below.end());
+            step.top = Y(left.index);
+        }
+        stairs.insert(it, std::make_pair(x, step));
+    }
+
+    void finish(){
+        for(Stairs::iterator it = stairs.begin(); it != stairs.end(); ++it)
+            grow(it->second, ref[2]);
+    }
+
+private:
+    typedef std::map<double, Step> Stairs;
+    typedef std::map<double, int> Below;
+
+    const double *data, *ref;
+    double *contribution;
+    Stairs stairs;    // by x
+
+    double X(int i) const { return data[i * 3]; }
+    double Y(int i) const { return data[i * 3 + 1]; }
+    double Z(int i) const { return data[i * 3 + 2]; }
+
+    double area(const Step &step) const {
+        int i = step.index;
+        double box = (step.right - X(i)) * (step.top - Y(i));
+        if(step.below.empty())
+            return box;
+        int first = step.below.begin()->second, last = (--step.below.end())->second;
+        return box - (step.top * (step.right - X(first)) - step.inner -
+                      (step.right - X(last)) * Y(last));
+    }
+
+    void grow(Step &step, double z){
+        contribution[step.index] += area(step) * (z - step.since);
+        step.since = z;
+    }
+
+    // Area below the point a up to the x of the point b
+    double strip(int a, int b) const {
+        return (X(b) - X(a)) * Y(a);
+    }
+
+    void insertBelow(Step &step, Below::iterator next, int q){
+        if(next != step.below.begin()){
+            Below::iterator prev = next;
+            --prev;
+            if(next != step.below.end())
+                step.inner -= strip(prev->second, next->second);
+            step.inner += strip(prev->second, q);
+        }
+        if(next != step.below.end())
+            step.inner += strip(q, next->second);
+        step.below.insert(next, std::make_pair(X(q), q));
+    }
+
+    void eraseBelow(Step &step, Below::iterator it){
+        Below::iterator next = it;
+        ++next;
+        if(next != step.below.end())
+            step.inner -= strip(it->second, next->second);
+        if(it != step.below.begin()){
+            Below::iterator prev = it;
+            --prev;
+            step.inner -= strip(prev->second, it->second);
+            if(next != step.below.end())
+                step.inner += strip(prev->second, next->second);
+        }
+        step.below.erase(it);
+    }
+
+    void addBelow(Step &step, int q, double z){
+        double x = X(q), y = Y(q);
+        Below::iterator it = step.below.upper_bound(x);
+        if(it != step.below.begin()){
+            Below::iterator left = it;
+            --left;
+            if(Y(left->second) <= y)
+                return;
+        }
+        grow(step, z);
+        it = step.below.lower_bound(x);
+        while(it != step.below.end() && Y(it->second) >= y){
+            Below::iterator dominated = it++;
+            eraseBelow(step, dominated);
+        }
+        insertBelow(step, it, q);
+    }
+};
+
+void contributions3d(const double *data, int n, const double *ref, double *result){
+    std::vector<bool> repeated(n, false);
+    std::vector<int> keys(3);
+    keys[0] = 2; keys[1] = 0; keys[2] = 1;
+    std::vector<int> order = sortedDistinct(data, 3, n, ref, keys, repeated);
+
+    // The points are swept by increasing z. The slice of the contribution of
+    // a point at a height is the area of the (x, y) plane which it
+    // dominates alone among the points below: its volume grows by that area
+    // times the height swept, until the area is changed by a new point.
+    Sweep3d sweep(data, ref, result);
+    for(size_t j = 0; j < order.size(); ++j)
+        sweep.add(order[j]);
+    sweep.finish();
+
+    for(int i = 0; i < n; ++i)
+        if(repeated[i])
+            result[i] = 0.0;
+}
+
+void contributionsNd(double *data, int d, int n, const double *ref, double *result){
+    // The volume of the box of every point minus the hypervolume of the
+    // other points clipped to it
+    std::vector<double> clipped(n * d);
+    for(int i = 0; i < n; ++i){
+        const double *p = data + i * d;
+        bool inside = true;
+        for(int k = 0; k < d && inside; ++k)
+            inside = p[k] < ref[k];
+        if(!inside)
+            continue;
+
+        bool dominated = false;
+        int count = 0;
+        for(int j = 0; j < n && !dominated; ++j){
+            if(j == i)
+                continue;
+            const double *q = data + j * d;
+            bool weakly = true, outside = false;
+            double *c = &clipped[count * d];
+            for(int k = 0; k < d; ++k){
+                weakly = weakly && q[k] <= p[k];
+                c[k] = std::max(q[k], p[k]);
+                outside = outside || c[k] >= ref[k];
+            }
+            dominated = weakly;
+            if(!outside)
+                ++count;
+        }
+        if(dominated)
+            continue;
+
+        double box = 1.0;
+        for(int k = 0; k < d; ++k)
+            box *= ref[k] - p[k];
+        result[i] = count ? box - fpli_hv(&clipped[0], d, count, ref) : box;
+    }
+}
+
+}
+
+void hv_contributions(double *data, int d, int n, const double *ref,
+                      double *contributions){
+    std::fill(contributions, contributions + n, 0.0);
+    if(d == 2)
+        contributions2d(data, n, ref, contributions);
+    else if(d == 3)
+        contributions3d(data, n, ref, contributions);
+    else
+        contributionsNd(data, d, n, ref, contributions);
+}
+
+double hv_contribution(const double *data, int d, int n, const double *point,
+                       const double *ref){
+    // The points worse than point in one objective only cover the part of
+    // its box beyond their value in that objective, the rest of the box is
+    // bounded by upper
+    std::vector<double> upper(ref, ref + d);
+    for(int i = 0; i < n; ++i){
+        const double *q = data + i * d;
+        int worse = 0, last = 0;
+        for(int k = 0; k < d; ++k)
+            if(q[k] > point[k]){
+                ++worse;
+                last = k;
+            }
+        if(worse == 0)
+            return 0.0;
+        if(worse == 1)
+            upper[last] = std::min(upper[last], q[last]);
+    }
+    for(int k = 0; k < d; ++k)
+        if(point[k] >= upper[k])
+            return 0.0;
+
+    // The other points clipped to the bounded box, usually a few
+    std::vector<double> clipped;
+    for(int i = 0; i < n; ++i){
+        const double *q = data + i * d;
+        bool inside = true;
+        for(int k = 0; k < d && inside; ++k)
+            inside = std::max(q[k], point[k]) < upper[k];
+        if(inside)
+            for(int k = 0; k < d; ++k)
+                clipped.push_back(std::max(q[k], point[k]));
+    }
+
+    double box = 1.0;
+    for(int k = 0; k < d; ++k)
+        box *= upper[k] - point[k];
+    int count = (int)(clipped.size() / d);
+    return count ? box - fpli_hv(&clipped[0], d, count, &upper[0]) : box;
+}
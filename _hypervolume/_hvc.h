@@ -0,0 +1,41 @@
+/*
+ * This file is part of DEAP.
+ *
+ * DEAP is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of
+ * the License, or (at your option) any later version.
+ *
+ * DEAP is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+ */
+#ifndef HVC_H_
+#define HVC_H_
+
+/* Exclusive hypervolume contribution of each of the n points of dimension d
+   stored row by row in data, according to the reference point ref, written
+   to contributions. Minimization is assumed, points which are not strictly
+   better than ref in every objective and points which are weakly dominated
+   by another one (identical points included) contribute 0. Two and three
+   objectives take O(n log n), more objectives one fpli_hv call per point.
+   The function keeps no global state and is reentrant. */
+void hv_contributions(double *data, int d, int n, const double *ref,
+                      double *contributions);
+
+/* Exclusive hypervolume contribution of point to the n points of dimension d
+   stored row by row in data, i.e. the hypervolume it adds to them, according
+   to the reference point ref. It is 0 if point is weakly dominated by one of
+   them or not strictly better than ref in every objective. The part of the
+   box of point left by the points worse than it in one objective only is
+   found in O(n d), the points clipped to that part, usually a few, are then
+   passed to fpli_hv. The function keeps no global state and is
+   reentrant. */
+double hv_contribution(const double *data, int d, int n, const double *point,
+                       const double *ref);
+
+#endif
@@ -0,0 +1,94 @@
+#    This file is part of DEAP.
+#
+#    DEAP is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as
+#    published by the Free Software Foundation, either version 3 of
+#    the License, or (at your option) any later version.
+#
+#    DEAP is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
+"""Monte Carlo estimation of the hypervolume, whose cost grows linearly with
+the number of objectives instead of exponentially as for the exact
+algorithms. Uniform samples of the box between the lowest point and the
+reference point are drawn by chunks and the hypervolume is the volume of the
+box times the fraction of the samples dominated by the point set.
+"""
+from math import sqrt
+
+import numpy
+
+
+# Options of hypervolume(), set by configure()
+_options = {'error': 0.01, 'samples': None, 'seed': 0}
+
+
+def configure(**options):
+    """Set the options of :func:`hypervolume_approximation` used by
+    :func:`hypervolume`: *error*, *samples*, *seed*, *chunk_size* or
+    *max_samples*. Raises :class:`ValueError` for an unknown option."""
+    known = ('error', 'samples', 'seed', 'chunk_size', 'max_samples')
+    unknown = set(options) - set(known)
+    if unknown:
+        raise ValueError("Unknown options: %s" % ', '.join(sorted(unknown)))
+    _options.update(options)
+
+
+def hypervolume(pointset, ref):
+    """Return the estimate of the hypervolume of *pointset* according to the
+    reference point *ref* made with the options set by :func:`configure`.
+    """
+    return hypervolume_approximation(pointset, ref, **_options)
+
+
+def _dominated(points, samples):
+    # Whether every sample is weakly dominated by one of the points,
+    # objective by objective to keep a (samples, points) array only
+    dominated = points[:, 0] <= samples[:, 0, None]
+    for i in range(1, points.shape[1]):
+        dominated &= points[:, i] <= samples[:, i, None]
+    return dominated.any(axis=1)
+
+
+def hypervolume_approximation(pointset, ref, error=0.01, samples=None, seed=0,
+                              chunk_size=2**22, max_samples=10**7):
+    """Return a Monte Carlo estimate of the hypervolume of *pointset*
+    according to the reference point *ref*. Minimization is implicitly
+    assumed.
+
+    :param error: Relative standard error of the estimate: samples are
+                  drawn until it is reached, at least 1000 and at most
+                  *max_samples* of them.
+    :param samples: Number of samples to draw instead, whatever the error.
+    :param seed: Seed of the samples, the estimate of the same point set is
+                 always the same.
+    :param chunk_size: Maximal number of sample-point comparisons made at
+                       once, which bounds the memory used.
+    """
+    ref = numpy.asarray(ref, dtype=numpy.float64)
+    points = numpy.asarray(pointset, dtype=numpy.float64).reshape(-1, len(ref))
+    points = points[numpy.all(points < ref, axis=1)]
+    if not len(points):
+        return 0.0
+    low = points.min(axis=0)
+    box = float(numpy.prod(ref - low))
+
+    rng = numpy.random.RandomState(seed)
+    total = samples if samples is not None else max_samples
+    chunk = max(1, min(chunk_size // len(points), 4096))
+    drawn = hits = 0
+    while drawn < total:
+        size = min(chunk, total - drawn)
+        sample = low + (ref - low) * rng.random_sample((size, len(ref)))
+        hits += int(_dominated(points, sample).sum())
+        drawn += size
+        if samples is None and drawn >= 1000 and hits:
+            # Relative standard error of the binomial proportion
+            p = float(hits) / drawn
+            if sqrt((1. - p) / (p * drawn)) <= error:
+                break
+    return box * hits / drawn
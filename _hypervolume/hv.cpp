@@ -23,106 +23,266 @@
 
 #include <cstdlib>
 #include <iostream>
+#include <vector>
 
 #include "_hv.h"
+#include "_hvc.h"
 
-static PyObject* hypervolume(PyObject *self, PyObject *args){
-    // Args[0]: Point list
-    // Args[1]: Reference point
-    // Return: The hypervolume as a double
+static void releasePoints(double *lPointSet, Py_buffer *lView, bool lBorrowed){
+    if(lBorrowed)
+        PyBuffer_Release(lView);
+    else
+        delete[] lPointSet;
+}
 
-    PyObject *lPyPointSet = PyTuple_GetItem(args, 0);
-    PyObject *lPyReference = PyTuple_GetItem(args, 1);
+static int getPointBuffer(PyObject *lPyPointSet, Py_buffer *lView){
+    // Borrows the memory of a C-contiguous two dimensional array of doubles
+    // (e.g. a numpy.float64 array) through the buffer protocol.
+    // Return: 1 on success, 0 if the object cannot be used this way
+    if(!PyObject_CheckBuffer(lPyPointSet))
+        return 0;
 
-    int lNumPoints = 0;
-    int lDim = -1;
-    double *lPointSet = NULL;
+    if(PyObject_GetBuffer(lPyPointSet, lView, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) < 0){
+        PyErr_Clear();
+        return 0;
+    }
 
-    if(PySequence_Check(lPyPointSet)){
-        lNumPoints = PySequence_Size(lPyPointSet);
-        unsigned int lPointCount = 0;
-
-        for(int i = 0; i < lNumPoints; ++i){
-            PyObject *lPyPoint = PySequence_GetItem(lPyPointSet, i);
-            
-            if(PySequence_Check(lPyPoint)){
-                if(lDim < 0){
-                    lDim = PySequence_Size(lPyPoint);
-                    lPointSet = new double[lNumPoints*lDim];
-                }
-                
-                for(int j = 0; j < lDim; ++j){
-                    PyObject *lPyCoord = PySequence_GetItem(lPyPoint, j);
-                    lPointSet[lPointCount++] = PyFloat_AsDouble(lPyCoord);
-                    Py_DECREF(lPyCoord);
-                    lPyCoord = NULL;
-                    
-                    if(PyErr_Occurred()){
-                        PyErr_SetString(PyExc_TypeError,"Points must contain double type values");
-                        delete[] lPointSet;
-                        return NULL;
-                    }
-                }
-                
-                Py_DECREF(lPyPoint);
-                lPyPoint = NULL;
-            } else {
-                Py_DECREF(lPyPoint);
-                lPyPoint = NULL;
-                PyErr_SetString(PyExc_TypeError,"First argument must contain only points");
-                free(lPointSet);
-                return NULL;
-            }
-        }
+    const char *lFormat = lView->format;
+    if(lFormat != NULL && (lFormat[0] == '<' || lFormat[0] == '=' || lFormat[0] == '@'))
+        ++lFormat;
+
+    if(lView->ndim != 2 || lView->itemsize != sizeof(double) ||
+       lFormat == NULL || lFormat[0] != 'd' || lFormat[1] != '\0'){
+        PyBuffer_Release(lView);
+        return 0;
+    }
+    return 1;
+}
 
-        
+static double* readPoints(PyObject *lPyPointSet, Py_buffer *lView, bool *lBorrowed,
+                          int *lNumPoints, int *lDim){
+    // Reads the point set, in place when it is a C-contiguous array of
+    // doubles, otherwise copied from the sequence of points.
+    // Return: the points, NULL with an exception set on error
+    *lNumPoints = 0;
+    *lDim = -1;
+    *lBorrowed = false;
+    double *lPointSet = NULL;
 
-    } else {
+    if(getPointBuffer(lPyPointSet, lView)){
+        // The points are not modified, they are used in place
+        *lNumPoints = (int)lView->shape[0];
+        *lDim = (int)lView->shape[1];
+        *lBorrowed = true;
+        return (double*)lView->buf;
+    }
+    if(!PySequence_Check(lPyPointSet)){
         PyErr_SetString(PyExc_TypeError,"First argument must be a list of points");
         return NULL;
     }
 
-    double *lReference = NULL;
+    *lNumPoints = PySequence_Size(lPyPointSet);
+    unsigned int lPointCount = 0;
 
-    if(PySequence_Check(lPyReference)){
-        if(PySequence_Size(lPyReference) == lDim){
-            lReference = new double[lDim];
+    for(int i = 0; i < *lNumPoints; ++i){
+        PyObject *lPyPoint = PySequence_GetItem(lPyPointSet, i);
+
+        if(PySequence_Check(lPyPoint)){
+            if(*lDim < 0){
+                *lDim = PySequence_Size(lPyPoint);
+                lPointSet = new double[*lNumPoints * *lDim];
+            }
 
-            for(int i = 0; i < lDim; ++i){
-                PyObject *lPyCoord = PySequence_GetItem(lPyReference, i);
-                lReference[i] = PyFloat_AsDouble(lPyCoord);
+            for(int j = 0; j < *lDim; ++j){
+                PyObject *lPyCoord = PySequence_GetItem(lPyPoint, j);
+                lPointSet[lPointCount++] = PyFloat_AsDouble(lPyCoord);
                 Py_DECREF(lPyCoord);
                 lPyCoord = NULL;
-                    
+
                 if(PyErr_Occurred()){
-                    PyErr_SetString(PyExc_TypeError,"Reference point must contain double type values");
-                    delete[] lReference;
+                    PyErr_SetString(PyExc_TypeError,"Points must contain double type values");
+                    Py_DECREF(lPyPoint);
+                    delete[] lPointSet;
                     return NULL;
                 }
             }
 
+            Py_DECREF(lPyPoint);
+            lPyPoint = NULL;
         } else {
-            PyErr_SetString(PyExc_TypeError,"Reference point is not of same dimensionality as point set");
+            Py_DECREF(lPyPoint);
+            lPyPoint = NULL;
+            PyErr_SetString(PyExc_TypeError,"First argument must contain only points");
+            delete[] lPointSet;
             return NULL;
         }
+    }
+    if(lPointSet == NULL){
+        // No points, or points without coordinates
+        lPointSet = new double[1];
+    }
+    return lPointSet;
+}
 
-    } else {
-        PyErr_SetString(PyExc_TypeError,"Second argument must be a point");
+static double* readVector(PyObject *lPyVector, int lDim, const char *lArgument,
+                          const char *lName){
+    // Return: the point lName given as lArgument, NULL with an exception set
+    //         on error
+    if(!PySequence_Check(lPyVector)){
+        PyErr_Format(PyExc_TypeError,"%s must be a point", lArgument);
+        return NULL;
+    }
+    if(PySequence_Size(lPyVector) != lDim){
+        PyErr_Format(PyExc_TypeError,"%s is not of same dimensionality as point set", lName);
         return NULL;
     }
 
+    double *lVector = new double[lDim];
+    for(int i = 0; i < lDim; ++i){
+        PyObject *lPyCoord = PySequence_GetItem(lPyVector, i);
+        lVector[i] = PyFloat_AsDouble(lPyCoord);
+        Py_DECREF(lPyCoord);
+        lPyCoord = NULL;
 
-    double lHypervolume = fpli_hv(lPointSet, lDim, lNumPoints, lReference);
+        if(PyErr_Occurred()){
+            PyErr_Format(PyExc_TypeError,"%s must contain double type values", lName);
+            delete[] lVector;
+            return NULL;
+        }
+    }
+    return lVector;
+}
+
+static double* readReference(PyObject *lPyReference, int lDim){
+    // Return: the reference point, NULL with an exception set on error
+    return readVector(lPyReference, lDim, "Second argument", "Reference point");
+}
+
+static PyObject* hypervolume(PyObject *self, PyObject *args){
+    // Args[0]: Point list
+    // Args[1]: Reference point
+    // Return: The hypervolume as a double
+
+    PyObject *lPyPointSet = PyTuple_GetItem(args, 0);
+    PyObject *lPyReference = PyTuple_GetItem(args, 1);
+
+    int lNumPoints, lDim;
+    Py_buffer lView;
+    bool lBorrowed;
+    double *lPointSet = readPoints(lPyPointSet, &lView, &lBorrowed, &lNumPoints, &lDim);
+    if(lPointSet == NULL)
+        return NULL;
+
+    double *lReference = readReference(lPyReference, lDim);
+    if(lReference == NULL){
+        releasePoints(lPointSet, &lView, lBorrowed);
+        return NULL;
+    }
+
+    double lHypervolume = 0.0;
+    if(lNumPoints > 0){
+        // fpli_hv keeps its state per call, so other threads can run
+        // (and compute other hypervolumes) in the meantime
+        Py_BEGIN_ALLOW_THREADS
+        lHypervolume = fpli_hv(lPointSet, lDim, lNumPoints, lReference);
+        Py_END_ALLOW_THREADS
+    }
     
-    delete[] lPointSet;
+    releasePoints(lPointSet, &lView, lBorrowed);
     delete[] lReference;
 
     return PyFloat_FromDouble(lHypervolume);
 }
 
+static PyObject* contributions(PyObject *self, PyObject *args){
+    // Args[0]: Point list
+    // Args[1]: Reference point
+    // Return: The list of the exclusive hypervolume contributions of the
+    //         points
+
+    PyObject *lPyPointSet = PyTuple_GetItem(args, 0);
+    PyObject *lPyReference = PyTuple_GetItem(args, 1);
+
+    int lNumPoints, lDim;
+    Py_buffer lView;
+    bool lBorrowed;
+    double *lPointSet = readPoints(lPyPointSet, &lView, &lBorrowed, &lNumPoints, &lDim);
+    if(lPointSet == NULL)
+        return NULL;
+
+    double *lReference = readReference(lPyReference, lDim);
+    if(lReference == NULL){
+        releasePoints(lPointSet, &lView, lBorrowed);
+        return NULL;
+    }
+
+    std::vector<double> lContributions(lNumPoints, 0.0);
+    if(lNumPoints > 0){
+        Py_BEGIN_ALLOW_THREADS
+        hv_contributions(lPointSet, lDim, lNumPoints, lReference, &lContributions[0]);
+        Py_END_ALLOW_THREADS
+    }
+
+    releasePoints(lPointSet, &lView, lBorrowed);
+    delete[] lReference;
+
+    PyObject *lPyContributions = PyList_New(lNumPoints);
+    for(int i = 0; i < lNumPoints; ++i)
+        PyList_SET_ITEM(lPyContributions, i, PyFloat_FromDouble(lContributions[i]));
+    return lPyContributions;
+}
+
+static PyObject* contribution(PyObject *self, PyObject *args){
+    // Args[0]: Point
+    // Args[1]: Point list
+    // Args[2]: Reference point
+    // Return: The exclusive hypervolume contribution of the point to the
+    //         point list as a double
+
+    PyObject *lPyPoint = PyTuple_GetItem(args, 0);
+    PyObject *lPyPointSet = PyTuple_GetItem(args, 1);
+    PyObject *lPyReference = PyTuple_GetItem(args, 2);
+    if(lPyReference == NULL)
+        return NULL;
+
+    int lNumPoints, lDim;
+    Py_buffer lView;
+    bool lBorrowed;
+    double *lPointSet = readPoints(lPyPointSet, &lView, &lBorrowed, &lNumPoints, &lDim);
+    if(lPointSet == NULL)
+        return NULL;
+    if(lDim < 0 && PySequence_Check(lPyPoint))
+        // No points to read the dimensionality from
+        lDim = PySequence_Size(lPyPoint);
+
+    double *lPoint = readVector(lPyPoint, lDim, "First argument", "Point");
+    double *lReference = lPoint ? readVector(lPyReference, lDim, "Third argument",
+                                             "Reference point") : NULL;
+    if(lReference == NULL){
+        releasePoints(lPointSet, &lView, lBorrowed);
+        delete[] lPoint;
+        return NULL;
+    }
+
+    double lContribution;
+    Py_BEGIN_ALLOW_THREADS
+    lContribution = hv_contribution(lPointSet, lDim, lNumPoints, lPoint, lReference);
+    Py_END_ALLOW_THREADS
+
+    releasePoints(lPointSet, &lView, lBorrowed);
+    delete[] lPoint;
+    delete[] lReference;
+
+    return PyFloat_FromDouble(lContribution);
+}
+
 static PyMethodDef hvMethods[] = {
     {"hypervolume", hypervolume, METH_VARARGS,
         "Hypervolume Computation"},
+    {"contributions", contributions, METH_VARARGS,
+        "Exclusive Hypervolume Contributions of every point"},
+    {"contribution", contribution, METH_VARARGS,
+        "Exclusive Hypervolume Contribution of a point to a point list"},
     {NULL, NULL, 0, NULL}        /* Sentinel (?!?) */
 };
 
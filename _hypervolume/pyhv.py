@@ -80,7 +80,7 @@ class _HyperVolume:
         #     # only consider points that dominate the reference point
         #     if weaklyDominates(point, referencePoint):
         #         relevantPoints.append(point)
-        relevantPoints = front
+        relevantPoints = numpy.asarray(front, dtype=float)
         # fmder
         #######
         if any(referencePoint):
@@ -92,7 +92,8 @@ class _HyperVolume:
             # fmder: Assume relevantPoints are numpy array
             # for j in xrange(len(relevantPoints)):
             #     relevantPoints[j] = [relevantPoints[j][i] - referencePoint[i] for i in xrange(dimensions)]
-            relevantPoints -= referencePoint
+            # A shifted copy is made, the caller's points are left untouched
+            relevantPoints = relevantPoints - referencePoint
             # fmder
             #######
 
@@ -137,7 +138,7 @@ class _HyperVolume:
             hvRecursive = self.hvRecursive
             p = sentinel
             q = p.prev[dimIndex]
-            while q.cargo != None:
+            while q.cargo is not None:
                 if q.ignore < dimIndex:
                     q.ignore = 0
                 q = q.prev[dimIndex]
@@ -317,7 +318,7 @@ class _MultiList:
             if bounds[i] > node.cargo[i]:
                 bounds[i] = node.cargo[i]
 
-__all__ = ["hypervolume_kmax", "hypervolume"]
+__all__ = ["hypervolume"]
 
 if __name__ == "__main__":
     try:
@@ -327,6 +328,7 @@ if __name__ == "__main__":
         print("Cannot import C version of hypervolume")
 
     from deap.tools import sortLogNondominated
+    from _hypervolume.approx import hypervolume_approximation
 
     pointset = [(a, a) for a in numpy.arange(1, 0, -0.01)]
     ref = numpy.array([2, 2])
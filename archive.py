@@ -0,0 +1,350 @@
+"""Archives of non-dominated objective vectors used by the evaluation
+decorator of :mod:`problems` to track the Pareto front found so far:
+unbounded, pruned to a maximal size or thinned by an epsilon grid.
+"""
+import numpy
+
+from _hypervolume import contributions
+from selection import crowding_distance
+
+
+class ParetoArchive(object):
+    """Archive of the non-dominated objective vectors seen so far, with the
+    same semantics as :func:`problems.update_pareto_front`: a vector is
+    rejected when an archived vector is better in every objective, and the
+    archived vectors which are worse in every objective than an accepted one
+    are removed. Minimization is implicitly assumed.
+
+    The vectors are kept as rows of a compact ``float64`` array. With two
+    objectives the rows are sorted by the first objective, so that finding
+    whether a vector is dominated and which vectors it dominates is a binary
+    search. With more objectives the dominance tests are vectorized over the
+    rows on the relevant side of the vector in the first objective.
+
+    The archive behaves as the list of the archived vectors, which are the
+    objects given to :meth:`update`. Every vector inserted into or removed
+    from the archive is passed to the ``insert`` or ``remove`` method of the
+    objects of :attr:`observers`, e.g. a
+    :class:`tools.HypervolumeTracker`. ::
+
+        archive = ParetoArchive()
+        for vals in evaluations:
+            archive.update(vals)
+        hv = hypervolume(numpy.array(archive), ref)
+    """
+    def __init__(self):
+        self.dim = None
+        self._data = None
+        self._size = 0
+        self._values = []
+        self.observers = []
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return numpy.array(self.points, dtype=dtype)
+
+    def __repr__(self):
+        return repr(self._values)
+
+    def __getstate__(self):
+        # Only the used rows of the array are pickled
+        state = self.__dict__.copy()
+        if self._data is not None:
+            state['_data'] = self._data[:max(self._size, 1)].copy()
+        return state
+
+    def empty(self):
+        """Return a new empty archive with the same settings, without
+        observers."""
+        return ParetoArchive()
+
+    def _inserted(self, vals):
+        for observer in self.observers:
+            observer.insert(vals)
+
+    def _removed(self, values):
+        for observer in self.observers:
+            for vals in values:
+                observer.remove(vals)
+
+    @property
+    def points(self):
+        """View of the archived vectors as a ``(n, dim)`` array. It is only
+        valid until the next update."""
+        if self._data is None:
+            return numpy.empty((0, 0))
+        return self._data[:self._size]
+
+    def update(self, vals):
+        """Try to add the objective vector *vals* to the archive. Return
+        :obj:`True` if it was added, :obj:`False` if it is dominated.
+        """
+        p = numpy.asarray(vals, dtype=numpy.float64)
+        if self._data is None:
+            self.dim = len(p)
+            self._data = numpy.empty((16, self.dim))
+        elif self._size == len(self._data):
+            self._data = numpy.resize(self._data, (2 * self._size, self.dim))
+
+        if self.dim == 2:
+            added = self._update_2d(p, vals)
+        else:
+            added = self._update_nd(p, vals)
+        if added:
+            self._inserted(vals)
+        return added
+
+    def update_many(self, points):
+        """Add the rows of the ``(n, dim)`` array *points* one after the
+        other, the archived vectors are then tuples. Return the number of
+        rows which were added.
+        """
+        return sum(self.update(tuple(row)) for row in numpy.asarray(points).tolist())
+
+    def _update_2d(self, p, vals):
+        # Rows are sorted by the first objective ascending and then by the
+        # second one descending. As no row is better than another one in
+        # both objectives, the second objective is then non-increasing.
+        n = self._size
+        data = self._data
+        f1 = data[:n, 0]
+        neg_f2 = -data[:n, 1]
+
+        # Rows better in the first objective, the last has the lowest second
+        i = numpy.searchsorted(f1, p[0], 'left')
+        if i > 0 and data[i - 1, 1] < p[1]:
+            return False
+
+        # Rows worse in the first objective and, among them, in the second
+        j = numpy.searchsorted(f1, p[0], 'right')
+        k = j + numpy.searchsorted(neg_f2[j:], -p[1], 'left')
+        pos = i + numpy.searchsorted(neg_f2[i:j], -p[1], 'right')
+
+        removed = k - j
+        if removed:
+            data[pos + 1:j + 1] = data[pos:j]
+            data[j + 1:n - removed + 1] = data[k:n]
+            self._removed(self._values[j:k])
+            del self._values[j:k]
+        else:
+            data[pos + 1:n + 1] = data[pos:n]
+        data[pos] = p
+        self._values.insert(pos, vals)
+        self._size = n - removed + 1
+        return True
+
+    def _update_nd(self, p, vals):
+        # Rows are sorted by the first objective, so only the rows before
+        # the vector can be better than it and only the rows after it can
+        # be worse.
+        n = self._size
+        data = self._data
+        i = numpy.searchsorted(data[:n, 0], p[0], 'left')
+        j = numpy.searchsorted(data[i:n, 0], p[0], 'right') + i
+
+        better = data[:i, 1] < p[1]
+        for m in range(2, self.dim):
+            better &= data[:i, m] < p[m]
+        if better.any():
+            return False
+
+        worse = data[j:n, 1] > p[1]
+        for m in range(2, self.dim):
+            worse &= data[j:n, m] > p[m]
+        if worse.any():
+            keep = ~worse
+            tail = data[j:n][keep]
+            self._removed([v for v, k in zip(self._values[j:], keep) if not k])
+            self._values[j:] = [v for v, k in zip(self._values[j:], keep) if k]
+            n = j + len(tail)
+            data[j + 1:n + 1] = tail
+        else:
+            data[j + 1:n + 1] = data[j:n]
+        data[j] = p
+        self._values.insert(j, vals)
+        self._size = n + 1
+        return True
+
+
+class BoundedParetoArchive(ParetoArchive):
+    """:class:`ParetoArchive` holding at most *capacity* vectors. When an
+    accepted vector makes it overflow, the archive is pruned back to
+    *capacity* minus a *slack* fraction of it, removing the vectors of the
+    lowest score computed once on the whole archive:
+
+    * ``"crowding"``: the crowding distance of NSGA-II, the extreme vectors
+      of every objective are always kept;
+    * ``"hv"``: the exclusive hypervolume contribution according to *ref*,
+      by default the worst values of the archive plus one.
+
+    A pruning costs O(n log n) with two or three objectives and happens once
+    every *slack* times *capacity* updates, i.e. O(log n) per update. The
+    number of non-dominated vectors removed so far is :attr:`discarded`.
+    As the removed vectors are forgotten, a vector they dominate can be
+    accepted later. ::
+
+        problem.pareto_front = BoundedParetoArchive(1000, prune="hv")
+    """
+    def __init__(self, capacity, prune="crowding", slack=0.25, ref=None):
+        if prune not in ("crowding", "hv"):
+            raise ValueError("Unknown pruning rule %r" % (prune,))
+        if capacity < 2:
+            raise ValueError("The capacity of the archive must be at least 2")
+        super(BoundedParetoArchive, self).__init__()
+        self.capacity = capacity
+        self.prune = prune
+        self.slack = slack
+        self.ref = ref
+        # Vectors removed at once, at least one
+        self.batch = max(1, int(capacity * slack))
+        self.discarded = 0
+
+    def empty(self):
+        return BoundedParetoArchive(self.capacity, self.prune, self.slack, self.ref)
+
+    def update(self, vals):
+        added = super(BoundedParetoArchive, self).update(vals)
+        if self._size > self.capacity:
+            self._prune(self._size - self.capacity + self.batch)
+        return added
+
+    def _scores(self):
+        points = self.points
+        if self.prune == "crowding":
+            return crowding_distance(points)
+        ref = self.ref
+        if ref is None:
+            ref = points.max(axis=0) + 1.0
+        return contributions(points, [float(r) for r in ref])
+
+    def _prune(self, count):
+        # The order of the kept rows, sorted by the first objective, is
+        # unchanged
+        n = self._size
+        keep = numpy.ones(n, dtype=bool)
+        keep[numpy.argsort(self._scores(), kind='mergesort')[:count]] = False
+        self._data[:n - count] = self._data[:n][keep]
+        keep = keep.tolist()
+        self._removed([v for v, k in zip(self._values, keep) if not k])
+        self._values = [v for v, k in zip(self._values, keep) if k]
+        self._size = n - count
+        self.discarded += count
+
+
+class EpsilonArchive(ParetoArchive):
+    """Archive keeping at most one objective vector per box of the grid of
+    steps *eps* (one per objective), the box of a vector being
+    ``floor(vals / eps)``, with the epsilon-dominance rules of Laumanns et
+    al. (2002): a vector is rejected if its box is dominated by the box of
+    an archived vector, it replaces the vector of its own box if it
+    dominates it or, when neither dominates the other, if it is closer to
+    the lower corner of the box, and it removes the vectors whose boxes its
+    box dominates. The size of the archive is bounded by the number of
+    non-dominated boxes, whatever the number of updates.
+
+    The boxes are indexed by a dictionary, so that a vector falling into an
+    archived box, or into a box next to an archived box which dominates it,
+    is handled without looking at the other vectors. The archived boxes are
+    only scanned, at once with numpy, for a vector falling into a new box.
+    The vectors are not sorted. ::
+
+        problem.pareto_front = EpsilonArchive(0.01 * numpy.asarray(problem.nadir))
+    """
+    def __init__(self, eps):
+        super(EpsilonArchive, self).__init__()
+        self.eps = numpy.asarray(eps, dtype=numpy.float64)
+        if (self.eps <= 0).any():
+            raise ValueError("The steps of the grid must be positive")
+        self._boxes = None
+        self._keys = []     # box of every row, as a tuple
+        self._index = {}    # box -> row
+
+    def __getstate__(self):
+        state = super(EpsilonArchive, self).__getstate__()
+        if self._boxes is not None:
+            state['_boxes'] = self._boxes[:max(self._size, 1)].copy()
+        return state
+
+    def empty(self):
+        return EpsilonArchive(self.eps)
+
+    def update(self, vals):
+        """Try to add the objective vector *vals* to the archive. Return
+        :obj:`True` if it was added, :obj:`False` if it was rejected.
+        """
+        p = numpy.asarray(vals, dtype=numpy.float64)
+        box = numpy.floor(p / self.eps).astype(numpy.int64)
+        key = tuple(box.tolist())
+        if self._data is None:
+            self.dim = len(p)
+            self._data = numpy.empty((16, self.dim))
+            self._boxes = numpy.empty((16, self.dim), dtype=numpy.int64)
+
+        row = self._index.get(key)
+        if row is not None:
+            # The archived boxes do not dominate each other, so only the
+            # vector of the same box is concerned
+            q = self._data[row]
+            if (q <= p).all():
+                return False
+            if not (p <= q).all():
+                corner = box * self.eps
+                if ((p - corner) ** 2).sum() >= ((q - corner) ** 2).sum():
+                    return False
+            self._removed([self._values[row]])
+            self._data[row] = p
+            self._values[row] = vals
+            self._inserted(vals)
+            return True
+
+        # A neighbouring box below is enough to reject the vector
+        for m in range(self.dim):
+            below = list(key)
+            below[m] -= 1
+            if tuple(below) in self._index:
+                return False
+
+        n = self._size
+        boxes = self._boxes[:n]
+        if (boxes <= box).all(axis=1).any():
+            return False
+        dominated = numpy.flatnonzero((boxes >= box).all(axis=1))
+        for row in dominated[::-1].tolist():
+            self._remove(row)
+
+        n = self._size
+        if n == len(self._data):
+            self._data = numpy.resize(self._data, (2 * n, self.dim))
+            self._boxes = numpy.resize(self._boxes, (2 * n, self.dim))
+        self._data[n] = p
+        self._boxes[n] = box
+        self._values.append(vals)
+        self._keys.append(key)
+        self._index[key] = n
+        self._size = n + 1
+        self._inserted(vals)
+        return True
+
+    def _remove(self, row):
+        # The last row is moved into the removed one, the rows are removed
+        # from the last one so that a moved row is never to be removed
+        last = self._size - 1
+        self._removed([self._values[row]])
+        del self._index[self._keys[row]]
+        if row != last:
+            self._data[row] = self._data[last]
+            self._boxes[row] = self._boxes[last]
+            self._values[row] = self._values[last]
+            self._keys[row] = self._keys[last]
+            self._index[self._keys[row]] = row
+        self._values.pop()
+        self._keys.pop()
+        self._size = last
@@ -0,0 +1,180 @@
+#! /home/albertas/how_to_use/env/bin/python2.7
+"""Run NSGA-II on a grid of problems x dimensions x seeds x budgets in one
+pool of long-lived processes, instead of launching ./nsga2.py once per run.
+The modules are imported once per process and every run gets a new
+instance of its problem, with its own evaluation counter and archive, then
+writes the same stats_*/front_* logs and makes the same callback as
+./nsga2.py.
+
+    ./experiments.py --func_names=zdt1,zdt2 --dims=30 --seeds=1-10 \\
+        --budgets=15000 --callback=./callback --processes=4
+"""
+import itertools
+import multiprocessing
+import os
+import time
+from optparse import OptionParser
+
+import nsga2
+import problems
+
+
+NSGA2 = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nsga2.py')
+
+parser = OptionParser()
+parser.add_option("--func_names", dest="func_names",
+                  help="comma separated problem names")
+parser.add_option("--dims", dest="dims", help="comma separated dimensions")
+parser.add_option("--seeds", dest="seeds",
+                  help="comma separated seeds or ranges of seeds, e.g. 1-10")
+parser.add_option("--budgets", dest="budgets",
+                  help="comma separated numbers of function calls, none "
+                  "for runs bounded by --max_duration only")
+parser.add_option("--dimension", dest="dimension", type="int",
+                  help="number of variables of the problems")
+parser.add_option("--n_objs", dest="n_objs", type="int",
+                  help="number of objectives of the problems taking any, "
+                  "as the DTLZ ones, the others keep theirs")
+parser.add_option("--task_id", dest="task_id", type="int", default=0,
+                  help="task id of the first run, the next ones follow")
+parser.add_option("--callback", dest="callback")
+parser.add_option("--processes", dest="processes", type="int",
+                  default=multiprocessing.cpu_count(),
+                  help="number of runs made at the same time")
+parser.add_option("--max_duration", dest="max_duration",
+                  help="wall-clock budget of every run in seconds")
+parser.add_option("--checkpoint_every", dest="checkpoint_every", type="int",
+                  default=0, help="save the state of every run this often")
+parser.add_option("--resume", dest="resume", action="store_true",
+                  default=False, help="continue the runs from their checkpoints")
+parser.add_option("--hv_backend", dest="hv_backend")
+parser.add_option("--hv_error", dest="hv_error", type="float")
+parser.add_option("--hv_samples", dest="hv_samples", type="int")
+parser.add_option("--mu", dest="mu", type="int", default=20)
+parser.add_option("--engine", dest="engine", default="deap")
+parser.add_option("--selection", dest="selection", default="nsga2")
+parser.add_option("--cache_size", dest="cache_size", type="int")
+parser.add_option("--archive", dest="archive")
+parser.add_option("--archive_eps", dest="archive_eps", type="float")
+parser.add_option("--archive_size", dest="archive_size", type="int")
+parser.add_option("--archive_prune", dest="archive_prune")
+parser.add_option("--log_every", dest="log_every", type="int")
+parser.add_option("--indicators", dest="indicators")
+parser.add_option("--front_size", dest="front_size", type="int")
+parser.add_option("--log_format", dest="log_format", default="text")
+
+
+def parse_list(text):
+    """Return the list of the comma separated values of *text*, where a
+    value a-b of integers stands for all the integers from a to b."""
+    values = []
+    for value in text.split(','):
+        if '-' in value.strip('-'):
+            first, last = value.split('-')
+            values.extend(str(v) for v in range(int(first), int(last) + 1))
+        else:
+            values.append(value)
+    return values
+
+
+def budgets(options):
+    """Return the list of the budgets of the runs, [None] when the runs are
+    bounded by --max_duration only."""
+    if options.budgets:
+        return parse_list(options.budgets)
+    if not options.max_duration:
+        raise ValueError("--budgets or --max_duration is required")
+    return [None]
+
+
+def make_tasks(options):
+    """Return the command line arguments of nsga2.py of every run of the
+    grid, problems first, budgets last."""
+    tasks = []
+    grid = itertools.product(options.func_names.split(','),
+                             parse_list(options.dims),
+                             parse_list(options.seeds),
+                             budgets(options))
+    for task_id, (func_name, d, seed, budget) in enumerate(grid, options.task_id):
+        args = ['--func_name=%s' % func_name,
+                '--d=%s' % d,
+                '--seed=%s' % seed]
+        if budget is not None:
+            args.append('--max_calls=%s' % budget)
+        args += ['--task_id=%d' % task_id,
+                 '--mu=%d' % options.mu,
+                 '--engine=%s' % options.engine,
+                 '--selection=%s' % options.selection,
+                 '--log_format=%s' % options.log_format]
+        if options.callback:
+            args.append('--callback=%s' % options.callback)
+        if options.max_duration:
+            args.append('--max_duration=%s' % options.max_duration)
+        if options.checkpoint_every:
+            args.append('--checkpoint_every=%d' % options.checkpoint_every)
+        if options.resume:
+            args.append('--resume')
+        if options.dimension:
+            args.append('--dimension=%d' % options.dimension)
+        if options.n_objs and problems.has_scalable_objectives(func_name):
+            args.append('--n_objs=%d' % options.n_objs)
+        if options.log_every:
+            args.append('--log_every=%d' % options.log_every)
+        if options.indicators:
+            args.append('--indicators=%s' % options.indicators)
+        if options.front_size:
+            args.append('--front_size=%d' % options.front_size)
+        if options.hv_backend:
+            args.append('--hv_backend=%s' % options.hv_backend)
+        if options.hv_error:
+            args.append('--hv_error=%s' % options.hv_error)
+        if options.hv_samples:
+            args.append('--hv_samples=%d' % options.hv_samples)
+        if options.cache_size:
+            args.append('--cache_size=%d' % options.cache_size)
+        if options.archive:
+            args.append('--archive=%s' % options.archive)
+        if options.archive_eps:
+            args.append('--archive_eps=%s' % options.archive_eps)
+        if options.archive_size:
+            args.append('--archive_size=%d' % options.archive_size)
+        if options.archive_prune:
+            args.append('--archive_prune=%s' % options.archive_prune)
+        tasks.append(args)
+    return tasks
+
+
+def run_task(args):
+    """Make the run of nsga2.py with the arguments *args* in this process and
+    return the arguments, the number of evaluations and the duration
+    measured by the run, since its checkpoint if it was resumed."""
+    nsga2.main(args, exe=NSGA2)
+    evals, duration = nsga2.throughput
+    return args, evals, duration
+
+
+def main():
+    (options, args) = parser.parse_args()
+    tasks = make_tasks(options)
+
+    start = time.time()
+    if options.processes > 1:
+        pool = multiprocessing.Pool(options.processes)
+        results = pool.imap_unordered(run_task, tasks)
+    else:
+        pool = None
+        results = (run_task(task) for task in tasks)
+    for args, evals, duration in results:
+        print('%s: %d calls in %.2f s, %.1f calls per second' % (
+            ' '.join(args[:4]), evals, duration, evals / duration))
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    duration = time.time() - start
+    print('%d runs in %.2f s, %.2f runs per minute' % (
+        len(tasks), duration, 60. * len(tasks) / duration))
+
+
+if __name__ == '__main__':
+    main()
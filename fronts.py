@@ -0,0 +1,186 @@
+"""True Pareto fronts of the registered problems, used as the optimal front of
+:func:`tools.convergence` and of the other quality indicators.
+
+The fronts are generated once, analytically or by evaluating the problem on
+its Pareto optimal set, and cached as ``.npy`` files in ``log/fronts`` named
+after the problem, its dimension, its number of objectives and the number of
+points asked for. They are memory-mapped when loaded, so that every run of a
+problem can use a dense front without regenerating it. ::
+
+    front = fronts.reference_front('dtlz2', n_objs=5)
+    print(tools.convergence(problem.pareto_front, front))
+
+The cache can be filled before a batch of runs from the command line::
+
+    python fronts.py zdt1 zdt2 dtlz2 --n_objs=5
+"""
+import os
+from math import pi
+from optparse import OptionParser
+
+import numpy
+
+import problems
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'log', 'fronts')
+
+# Minimum of the first objective of ZDT6, 1 - exp(-4x) sin(6 pi x)^6
+ZDT6_MIN_F1 = 0.2807753191
+
+
+def _first_front_2d(f1, f2):
+    # The points are sorted by increasing f1, a point is dominated if and
+    # only if an earlier one has a lower or equal f2
+    keep = numpy.ones(len(f2), dtype=bool)
+    keep[1:] = f2[1:] < numpy.minimum.accumulate(f2)[:-1]
+    return keep
+
+def _bi_objective(f1, f2):
+    keep = _first_front_2d(f1, f2)
+    return numpy.column_stack((f1[keep], f2[keep]))
+
+def _simplex(n_objs, size, rng):
+    """Points of the unit simplex: evenly spaced with two objectives,
+    otherwise the corners and points drawn uniformly."""
+    if n_objs == 2:
+        t = numpy.linspace(0., 1., size)
+        return numpy.column_stack((t, 1. - t))
+    points = rng.dirichlet(numpy.ones(n_objs), max(size - n_objs, 0))
+    return numpy.vstack((numpy.eye(n_objs), points))
+
+def _sphere(n_objs, size, rng):
+    """Points of the unit sphere in the positive orthant: evenly spaced with
+    two objectives, otherwise the corners and points drawn uniformly."""
+    if n_objs == 2:
+        t = numpy.linspace(0., pi / 2., size)
+        return numpy.column_stack((numpy.cos(t), numpy.sin(t)))
+    points = numpy.abs(rng.standard_normal((max(size - n_objs, 0), n_objs)))
+    points /= numpy.sqrt((points ** 2).sum(axis=1))[:, None]
+    return numpy.vstack((numpy.eye(n_objs), points))
+
+def _pareto_set(problem, position, distance):
+    """Evaluate *problem* on the rows of the position attributes *position*
+    with every distance attribute set to its optimal value *distance*."""
+    X = numpy.empty((len(position), problem.dimension))
+    X[:, :position.shape[1]] = position
+    X[:, position.shape[1]:] = distance
+    return problem.evaluate(X)
+
+def _zdt(f2):
+    def generate(problem, size, rng):
+        f1 = numpy.linspace(0., 1., size)
+        return _bi_objective(f1, f2(f1))
+    return generate
+
+def _zdt6(problem, size, rng):
+    f1 = numpy.linspace(ZDT6_MIN_F1, 1., size)
+    return numpy.column_stack((f1, 1. - f1 ** 2))
+
+def _ep1(problem, size, rng):
+    f1 = numpy.linspace(0., 2., size)
+    return _bi_objective(f1, numpy.minimum(numpy.abs(f1 - 1.), 1.5 - f1) + 1.)
+
+def _ep2(problem, size, rng):
+    f2 = numpy.linspace(0., 1., size)
+    return numpy.column_stack((1. - f2 ** 2, f2))
+
+def _dtlz1(problem, size, rng):
+    return 0.5 * _simplex(problem.crits, size, rng)
+
+def _dtlz_sphere(problem, size, rng):
+    return _sphere(problem.crits, size, rng)
+
+def _dtlz_theta(distance):
+    # The front is the curve of the first position attribute, the objectives
+    # are those of the problem, which depend on its dimension. As in DEAP,
+    # the first objective also multiplies the cosines of the distance
+    # attributes, so with two objectives points with g > 0 can fall below
+    # this curve: it is the usual reference, not a bound.
+    def generate(problem, size, rng):
+        position = numpy.empty((size, problem.crits - 1))
+        position[:, 0] = numpy.linspace(0., 1., size)
+        position[:, 1:] = 0.5
+        return _pareto_set(problem, position, distance)
+    return generate
+
+def _dtlz7(problem, size, rng):
+    # The last objective is 2 n_objs - sum x (1 + sin(3 pi x)) over the
+    # position attributes x, the other ones are x: the Pareto optimal values
+    # of every attribute are those where x (1 + sin(3 pi x)) is higher than
+    # for every lower x, and any combination of them is Pareto optimal.
+    x = numpy.linspace(0., 1., size)
+    x = x[_first_front_2d(x, -x * (1. + numpy.sin(3. * pi * x)))]
+    if problem.crits == 2:
+        position = x[:, None]
+    else:
+        position = rng.choice(x, (size, problem.crits - 1))
+    return _pareto_set(problem, position, 0.)
+
+_generators = {
+    'zdt1': _zdt(lambda f1: 1. - numpy.sqrt(f1)),
+    'zdt2': _zdt(lambda f1: 1. - f1 ** 2),
+    'zdt3': _zdt(lambda f1: 1. - numpy.sqrt(f1) - f1 * numpy.sin(10. * pi * f1)),
+    'zdt4': _zdt(lambda f1: 1. - numpy.sqrt(f1)),
+    'zdt6': _zdt6,
+    'dtlz1': _dtlz1,
+    'dtlz2': _dtlz_sphere,
+    'dtlz3': _dtlz_sphere,
+    'dtlz4': _dtlz_sphere,
+    'dtlz5': _dtlz_theta(0.5),
+    'dtlz6': _dtlz_theta(0.),
+    'dtlz7': _dtlz7,
+    'ep1': _ep1,
+    'ep2': _ep2,
+}
+
+
+def generate(func_name, dimension=None, n_objs=None, size=10000):
+    """Return the ``(k, n_objs)`` array of about *size* points of the true
+    Pareto front of the problem *func_name* with *dimension* variables and
+    *n_objs* objectives, the defaults of :func:`problems.get_problem`. Two
+    objective fronts are evenly spaced and the disconnected ones keep only
+    their non-dominated points, the others are drawn uniformly with a fixed
+    seed and contain their extreme points."""
+    if func_name not in _generators:
+        raise ValueError("There is no reference front of %r" % func_name)
+    problem = problems.get_problem(func_name, dimension, n_objs)
+    rng = numpy.random.RandomState(0)
+    return _generators[func_name](problem, size, rng)
+
+def cache_path(func_name, dimension=None, n_objs=None, size=10000, cache_dir=None):
+    """Return the path of the cached front of :func:`reference_front`."""
+    problem = problems.get_problem(func_name, dimension, n_objs)
+    return os.path.join(cache_dir or CACHE_DIR, 'front_%s_%d_%d_%d.npy' % (
+        func_name, problem.dimension, problem.crits, size))
+
+def reference_front(func_name, dimension=None, n_objs=None, size=10000, cache_dir=None):
+    """Return the true Pareto front made by :func:`generate`, memory-mapped
+    from its cache file in *cache_dir*, ``log/fronts`` by default, which is
+    written first if it does not exist. The file is written under another
+    name and renamed, so that runs sharing the cache never read a partial
+    front."""
+    path = cache_path(func_name, dimension, n_objs, size, cache_dir)
+    if not os.path.exists(path):
+        front = generate(func_name, dimension, n_objs, size)
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError:
+            if not os.path.isdir(os.path.dirname(path)):
+                raise
+        tmp = '%s.%d.tmp.npy' % (path[:-len('.npy')], os.getpid())
+        numpy.save(tmp, front)
+        os.rename(tmp, path)
+    return numpy.load(path, mmap_mode='r')
+
+
+if __name__ == '__main__':
+    parser = OptionParser(usage="%prog [options] func_name ...")
+    parser.add_option("--dimension", dest="dimension", type="int")
+    parser.add_option("--n_objs", dest="n_objs", type="int")
+    parser.add_option("--size", dest="size", type="int", default=10000)
+    (options, args) = parser.parse_args()
+    for func_name in args:
+        front = reference_front(func_name, options.dimension, options.n_objs, options.size)
+        print('%s: %d points' % (cache_path(func_name, options.dimension,
+                                            options.n_objs, options.size), len(front)))
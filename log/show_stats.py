@@ -1,3 +1,6 @@
+import os
+
+import numpy
 from matplotlib import pyplot as plt
 
 stat_files = [
@@ -18,32 +21,55 @@ def get_color():
 clrs = get_color()
 
 
-def show_stats_for_one_file(alg, stats):  # evals, hv, uni
-    plt.plot([e[0] for e in stats], [e[1] for e in stats], clrs.next() + '-', label=alg, linewidth=2)
+def show_stats_for_one_file(alg, stats):  # (n, 3) array of evals, hv, uni
+    plt.plot(stats[:, 0], stats[:, 1], next(clrs) + '-', label=alg, linewidth=2)
+
+def show_stats_for_files(alg, stats):  # (evals, min hv, mean hv, max hv)
+    evals, low, mean, high = stats
+    clr = next(clrs)
+    plt.plot(evals, low, clr + '-', label=alg, linewidth=2)
+    plt.plot(evals, mean, clr + '-', label=alg)
+    plt.plot(evals, high, clr + '-', label=alg, linewidth=2)
+    plt.fill_between(evals, low, high, color=clr, alpha='0.3')
 
-def show_stats_for_files(alg, stats):  # (evals, [hvs], [uni])
-    clr = clrs.next()
-    plt.plot([e[0] for e in stats], [min(e[1]) for e in stats], clr + '-', label=alg, linewidth=2)
-    plt.plot([e[0] for e in stats], [sum(e[1])/len(e[1]) for e in stats], clr + '-', label=alg)
-    plt.plot([e[0] for e in stats], [max(e[1]) for e in stats], clr + '-', label=alg, linewidth=2)
-    plt.fill_between([e[0] for e in stats], [min(e[1]) for e in stats], [max(e[1]) for e in stats], color=clr, alpha='0.3')
+def load_stats(path):
+    '''Return the (n, 3) array of the evals, hv and uni of a stats file. A
+    .npy file (nsga2.py --log_format=npy) is memory-mapped. A text file is
+    parsed once into a cached path + ".npy" file, which is memory-mapped
+    again as long as it is newer than the text file.'''
+    if path.endswith('.npy'):
+        return numpy.load(path, mmap_mode='r')
+    cache = path + '.npy'
+    if not os.path.exists(cache) or os.path.getmtime(cache) < os.path.getmtime(path):
+        stats = numpy.loadtxt(path, ndmin=2)
+        tmp = cache + '.tmp.npy'
+        numpy.save(tmp, stats)
+        os.rename(tmp, cache)
+    return numpy.load(cache, mmap_mode='r')
 
 def parse_stats_for_one_file(files):
-    open_f = open(files[0], 'r')
-    stats = []
-    for line in open_f:
-        stats.append([float(e) for e in line.split()])
-    open_f.close()
-    return stats
+    return load_stats(files[0])
+
+def align_runs(runs, column=1):
+    '''Align the *column* of the stats arrays *runs* on the evaluation
+    counts of all of them: return the sorted counts and the
+    (len(runs), len(counts)) array of the values of every run at every
+    count, i.e. its last value logged at or before it, NaN before its first
+    record and after its last one.'''
+    evals = numpy.unique(numpy.concatenate([run[:, 0] for run in runs]))
+    values = numpy.empty((len(runs), len(evals)))
+    values.fill(numpy.nan)
+    for i, run in enumerate(runs):
+        last = numpy.searchsorted(run[:, 0], evals, 'right') - 1
+        inside = (last >= 0) & (evals <= run[-1, 0])
+        values[i, inside] = run[last[inside], column]
+    return evals, values
 
 def parse_stats_for_files(fs):
-    stats = []     # [ev, hv, uni]  [ev, hv, uni]  [ev, hv, uni]
-    for f in fs:
-        stats.append(parse_stats_for_one_file([f]))
-    merged = []
-    for i in range(len(stats[0])):
-        merged.append((stats[0][i][0], [s[i][1] for s in stats], [s[i][2] for s in stats]))
-    return merged
+    '''Return the evaluation counts of the runs of the stats files *fs* and
+    the min, mean and max hv over the runs at every count.'''
+    evals, hvs = align_runs([load_stats(f) for f in fs])
+    return evals, numpy.nanmin(hvs, axis=0), numpy.nanmean(hvs, axis=0), numpy.nanmax(hvs, axis=0)
 
 if __name__ == '__main__':
     for alg, files in stat_files:
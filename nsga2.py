@@ -16,12 +16,20 @@
 #    License along with DEAP. If not, see <http://www.gnu.org/licenses/>.
 
 import array
+import itertools
 import random
 import json
 import sys
 import os
 import subprocess
+import time
+import multiprocessing
+from functools import partial
 from optparse import OptionParser
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 import numpy
 
@@ -31,18 +39,19 @@ from deap import algorithms
 from deap import base
 # from deap import benchmarks
 import problems
+import fronts
 from deap.benchmarks.tools import diversity, convergence
-from tools import uniformity
+from tools import uniformity, HypervolumeTracker
+from tools import gd, igd, igd_plus, epsilon_additive
 from deap import creator
 from deap import tools
+from selection import sel_nsga2, select_nsga2, sel_sms_emoa, select_sms_emoa
+from runlog import TextLog, NpyLog
+from archive import BoundedParetoArchive, EpsilonArchive
+import operators
+from operators import sel_tournament_dcd
 
-try:
-    # try importing the C version
-    from _hypervolume import _hv
-except ImportError:
-    # fallback on python version
-    from _hypervolume import pyhv as _hv
-hypervolume = _hv.hypervolume
+import _hypervolume
 
 
 parser = OptionParser()
@@ -50,28 +59,85 @@ parser.add_option("--func_name", dest="func_name")
 parser.add_option("--max_calls", dest="max_calls")
 parser.add_option("--d", dest="d")
 parser.add_option("--seed", dest="seed")
-parser.add_option("--max_duration", dest="max_duration")
+parser.add_option("--dimension", dest="dimension", type="int",
+                  help="number of variables of the problem (default: its "
+                       "usual one)")
+parser.add_option("--n_objs", dest="n_objs", type="int",
+                  help="number of objectives of the DTLZ problems "
+                       "(default: 3)")
+parser.add_option("--max_duration", dest="max_duration",
+                  help="wall-clock budget in seconds, checked after every "
+                       "generation")
 parser.add_option("--task_id", dest="task_id")
 parser.add_option("--callback", dest="callback")
-(options, args) = parser.parse_args()
-
-max_calls = int(options.max_calls)
-func_name = options.func_name
-d = int(options.d)
-seed = int(options.seed)
-max_duration = options.max_duration
-task_id = options.task_id
-callback = options.callback
-
-problem = problems.get_problem(options.func_name)
+parser.add_option("--hv_backend", dest="hv_backend",
+                  help="hypervolume engine: c, python or approx, a Monte "
+                       "Carlo estimate from 4 objectives (default: c if "
+                       "built)")
+parser.add_option("--hv_error", dest="hv_error", type="float", default=0.01,
+                  help="relative standard error of the approx hypervolume")
+parser.add_option("--hv_samples", dest="hv_samples", type="int",
+                  help="number of samples of the approx hypervolume, "
+                       "instead of --hv_error")
+parser.add_option("--workers", dest="workers", type="int", default=1,
+                  help="number of processes evaluating the individuals")
+parser.add_option("--mu", dest="mu", type="int", default=20,
+                  help="population size, a multiple of 4")
+parser.add_option("--checkpoint_every", dest="checkpoint_every", type="int",
+                  default=0, help="save the state of the run every this many "
+                                  "generations and when out of time, 0 to "
+                                  "disable")
+parser.add_option("--resume", dest="resume", action="store_true",
+                  default=False, help="continue the run from its checkpoint "
+                                      "if there is one")
+parser.add_option("--log_format", dest="log_format", type="choice",
+                  choices=["text", "npy"], default="text",
+                  help="stats and front logged as text files, flushed every "
+                       "generation (text), or as buffered .npy files (npy)")
+parser.add_option("--log_every", dest="log_every", type="int", default=1,
+                  help="log the hypervolume, the uniformity and the "
+                       "indicators every this many generations and at the "
+                       "last one")
+parser.add_option("--indicators", dest="indicators", default="",
+                  help="comma separated quality indicators of the Pareto "
+                       "front logged after the uniformity: gd, igd, "
+                       "igd_plus, epsilon")
+parser.add_option("--front_size", dest="front_size", type="int", default=1000,
+                  help="number of points of the true Pareto front the "
+                       "indicators are computed against")
+parser.add_option("--cache_size", dest="cache_size", type="int", default=0,
+                  help="number of individuals whose objective values are "
+                       "kept, so that they are not evaluated again, 0 to "
+                       "disable; the hit rate is then logged after the "
+                       "indicators")
+parser.add_option("--archive", dest="archive", type="choice",
+                  choices=["pareto", "epsilon"], default="pareto",
+                  help="archive of the Pareto front found: every "
+                       "non-dominated point (pareto) or one per box of an "
+                       "epsilon grid (epsilon)")
+parser.add_option("--archive_eps", dest="archive_eps", type="float",
+                  default=0.01, help="steps of the epsilon grid, as a "
+                                     "fraction of the nadir point")
+parser.add_option("--archive_size", dest="archive_size", type="int",
+                  default=0, help="maximal size of the archive of the "
+                                  "Pareto front found, 0 for no limit")
+parser.add_option("--archive_prune", dest="archive_prune", type="choice",
+                  choices=["crowding", "hv"], default="crowding",
+                  help="points removed from a full archive: of least "
+                       "crowding distance or hypervolume contribution")
+parser.add_option("--selection", dest="selection", type="choice",
+                  choices=["nsga2", "sms_emoa"], default="nsga2",
+                  help="truncation of the last front by crowding distance "
+                       "(nsga2) or by hypervolume contribution (sms_emoa)")
+parser.add_option("--engine", dest="engine", type="choice",
+                  choices=["deap", "array"], default="deap",
+                  help="population held as DEAP individuals (deap) or as "
+                       "numpy matrices (array)")
 
 
-creator.create("FitnessMin", base.Fitness, weights=(-1.0,)*problem.crits)
-creator.create("Individual", array.array, typecode='d', fitness=creator.FitnessMin)
-
 toolbox = base.Toolbox()
 
-# The problem with its parameters is set only here.
+# The problem with its parameters is set only by setup().
 # Problem definition
 # Functions zdt1, zdt2, zdt3, zdt6 have bounds [0, 1]
 ## BOUND_LOW, BOUND_UP = 0.0, 1.0
@@ -82,9 +148,19 @@ toolbox = base.Toolbox()
 # Functions zdt1, zdt2, zdt3 have 30 dimensions, zdt4 and zdt6 have 10
 # NDIM = 6 # 30
 
-nadir = problem.nadir
-NDIM = problem.dimension
-BOUND_LOW, BOUND_UP = problem.bound_low, problem.bound_up
+
+# Quality indicators which can be logged, computed against the true front
+INDICATORS = {'gd': gd, 'igd': igd, 'igd_plus': igd_plus,
+              'epsilon': epsilon_additive}
+
+# Evaluations made by the last run, since its checkpoint if it was resumed,
+# and their duration in seconds, set by finish()
+throughput = None
+
+# Environmental selections of the individuals and of the rows of objective
+# values, for the deap and the array engines
+SELECTIONS = {'nsga2': (sel_nsga2, select_nsga2),
+              'sms_emoa': (sel_sms_emoa, select_sms_emoa)}
 
 
 def uniform(low, up, size=None):
@@ -94,99 +170,505 @@ def uniform(low, up, size=None):
         return [random.uniform(a, b) for a, b in zip([low] * size, [up] * size)]
 
 
+def setup(options, exe=None):
+    """Set the parameters of the run from the parsed command line *options*:
+    a new instance of the problem, with its own evaluation counter and
+    archive, the creator classes and the toolbox. It can be called again to
+    run another problem in the same process. *exe* is the path reported to
+    the callback, the script being run by default."""
+    global max_calls, func_name, d, seed, max_duration, task_id, callback
+    global workers, mu, engine, selection, script, checkpoint_every, resume
+    global log_format, log_every
+    global problem, nadir, NDIM, BOUND_LOW, BOUND_UP, Individual
+    global indicators, reference_front, select_rows
+
+    max_calls = int(options.max_calls) if options.max_calls else None
+    func_name = options.func_name
+    d = int(options.d)
+    seed = int(options.seed)
+    max_duration = float(options.max_duration) if options.max_duration else None
+    if max_calls is None and max_duration is None:
+        raise ValueError("--max_calls or --max_duration is required")
+    task_id = int(options.task_id) if options.task_id is not None else None
+    callback = options.callback
+    workers = options.workers
+    mu = options.mu
+    if mu <= 0 or mu % 4:
+        # The tournaments of the selection draw the parents four by four
+        parser.error("--mu must be a positive multiple of 4")
+    engine = options.engine
+    selection = options.selection
+    checkpoint_every = options.checkpoint_every
+    resume = options.resume
+    log_format = options.log_format
+    log_every = options.log_every
+    script = exe or sys.argv[0]
+
+    if options.hv_backend == 'approx':
+        _hypervolume.set_backend('approx', error=options.hv_error,
+                                 samples=options.hv_samples)
+    elif options.hv_backend:
+        _hypervolume.set_backend(options.hv_backend)
+
+    problem = problems.get_problem(func_name, options.dimension, options.n_objs)
+    if options.archive == 'epsilon':
+        if options.archive_size:
+            raise ValueError("--archive_size only bounds the pareto archive")
+        problem.pareto_front = EpsilonArchive(
+            options.archive_eps * numpy.abs(numpy.asarray(problem.nadir)))
+    elif options.archive_size:
+        problem.pareto_front = BoundedParetoArchive(options.archive_size,
+                                                    options.archive_prune)
+    problem.set_cache(options.cache_size)
+
+    names = [name for name in options.indicators.split(',') if name]
+    unknown = set(names) - set(INDICATORS)
+    if unknown:
+        raise ValueError("Unknown indicators: %s" % ', '.join(sorted(unknown)))
+    indicators = [INDICATORS[name] for name in names]
+    reference_front = None
+    if indicators:
+        reference_front = fronts.reference_front(func_name, problem.dimension,
+                                                 problem.crits, options.front_size)
+
+    nadir = problem.nadir
+    NDIM = problem.dimension
+    BOUND_LOW, BOUND_UP = problem.bound_low, problem.bound_up
+
+    # One fitness class per number of objectives, so that problems with
+    # different numbers of objectives can be run one after the other
+    fitness = "FitnessMin%d" % problem.crits
+    if not hasattr(creator, fitness):
+        creator.create(fitness, base.Fitness, weights=(-1.0,)*problem.crits)
+        creator.create("Individual%d" % problem.crits, array.array,
+                       typecode='d', fitness=getattr(creator, fitness))
+    Individual = getattr(creator, "Individual%d" % problem.crits)
+
+    toolbox.register("attr_float", uniform, BOUND_LOW, BOUND_UP, NDIM)
+    toolbox.register("individual", tools.initIterate, Individual, toolbox.attr_float)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    toolbox.register("evaluate", problem)
+    toolbox.register("evaluate_chunk", partial(problems.evaluate_chunk, func_name,
+                                               n_objs=problem.crits))
+    toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=BOUND_LOW, up=BOUND_UP, eta=20.0)
+    toolbox.register("mutate", tools.mutPolynomialBounded, low=BOUND_LOW, up=BOUND_UP,
+                     eta=20.0, indpb=1.0/NDIM)
+    select_individuals, select_rows = SELECTIONS[selection]
+    toolbox.register("select", select_individuals)
+
+def evaluate_genes(genes):
+    """Evaluate the rows of the matrix *genes* with one call of the problem
+    and return the matrix of their objective values. With several workers
+    the rows missing from the cache of the problem are split in one chunk
+    per worker, evaluated by toolbox.map and the values are recorded by the
+    problem of this process."""
+    if workers > 1:
+        return problem.memoize(genes, evaluate_chunks)
+    return toolbox.evaluate(genes)
+
+def evaluate_chunks(genes):
+    chunks = numpy.array_split(genes, min(workers, len(genes)))
+    return numpy.concatenate(toolbox.map(toolbox.evaluate_chunk, chunks))
+
+def evaluate_batch(individuals):
+    """Evaluate all the *individuals* with evaluate_genes on the matrix of
+    their genes and set their fitness values."""
+    if not individuals:
+        return
+    fitnesses = evaluate_genes(numpy.array(individuals))
+    for ind, fit in zip(individuals, fitnesses.tolist()):
+        ind.fitness.values = fit
 
-toolbox.register("attr_float", uniform, BOUND_LOW, BOUND_UP, NDIM)
-toolbox.register("individual", tools.initIterate, creator.Individual, toolbox.attr_float)
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-
-toolbox.register("evaluate", problem)
-toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=BOUND_LOW, up=BOUND_UP, eta=20.0)
-toolbox.register("mutate", tools.mutPolynomialBounded, low=BOUND_LOW, up=BOUND_UP, eta=20.0, indpb=1.0/NDIM)
-toolbox.register("select", tools.selNSGA2)
+def start_workers():
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        toolbox.register("map", pool.map)
+        return pool
+
+def stop_workers(pool):
+    if pool is not None:
+        pool.close()
+        pool.join()
+        toolbox.register("map", map)
+
+def log_path(kind, func_name, d, seed, ext='txt'):
+    file_path = os.path.dirname(os.path.abspath(script))
+    return file_path + '/log/%s_%s_%d__nsga2_%s.%s' % (kind, func_name, d, str(seed), ext)
+
+def open_log(func_name, d, seed, position=None):
+    """Open the stats and front log of the run in the log_format. When
+    resuming, the stats are kept up to their *position* at the checkpoint."""
+    log_class = NpyLog if log_format == 'npy' else TextLog
+    return log_class(log_path('stats', func_name, d, seed, log_class.extension),
+                     log_path('front', func_name, d, seed, log_class.extension),
+                     position, columns=3 + len(indicators) + bool(problem.cache_size))
+
+def pack_logbook(logbook):
+    # The records as one array per key, much faster to pickle than the
+    # small arrays of every record
+    keys = logbook[0].keys() if logbook else []
+    return logbook.header, len(logbook), dict((key, numpy.array(logbook.select(key)))
+                                              for key in keys)
+
+def unpack_logbook(packed):
+    header, size, columns = packed
+    logbook = tools.Logbook()
+    logbook.header = header
+    rows = dict((key, column.tolist() if column.ndim == 1 else list(column))
+                for key, column in columns.items())
+    for i in range(size):
+        logbook.record(**dict((key, rows[key][i]) for key in rows))
+    return logbook
+
+def save_checkpoint(func_name, d, seed, gen, hv, uni, hv_tracker, logbook,
+                    log, **population):
+    """Save the state of the run after the generation *gen*: the arrays of
+    the *population*, the random states, the evaluation counter, the cache
+    and the archive of the problem, the hypervolume tracker, the logbook, the
+    position of the stats log and the run_parameters. The state is pickled to
+    a temporary file which then replaces the checkpoint, so that a checkpoint
+    is never partly written."""
+    state = dict(population, gen=gen, hv=hv, uni=uni,
+                 random=random.getstate(), evals=problem.evals, hits=problem.hits,
+                 cache=problem.cache, archive=problem.pareto_front,
+                 tracker=hv_tracker, parameters=run_parameters(func_name, d),
+                 logbook=pack_logbook(logbook), log_position=log.tell())
+    path = log_path('checkpoint', func_name, d, seed, 'pkl')
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(state, f, 2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(path + '.tmp', path)
+
+def run_parameters(func_name, d):
+    """The parameters of the run its checkpoint has to be saved with to be
+    resumed."""
+    return dict(engine=engine, func_name=func_name, d=d, mu=mu, n_objs=problem.crits,
+                dimension=NDIM, selection=selection)
+
+def load_checkpoint(func_name, d, seed):
+    """Return the state saved by save_checkpoint if the run is resumed and
+    has a checkpoint, None otherwise. The random state, the evaluation
+    counter, the cache, in its order and within the --cache_size of the
+    resumed run, and the archive of the problem are restored. A checkpoint
+    saved with other run_parameters is refused with a ValueError before
+    anything is restored."""
+    path = log_path('checkpoint', func_name, d, seed, 'pkl')
+    if not resume or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    saved, expected = state.get('parameters', {}), run_parameters(func_name, d)
+    different = sorted(key for key in expected if saved.get(key) != expected[key])
+    if different:
+        raise ValueError("The checkpoint %s was saved by another run: %s" % (
+            path, ', '.join('%s=%s instead of %s' % (key, saved.get(key), expected[key])
+                            for key in different)))
+    random.setstate(state['random'])
+    problem.evals = state['evals']
+    problem.hits = state.get('hits', 0)
+    if problem.cache is not None and state.get('cache'):
+        problem.cache.update(state['cache'])
+        problem.trim_cache()
+    problem.pareto_front = state['archive']
+    return state
+
+def log_generation(log, hv_tracker):
+    """Write the number of calls, the hypervolume, the uniformity and the
+    indicators of the Pareto front found so far to the stats log, followed
+    by the hit rate of the cache if there is one, and return the
+    hypervolume and the uniformity. The calls are the unique evaluations."""
+    hv = hv_tracker.volume
+    uni = uniformity(problem.pareto_front)
+    calls = problem.evals
+    values = []
+    if indicators:
+        points = numpy.asarray(problem.pareto_front)
+        values = [indicator(points, reference_front) for indicator in indicators]
+    if problem.cache_size:
+        values.append(hit_rate())
+    log.write_stats(calls, hv, uni, *values)
+    return hv, uni
+
+def hit_rate():
+    """Fraction of the individuals found in the cache of the problem."""
+    requests = problem.evals + problem.hits
+    return float(problem.hits) / requests if requests else 0.0
+
+def generations(max_calls, MU, first=1):
+    """Generate the numbers of the generations from *first*, the one
+    following the initial generation unless the run is resumed, within the
+    budget of *max_calls* evaluations or without end if it is None, in which
+    case the run is stopped by max_duration. A generation is started while
+    the evaluations of the problem so far and the *MU* ones it can make fit
+    in the budget, so that the offspring which are not evaluated again let
+    the run go on for more generations."""
+    for gen in itertools.count(first):
+        if out_of_calls(MU):
+            return
+        yield gen
+
+def out_of_calls(MU):
+    """Whether the budget max_calls is too small for the *MU* evaluations
+    a generation can make."""
+    return max_calls is not None and problem.evals + MU > max_calls
+
+def logged(gen, MU):
+    """Whether the generation *gen* is logged: every log_every generations
+    and when the budget is spent. The generation at which a run is out of
+    time is logged too."""
+    return gen % log_every == 0 or out_of_calls(MU)
+
+def out_of_time(start):
+    """Whether the wall-clock budget max_duration is spent since *start*."""
+    return max_duration is not None and time.time() - start >= max_duration
+
+def finish(log, hv, uni, start, first_evals=0):
+    """Write the Pareto front found, close the logs, report to the callback
+    and print how many evaluations were made per second since *start*, when
+    the counter was at *first_evals*. These evaluations and their duration
+    are kept in throughput and passed to the callback."""
+    global throughput
+    log.write_front(problem.pareto_front)
+    log.close()
+
+    duration = time.time() - start
+    evals = problem.evals - first_evals
+    throughput = evals, duration
+    if callback:
+        subprocess.call([callback,
+            '--calls=%d' % problem.evals,
+            '--hyper_volume=%f' % hv,
+            '--uniformity=%f' % uni,
+            '--duration=%f' % duration,
+            '--calls_per_second=%f' % (evals / duration),
+            '--task_id=%d' % task_id,
+            '--status=D',
+            '-exe=%s' %  script,
+        ])
+
+    print('%d calls in %.2f s, %.1f calls per second' % (
+        evals, duration, evals / duration))
+    if problem.cache_size:
+        print('%d unique evaluations, %d cache hits, hit rate %.3f' % (
+            problem.evals, problem.hits, hit_rate()))
+    if isinstance(problem.pareto_front, BoundedParetoArchive):
+        print('%d points discarded from the archive' % problem.pareto_front.discarded)
 
 def nsga2(max_calls, func_name, d, seed=None):
     random.seed(seed)
 
-    MU = 20
-    NGEN = max_calls/ MU # 750  # 250    # Number of evaluations = NGEN * MU
+    start = time.time()
+    MU = mu
     CXPB = 0.9
 
-    file_path = os.path.dirname(os.path.abspath(sys.argv[0]))
-    stats_file = open(file_path + '/log/stats_%s_%d__nsga2_%s.txt' % (func_name, d, str(seed)), 'w')
-    front_file = open(file_path + '/log/front_%s_%d__nsga2_%s.txt' % (func_name, d, str(seed)), 'w')
-
-    stats = tools.Statistics(lambda ind: ind.fitness.values)
-    stats.register("min", numpy.min, axis=0)
-    stats.register("max", numpy.max, axis=0)
+    state = load_checkpoint(func_name, d, seed)
+    first_evals = problem.evals
+    log = open_log(func_name, d, seed, state and state['log_position'])
+    pool = start_workers()
+    try:
 
-    logbook = tools.Logbook()
-    logbook.header = "gen", "evals", "std", "min", "avg", "max"
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        stats.register("min", numpy.min, axis=0)
+        stats.register("max", numpy.max, axis=0)
+
+        if state is None:
+            logbook = tools.Logbook()
+            logbook.header = "gen", "evals", "saved", "std", "min", "avg", "max"
+
+            pop = toolbox.population(n=MU)
+            hv_tracker = HypervolumeTracker(nadir)
+            hv_tracker.watch(problem.pareto_front)
+
+            # Evaluate the individuals with an invalid fitness
+            invalid_ind = [ind for ind in pop if not ind.fitness.valid]
+            evaluate_batch(invalid_ind)
+
+            # This is just to assign the crowding distance to the individuals
+            # no actual selection is done
+            pop = toolbox.select(pop, len(pop))
+
+            record = stats.compile(pop)
+            logbook.record(gen=0, evals=len(invalid_ind), saved=0, **record)
+            # print(logbook.stream)
+            hv = uni = None
+            NGEN = generations(max_calls, MU)
+        else:
+            logbook, hv_tracker = unpack_logbook(state['logbook']), state['tracker']
+            hv, uni = state['hv'], state['uni']
+            pop = []
+            for genes, values, dist in zip(state['genes'].tolist(), state['values'].tolist(),
+                                           state['crowding'].tolist()):
+                ind = Individual(genes)
+                ind.fitness.values = values
+                ind.fitness.crowding_dist = dist
+                pop.append(ind)
+            NGEN = generations(max_calls, MU, state['gen'] + 1)
+
+        # Begin the generational process
+        for gen in NGEN:
+            # Vary the population
+            parents = tools.selTournamentDCD(pop, len(pop))
+            offspring = [toolbox.clone(ind) for ind in parents]
+
+            for ind1, ind2 in zip(offspring[::2], offspring[1::2]):
+                if random.random() <= CXPB:
+                    toolbox.mate(ind1, ind2)
+
+                toolbox.mutate(ind1)
+                toolbox.mutate(ind2)
+
+            # The crossover may be skipped and the mutation may change no gene,
+            # only the offspring different from their parent lose their fitness
+            for ind, parent in zip(offspring, parents):
+                if ind != parent:
+                    del ind.fitness.values
+
+            # Evaluate the individuals with an invalid fitness
+            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            evaluate_batch(invalid_ind)
+
+            # Select the next generation population
+            pop = toolbox.select(pop + offspring, MU)
+            record = stats.compile(pop)
+            logbook.record(gen=gen, evals=len(invalid_ind),
+                           saved=len(offspring) - len(invalid_ind), **record)
+
+            # print(logbook.stream)
+            if logged(gen, MU):
+                hv, uni = log_generation(log, hv_tracker)
+            stop = out_of_time(start)
+            if checkpoint_every and (gen % checkpoint_every == 0 or stop):
+                save_checkpoint(func_name, d, seed, gen, hv, uni, hv_tracker, logbook, log,
+                                genes=numpy.array(pop),
+                                values=numpy.array([ind.fitness.values for ind in pop]),
+                                crowding=numpy.array([ind.fitness.crowding_dist for ind in pop]))
+            if stop:
+                if not logged(gen, MU):
+                    # Written after the checkpoint, a resumed run drops it
+                    hv, uni = log_generation(log, hv_tracker)
+                break
+        if hv is None:
+            # No generation fits in the budget, the initial one is logged
+            hv, uni = log_generation(log, hv_tracker)
+
+    finally:
+        stop_workers(pool)
+    finish(log, hv, uni, start, first_evals)
+    return pop, logbook
 
-    pop = toolbox.population(n=MU)
+def nsga2_array(max_calls, func_name, d, seed=None):
+    """Same algorithm as nsga2 with the parents and the offspring held as the
+    two halves of a (2*MU, NDIM) matrix of genes and of a (2*MU, crits) matrix
+    of objective values. The tournament, the crossover and the mutation are
+    applied to the whole population at once, the random numbers are drawn
+    from a numpy RandomState seeded with *seed*. Return the genes and the
+    objective values of the final population, and the logbook."""
+    rng = numpy.random.RandomState(seed)
+
+    start = time.time()
+    MU = mu
+    CXPB = 0.9
 
-    # Evaluate the individuals with an invalid fitness
-    invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-    for ind, fit in zip(invalid_ind, fitnesses):
-        # print(ind, fit)
-        ind.fitness.values = fit
+    state = load_checkpoint(func_name, d, seed)
+    first_evals = problem.evals
+    log = open_log(func_name, d, seed, state and state['log_position'])
+    pool = start_workers()
+    try:
 
-    # This is just to assign the crowding distance to the individuals
-    # no actual selection is done
-    pop = toolbox.select(pop, len(pop))
-
-    record = stats.compile(pop)
-    logbook.record(gen=0, evals=len(invalid_ind), **record)
-    # print(logbook.stream)
-
-    # Begin the generational process
-    for gen in range(1, NGEN):
-        # Vary the population
-        offspring = tools.selTournamentDCD(pop, len(pop))
-        offspring = [toolbox.clone(ind) for ind in offspring]
-
-        for ind1, ind2 in zip(offspring[::2], offspring[1::2]):
-            if random.random() <= CXPB:
-                toolbox.mate(ind1, ind2)
-
-            toolbox.mutate(ind1)
-            toolbox.mutate(ind2)
-            del ind1.fitness.values, ind2.fitness.values
-
-        # Evaluate the individuals with an invalid fitness
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
-
-        # Select the next generation population
-        pop = toolbox.select(pop + offspring, MU)
-        record = stats.compile(pop)
-        logbook.record(gen=gen, evals=len(invalid_ind), **record)
-
-        # print(logbook.stream)
-        hv = hypervolume(numpy.array(problem.pareto_front), nadir)
-        uni = uniformity(problem.pareto_front)
-        calls = problem.evals
-        stats_file.write('%d %f %f\n' % (calls, hv, uni))
-        stats_file.flush()
-
-    for p in problem.pareto_front:
-        front_file.write(str(p) +'\n')
-
-    stats_file.close()
-    front_file.close()
-
-    subprocess.call([callback,
-        '--calls=%d' % problem.evals,
-        '--hyper_volume=%f' % hv,
-        '--uniformity=%f' % uni,
-        '--task_id=%d' % task_id,
-        '--status=D',
-        '-exe=%s' %  sys.argv[0],
-    ])
-    return pop, logbook
+        low = numpy.broadcast_to(numpy.asarray(BOUND_LOW, dtype=float), (NDIM,))
+        up = numpy.broadcast_to(numpy.asarray(BOUND_UP, dtype=float), (NDIM,))
+        genes = numpy.empty((2 * MU, NDIM))
+        values = numpy.empty((2 * MU, problem.crits))
+        parents, offspring = slice(0, MU), slice(MU, 2 * MU)
+
+        if state is None:
+            logbook = tools.Logbook()
+            logbook.header = "gen", "evals", "saved", "min", "max"
+            hv_tracker = HypervolumeTracker(nadir)
+            hv_tracker.watch(problem.pareto_front)
+
+            genes[parents] = rng.uniform(low, up, (MU, NDIM))
+            values[parents] = evaluate_genes(genes[parents])
+
+            # This is just to assign the crowding distance to the individuals
+            # no actual selection is done
+            chosen, crowding = select_rows(values[parents], MU)
+            genes[parents] = genes[chosen]
+            values[parents] = values[chosen]
+            logbook.record(gen=0, evals=MU, saved=0, min=values[parents].min(axis=0),
+                           max=values[parents].max(axis=0))
+            hv = uni = None
+            NGEN = generations(max_calls, MU)
+        else:
+            logbook, hv_tracker = unpack_logbook(state['logbook']), state['tracker']
+            hv, uni = state['hv'], state['uni']
+            genes[parents], values[parents] = state['genes'], state['values']
+            crowding = state['crowding']
+            rng.set_state(state['numpy_random'])
+            NGEN = generations(max_calls, MU, state['gen'] + 1)
+
+        for gen in NGEN:
+            # Vary the population
+            selected = sel_tournament_dcd(values[parents], crowding, MU, rng)
+            children1 = genes[selected[0::2]]
+            children2 = genes[selected[1::2]]
+            mated = rng.random_sample(MU // 2) <= CXPB
+            crossed1, crossed2 = operators.cx_simulated_binary_bounded(
+                children1[mated], children2[mated], 20.0, low, up, rng)
+            children1[mated] = crossed1
+            children2[mated] = crossed2
+            genes[MU::2] = operators.mut_polynomial_bounded(children1, 20.0, low, up,
+                                                            1.0/NDIM, rng)
+            genes[MU + 1::2] = operators.mut_polynomial_bounded(children2, 20.0, low, up,
+                                                                1.0/NDIM, rng)
+
+            # Only the offspring different from their parent are evaluated
+            changed = MU + numpy.flatnonzero((genes[offspring] != genes[selected]).any(axis=1))
+            values[offspring] = values[selected]
+            if len(changed):
+                values[changed] = evaluate_genes(genes[changed])
+
+            # Select the next generation population
+            chosen, crowding = select_rows(values, MU)
+            genes[parents] = genes[chosen]
+            values[parents] = values[chosen]
+            logbook.record(gen=gen, evals=len(changed), saved=MU - len(changed),
+                           min=values[parents].min(axis=0),
+                           max=values[parents].max(axis=0))
+
+            if logged(gen, MU):
+                hv, uni = log_generation(log, hv_tracker)
+            stop = out_of_time(start)
+            if checkpoint_every and (gen % checkpoint_every == 0 or stop):
+                save_checkpoint(func_name, d, seed, gen, hv, uni, hv_tracker, logbook, log,
+                                genes=genes[parents], values=values[parents],
+                                crowding=crowding, numpy_random=rng.get_state())
+            if stop:
+                if not logged(gen, MU):
+                    # Written after the checkpoint, a resumed run drops it
+                    hv, uni = log_generation(log, hv_tracker)
+                break
+        if hv is None:
+            # No generation fits in the budget, the initial one is logged
+            hv, uni = log_generation(log, hv_tracker)
+
+    finally:
+        stop_workers(pool)
+    finish(log, hv, uni, start, first_evals)
+    return (genes[parents].copy(), values[parents].copy()), logbook
+
+
+def main(args=None, exe=None):
+    """Run NSGA-II with the command line arguments *args*, sys.argv[1:] by
+    default, and return the final population and the logbook."""
+    (options, args) = parser.parse_args(args)
+    setup(options, exe)
+    if engine == 'array':
+        return nsga2_array(max_calls, func_name, d, seed=seed)
+    return nsga2(max_calls, func_name, d, seed=seed)
 
 
 if __name__ == '__main__':
-    pop, stats = nsga2(max_calls, func_name, d, seed=seed)
+    pop, stats = main()
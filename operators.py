@@ -0,0 +1,122 @@
+"""Variation and mating selection operators of NSGA-II working on whole
+populations held as ``(n, ndim)`` matrices of decision variables. They follow
+DEAP's ``selTournamentDCD``, ``cxSimulatedBinaryBounded`` and
+``mutPolynomialBounded`` gene for gene, but draw their random numbers for the
+whole population at once from a :class:`numpy.random.RandomState`.
+"""
+import numpy
+
+
+def _bounds(low, up, ndim):
+    # Bounds may be given as scalars or as sequences, as in DEAP
+    low = numpy.broadcast_to(numpy.asarray(low, dtype=numpy.float64), (ndim,))
+    up = numpy.broadcast_to(numpy.asarray(up, dtype=numpy.float64), (ndim,))
+    return low, up
+
+
+def sel_tournament_dcd(objectives, crowding, k, rng):
+    """Select *k* rows with binary tournaments based on dominance and then on
+    crowding distance, as DEAP's ``selTournamentDCD``: the population is
+    shuffled twice and every consecutive pair of the shuffles meets once.
+    Return the array of the indices of the winners.
+
+    :param objectives: ``(n, m)`` array of the objective values, minimized.
+    :param crowding: Array of the ``n`` crowding distances.
+    :param k: The number of rows to select, a multiple of 4 not above n.
+    :param rng: The :class:`numpy.random.RandomState` to draw from.
+    """
+    objectives = numpy.asarray(objectives)
+    n = len(objectives)
+    if k > n or k % 4 != 0:
+        raise ValueError("k must be a multiple of 4 not greater than the "
+                         "number of rows, got %d for %d rows" % (k, n))
+    shuffles = (rng.permutation(n)[:k].reshape(-1, 4),
+                rng.permutation(n)[:k].reshape(-1, 4))
+    # Same order of the tournaments as in DEAP: two from each shuffle for
+    # every group of four rows
+    first = numpy.column_stack([shuffles[0][:, 0], shuffles[0][:, 2],
+                                shuffles[1][:, 0], shuffles[1][:, 2]]).ravel()
+    second = numpy.column_stack([shuffles[0][:, 1], shuffles[0][:, 3],
+                                 shuffles[1][:, 1], shuffles[1][:, 3]]).ravel()
+
+    f1, f2 = objectives[first], objectives[second]
+    first_dominates = (f1 <= f2).all(axis=1) & (f1 < f2).any(axis=1)
+    second_dominates = (f2 <= f1).all(axis=1) & (f2 < f1).any(axis=1)
+    c1, c2 = crowding[first], crowding[second]
+    coin = rng.random_sample(k) <= 0.5
+
+    winners = numpy.where(coin, first, second)
+    winners = numpy.where(c1 > c2, first, numpy.where(c1 < c2, second, winners))
+    winners = numpy.where(second_dominates, second, winners)
+    return numpy.where(first_dominates, first, winners)
+
+
+def cx_simulated_binary_bounded(parents1, parents2, eta, low, up, rng):
+    """Simulated binary bounded crossover of the rows of *parents1* with the
+    rows of *parents2*, as DEAP's ``cxSimulatedBinaryBounded``: every gene
+    is crossed with probability 0.5 when the parents differ and the children
+    genes are swapped with probability 0.5. Return the two ``(n, ndim)``
+    arrays of children, the parents are not modified.
+
+    :param eta: Crowding degree of the crossover.
+    :param low: Lower bound, a scalar or a sequence of ``ndim`` values.
+    :param up: Upper bound, a scalar or a sequence of ``ndim`` values.
+    :param rng: The :class:`numpy.random.RandomState` to draw from.
+    """
+    parents1 = numpy.asarray(parents1, dtype=numpy.float64)
+    parents2 = numpy.asarray(parents2, dtype=numpy.float64)
+    low, up = _bounds(low, up, parents1.shape[1])
+    crossed = rng.random_sample(parents1.shape) <= 0.5
+    crossed &= numpy.abs(parents1 - parents2) > 1e-14
+    rand = rng.random_sample(parents1.shape)
+    swap = rng.random_sample(parents1.shape) <= 0.5
+
+    x1 = numpy.minimum(parents1, parents2)
+    x2 = numpy.maximum(parents1, parents2)
+    with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        spread = numpy.where(crossed, x2 - x1, 1.0)
+
+        def beta_q(beta):
+            alpha = 2.0 - beta ** -(eta + 1)
+            return numpy.where(rand <= 1.0 / alpha,
+                               (rand * alpha) ** (1.0 / (eta + 1)),
+                               (1.0 / (2.0 - rand * alpha)) ** (1.0 / (eta + 1)))
+
+        c1 = 0.5 * (x1 + x2 - beta_q(1.0 + 2.0 * (x1 - low) / spread) * spread)
+        c2 = 0.5 * (x1 + x2 + beta_q(1.0 + 2.0 * (up - x2) / spread) * spread)
+    c1 = numpy.minimum(numpy.maximum(c1, low), up)
+    c2 = numpy.minimum(numpy.maximum(c2, low), up)
+
+    children1 = numpy.where(crossed, numpy.where(swap, c2, c1), parents1)
+    children2 = numpy.where(crossed, numpy.where(swap, c1, c2), parents2)
+    return children1, children2
+
+
+def mut_polynomial_bounded(population, eta, low, up, indpb, rng):
+    """Polynomial bounded mutation of the rows of *population*, as DEAP's
+    ``mutPolynomialBounded``: every gene is mutated with probability
+    *indpb*. Return the ``(n, ndim)`` array of the mutants, the population is
+    not modified.
+
+    :param eta: Crowding degree of the mutation.
+    :param low: Lower bound, a scalar or a sequence of ``ndim`` values.
+    :param up: Upper bound, a scalar or a sequence of ``ndim`` values.
+    :param indpb: Independent probability of every gene to be mutated.
+    :param rng: The :class:`numpy.random.RandomState` to draw from.
+    """
+    x = numpy.asarray(population, dtype=numpy.float64)
+    low, up = _bounds(low, up, x.shape[1])
+    mutated = rng.random_sample(x.shape) <= indpb
+    rand = rng.random_sample(x.shape)
+
+    width = up - low
+    delta_1 = (x - low) / width
+    delta_2 = (up - x) / width
+    mut_pow = 1.0 / (eta + 1.)
+    with numpy.errstate(invalid='ignore'):
+        lower = 2.0 * rand + (1.0 - 2.0 * rand) * (1.0 - delta_1) ** (eta + 1)
+        upper = 2.0 * (1.0 - rand) + 2.0 * (rand - 0.5) * (1.0 - delta_2) ** (eta + 1)
+        delta_q = numpy.where(rand < 0.5, lower ** mut_pow - 1.0,
+                              1.0 - upper ** mut_pow)
+    y = numpy.minimum(numpy.maximum(x + delta_q * width, low), up)
+    return numpy.where(mutated, y, x)
@@ -19,10 +19,15 @@ examples.
 """
 
 import random
+from collections import OrderedDict
 from math import sin, cos, pi, exp, e, sqrt
 from operator import mul
 from functools import reduce
 
+import numpy
+
+from archive import ParetoArchive
+
 # Note: algorithm complexity reduction:
 # Is tol value nearer the zero with new pareto_front points? If yes - update the tol.
 
@@ -65,22 +70,122 @@ def update_pareto_front(p, pareto_front):
     return True
 
 
+def _genes_key(individual):
+    # The bytes of the genes as float64, those of an array.array('d')
+    return numpy.asarray(individual, dtype=numpy.float64).tobytes()
+
+
 def evals_dec(func):
-    '''Decorator for objective functions, which calculates unique function evaluations.'''
+    '''Decorator for objective functions, which calculates unique function evaluations.
+
+    The decorated function also accepts a 2-D array of shape (n, dimension),
+    every row being an individual, and then returns the (n, crits) array of
+    objective values. The vectorized version of the problem is used if it was
+    set as the *batch* attribute, otherwise the rows are evaluated one by one.
+
+    Once *set_cache* is called, the objective values of the last individuals
+    evaluated are kept, by the bytes of their genes as ``float64``: an
+    individual found in the cache is neither evaluated nor counted in *evals*
+    again, nor added to the archive, but counted in *hits*.
+    '''
     # This method should also track pareto front
     # Hypervolume and uniformity have to be found using the actual pareto front.
     def f(individual, *args, **kwargs):
+        if isinstance(individual, numpy.ndarray) and individual.ndim == 2:
+            return f.memoize(individual, lambda rows: f.evaluate(rows, *args, **kwargs))
+        if f.cache is not None:
+            key = _genes_key(individual)
+            vals = f.cache.pop(key, None)
+            if vals is not None:
+                f.cache[key] = vals
+                f.hits += 1
+                return vals
         vals = func(individual, *args, **kwargs)
-        # if individual not in f.evals_at:
-            # f.evals_at.append(individual[:])
-            # f.obj_vals.append(vals)
         f.evals += 1
-        update_pareto_front(vals, f.pareto_front)
+        f.pareto_front.update(vals)
+        if f.cache is not None:
+            f.cache[key] = vals
+            f.trim_cache()
         return vals
     f.evals = 0
-    # f.evals_at = []
-    # f.obj_vals = []
-    f.pareto_front = []
+    f.hits = 0
+    f.cache = None
+    f.cache_size = 0
+    f.pareto_front = ParetoArchive()
+    f.batch = None
+
+    def evaluate(individuals, *args, **kwargs):
+        '''Return the objective values of the rows of *individuals* without
+        counting them nor adding them to the archive.'''
+        if f.batch is not None:
+            return f.batch(individuals, *args, **kwargs)
+        return numpy.array([func(ind, *args, **kwargs) for ind in individuals])
+
+    def record(vals):
+        '''Count the rows of *vals* as evaluations and add them to the
+        archive, e.g. when they were computed in another process.'''
+        f.evals += len(vals)
+        f.pareto_front.update_many(vals)
+
+    def memoize(individuals, evaluate):
+        '''Return the objective values of the rows of *individuals*, only
+        the rows missing from the cache being passed at once to *evaluate*,
+        e.g. to evaluate them in other processes, and recorded. Rows
+        repeated in *individuals* are evaluated once.'''
+        if f.cache is None or not len(individuals):
+            vals = evaluate(individuals)
+            f.record(vals)
+            return vals
+        individuals = numpy.ascontiguousarray(individuals, dtype=numpy.float64)
+        keys = [row.tobytes() for row in individuals]
+        found = {}
+        missing = []
+        for i, key in enumerate(keys):
+            if key in found:
+                continue
+            vals = f.cache.pop(key, None)
+            if vals is None:
+                missing.append(i)
+            else:
+                f.cache[key] = vals
+            found[key] = vals
+        if missing:
+            vals = evaluate(individuals[missing])
+            f.record(vals)
+            for i, row in zip(missing, numpy.asarray(vals).tolist()):
+                found[keys[i]] = f.cache[keys[i]] = tuple(row)
+            f.trim_cache()
+        f.hits += len(keys) - len(missing)
+        return numpy.array([found[key] for key in keys])
+
+    def set_cache(size):
+        '''Keep the objective values of the last *size* distinct individuals
+        evaluated, least recently used first out, or none if *size* is 0.'''
+        f.cache_size = size
+        f.cache = OrderedDict() if size else None
+
+    def trim_cache():
+        '''Forget the least recently used individuals beyond the size of the
+        cache.'''
+        while len(f.cache) > f.cache_size:
+            f.cache.popitem(last=False)
+
+    def reset():
+        '''Forget the evaluations made so far: zero the counters and empty
+        the archive and the cache, keeping their settings, e.g. before
+        another run in the same process.'''
+        f.evals = 0
+        f.hits = 0
+        f.pareto_front = f.pareto_front.empty()
+        f.set_cache(f.cache_size)
+
+    f.evaluate = evaluate
+    f.record = record
+    f.memoize = memoize
+    f.set_cache = set_cache
+    f.trim_cache = trim_cache
+    f.reset = reset
+    f.__wrapped__ = func
     return f
 
 
@@ -465,6 +570,13 @@ zdt1.bound_low = [0.] + [0.]*(zdt1.dimension-1)
 zdt1.bound_up = [1.] + [1.]*(zdt1.dimension-1)
 zdt1.crits = 2
 
+def _zdt1_batch(X):
+    g  = 1.0 + 9.0*X[:, 1:].sum(axis=1)/(X.shape[1]-1)
+    f1 = X[:, 0]
+    f2 = g * (1 - numpy.sqrt(f1/g))
+    return numpy.column_stack((f1, f2))
+zdt1.batch = _zdt1_batch
+
 @evals_dec
 def zdt2(individual):
     """ZDT2 multiobjective function.
@@ -482,6 +594,13 @@ zdt2.bound_low = [0.] + [0.]*(zdt2.dimension-1)
 zdt2.bound_up = [1.] + [1.]*(zdt2.dimension-1)
 zdt2.crits = 2
 
+def _zdt2_batch(X):
+    g  = 1.0 + 9.0*X[:, 1:].sum(axis=1)/(X.shape[1]-1)
+    f1 = X[:, 0]
+    f2 = g * (1 - (f1/g)**2)
+    return numpy.column_stack((f1, f2))
+zdt2.batch = _zdt2_batch
+
 @evals_dec
 def zdt3(individual):
     """ZDT3 multiobjective function.
@@ -504,6 +623,13 @@ zdt3.bound_low = [0.] + [0.]*(zdt3.dimension-1)
 zdt3.bound_up = [1.] + [1.]*(zdt3.dimension-1)
 zdt3.crits = 2
 
+def _zdt3_batch(X):
+    g  = 1.0 + 9.0*X[:, 1:].sum(axis=1)/(X.shape[1]-1)
+    f1 = X[:, 0]
+    f2 = g * (1 - numpy.sqrt(f1/g) - f1/g * numpy.sin(10*pi*f1))
+    return numpy.column_stack((f1, f2))
+zdt3.batch = _zdt3_batch
+
 @evals_dec
 def zdt4(individual):
     """ZDT4 multiobjective function.
@@ -525,6 +651,14 @@ zdt4.bound_low = [0.] + [-5.]*(zdt4.dimension-1)
 zdt4.bound_up = [1.] + [5.]*(zdt4.dimension-1)
 zdt4.crits = 2
 
+def _zdt4_batch(X):
+    xs = X[:, 1:]
+    g  = 1 + 10*(X.shape[1]-1) + (xs**2 - 10*numpy.cos(4*pi*xs)).sum(axis=1)
+    f1 = X[:, 0]
+    f2 = g * (1 - numpy.sqrt(f1/g))
+    return numpy.column_stack((f1, f2))
+zdt4.batch = _zdt4_batch
+
 @evals_dec
 def zdt6(individual):
     """ZDT6 multiobjective function.
@@ -546,6 +680,66 @@ zdt6.bound_low = [0.] + [0.]*(zdt6.dimension-1)
 zdt6.bound_up = [1.] + [1.]*(zdt6.dimension-1)
 zdt6.crits = 2
 
+def _zdt6_batch(X):
+    g  = 1 + 9 * (X[:, 1:].sum(axis=1) / (X.shape[1]-1))**0.25
+    f1 = 1 - numpy.exp(-4*X[:, 0]) * numpy.sin(6*pi*X[:, 0])**6
+    f2 = g * (1 - (f1/g)**2)
+    return numpy.column_stack((f1, f2))
+zdt6.batch = _zdt6_batch
+
+def _prefix_products(values):
+    """Return the list of the products of the 0, 1, ..., n first *values*,
+    each computed from the previous one."""
+    prods = [1.0]
+    for v in values:
+        prods.append(prods[-1] * v)
+    return prods
+
+def _dtlz_sphere(xc, g, obj):
+    """Objectives of the spherical DTLZ problems (DTLZ2-4) for the rows of
+    *xc*, the position attributes, and the distance function values *g*."""
+    cos_xc = numpy.cos(0.5*xc*pi)
+    # prods[:, m] is the product of the cosines of the m first attributes
+    prods = numpy.column_stack((numpy.ones(len(xc)), numpy.cumprod(cos_xc, axis=1)))
+    f = numpy.empty((len(xc), obj))
+    f[:, 0] = prods[:, obj-1]
+    f[:, 1:] = prods[:, obj-2::-1] * numpy.sin(0.5*xc[:, ::-1]*pi)
+    return f * (1.0 + g)[:, None]
+
+def _dtlz_theta(X, gval, n_objs):
+    """Objectives of DTLZ5 and DTLZ6 for the rows of *X* and the distance
+    function values *gval*."""
+    theta = pi / (4.0 * (1 + gval))[:, None] * (1 + 2 * gval[:, None] * X[:, 1:])
+    cos_theta = numpy.cos(theta)
+    # prods[:, m] is the product of the m first cos(theta)
+    prods = numpy.column_stack((numpy.ones(len(X)), numpy.cumprod(cos_theta, axis=1)))
+    cos_x0 = numpy.cos(pi / 2.0 * X[:, 0])
+    fit = numpy.empty((len(X), n_objs))
+    fit[:, 0] = cos_x0 * prods[:, -1]
+    for i, m in enumerate(reversed(range(1, n_objs))):
+        if m == 1:
+            fit[:, i+1] = numpy.sin(pi / 2.0 * X[:, 0])
+        else:
+            fit[:, i+1] = cos_x0 * prods[:, m-2] * numpy.sin(theta[:, m-2])
+    return fit * (1 + gval)[:, None]
+
+def _dtlz_theta_one(ind, gval, n_objs):
+    """Objectives of DTLZ5 and DTLZ6 for the individual *ind* and the
+    distance function value *gval*."""
+    theta = lambda x: pi / (4.0 * (1 + gval)) * (1 + 2 * gval * x)
+    # prods[m] is the product of the cos(theta) of the m first attributes
+    # after the first one
+    prods = _prefix_products(cos(theta(a)) for a in ind[1:])
+    fit = [(1 + gval) * cos(pi / 2.0 * ind[0]) * prods[-1]]
+
+    for m in reversed(range(1, n_objs)):
+        if m == 1:
+            fit.append((1 + gval) * sin(pi / 2.0 * ind[0]))
+        else:
+            fit.append((1 + gval) * cos(pi / 2.0 * ind[0]) *
+                       prods[m-2] * sin(theta(ind[m-1])))
+    return fit
+
 @evals_dec
 def dtlz1(individual, obj=3):
     """DTLZ1 multiobjective function. It returns a tuple of *obj* values.
@@ -571,8 +765,9 @@ def dtlz1(individual, obj=3):
 
     """
     g = 100 * (len(individual[obj-1:]) + sum((xi-0.5)**2 - cos(20*pi*(xi-0.5)) for xi in individual[obj-1:]))
-    f = [0.5 * reduce(mul, individual[:obj-1], 1) * (1 + g)]
-    f.extend(0.5 * reduce(mul, individual[:m], 1) * (1 - individual[m]) * (1 + g) for m in reversed(xrange(obj-1)))
+    prods = _prefix_products(individual[:obj-1])
+    f = [0.5 * prods[obj-1] * (1 + g)]
+    f.extend(0.5 * prods[m] * (1 - individual[m]) * (1 + g) for m in reversed(range(obj-1)))
     return f
 dtlz1.dimension = 6  # 10
 dtlz1.nadir = [1., 1., 1.]    # PF: (sum fi) = 1, fi > 0
@@ -580,6 +775,18 @@ dtlz1.bound_low = [0.] + [0.]*(dtlz1.dimension-1)
 dtlz1.bound_up = [1.] + [1.]*(dtlz1.dimension-1)
 dtlz1.crits = 3
 
+def _dtlz1_batch(X, obj=3):
+    xc = X[:, :obj-1]
+    xm = X[:, obj-1:]
+    g = 100 * (xm.shape[1] + ((xm-0.5)**2 - numpy.cos(20*pi*(xm-0.5))).sum(axis=1))
+    # prods[:, m] is the product of the m first attributes
+    prods = numpy.column_stack((numpy.ones(len(X)), numpy.cumprod(xc, axis=1)))
+    f = numpy.empty((len(X), obj))
+    f[:, 0] = prods[:, obj-1]
+    f[:, 1:] = prods[:, obj-2::-1] * (1 - xc[:, ::-1])
+    return 0.5 * f * (1 + g)[:, None]
+dtlz1.batch = _dtlz1_batch
+
 @evals_dec
 def dtlz2(individual, obj=3):
     """DTLZ2 multiobjective function. It returns a tuple of *obj* values.
@@ -604,8 +811,9 @@ def dtlz2(individual, obj=3):
     xc = individual[:obj-1]
     xm = individual[obj-1:]
     g = sum((xi-0.5)**2 for xi in xm)
-    f = [(1.0+g) *  reduce(mul, (cos(0.5*xi*pi) for xi in xc), 1.0)]
-    f.extend((1.0+g) * reduce(mul, (cos(0.5*xi*pi) for xi in xc[:m]), 1) * sin(0.5*xc[m]*pi) for m in range(obj-2, -1, -1))
+    prods = _prefix_products(cos(0.5*xi*pi) for xi in xc)
+    f = [(1.0+g) * prods[obj-1]]
+    f.extend((1.0+g) * prods[m] * sin(0.5*xc[m]*pi) for m in range(obj-2, -1, -1))
 
     return f
 dtlz2.dimension = 6  # 10
@@ -614,6 +822,13 @@ dtlz2.bound_low = [0.] + [0.]*(dtlz2.dimension-1)
 dtlz2.bound_up = [1.] + [1.]*(dtlz2.dimension-1)
 dtlz2.crits = 3
 
+def _dtlz2_batch(X, obj=3):
+    xc = X[:, :obj-1]
+    xm = X[:, obj-1:]
+    g = ((xm-0.5)**2).sum(axis=1)
+    return _dtlz_sphere(xc, g, obj)
+dtlz2.batch = _dtlz2_batch
+
 @evals_dec
 def dtlz3(individual, obj=3):
     """DTLZ3 multiobjective function. It returns a tuple of *obj* values.
@@ -638,8 +853,9 @@ def dtlz3(individual, obj=3):
     xc = individual[:obj-1]
     xm = individual[obj-1:]
     g = 100 * (len(xm) + sum((xi-0.5)**2 - cos(20*pi*(xi-0.5)) for xi in xm))
-    f = [(1.0+g) *  reduce(mul, (cos(0.5*xi*pi) for xi in xc), 1.0)]
-    f.extend((1.0+g) * reduce(mul, (cos(0.5*xi*pi) for xi in xc[:m]), 1) * sin(0.5*xc[m]*pi) for m in range(obj-2, -1, -1))
+    prods = _prefix_products(cos(0.5*xi*pi) for xi in xc)
+    f = [(1.0+g) * prods[obj-1]]
+    f.extend((1.0+g) * prods[m] * sin(0.5*xc[m]*pi) for m in range(obj-2, -1, -1))
     return f
 dtlz3.dimension = 6  # 10
 dtlz3.nadir = [1.5, 1.5, 1.5]
@@ -647,6 +863,13 @@ dtlz3.bound_low = [0.] + [0.]*(dtlz3.dimension-1)
 dtlz3.bound_up = [1.] + [1.]*(dtlz3.dimension-1)
 dtlz3.crits = 3
 
+def _dtlz3_batch(X, obj=3):
+    xc = X[:, :obj-1]
+    xm = X[:, obj-1:]
+    g = 100 * (xm.shape[1] + ((xm-0.5)**2 - numpy.cos(20*pi*(xm-0.5))).sum(axis=1))
+    return _dtlz_sphere(xc, g, obj)
+dtlz3.batch = _dtlz3_batch
+
 @evals_dec
 def dtlz4(individual, obj=3, alpha=100):
     """DTLZ4 multiobjective function. It returns a tuple of *obj* values. The
@@ -673,8 +896,9 @@ def dtlz4(individual, obj=3, alpha=100):
     xc = individual[:obj-1]
     xm = individual[obj-1:]
     g = sum((xi-0.5)**2 for xi in xm)
-    f = [(1.0+g) *  reduce(mul, (cos(0.5*xi**alpha*pi) for xi in xc), 1.0)]
-    f.extend((1.0+g) * reduce(mul, (cos(0.5*xi**alpha*pi) for xi in xc[:m]), 1) * sin(0.5*xc[m]**alpha*pi) for m in range(obj-2, -1, -1))
+    prods = _prefix_products(cos(0.5*xi**alpha*pi) for xi in xc)
+    f = [(1.0+g) * prods[obj-1]]
+    f.extend((1.0+g) * prods[m] * sin(0.5*xc[m]**alpha*pi) for m in range(obj-2, -1, -1))
     return f
 dtlz4.dimension = 6  # 10
 dtlz4.nadir = [1.5, 1.5, 1.5]
@@ -682,6 +906,13 @@ dtlz4.bound_low = [0.] + [0.]*(dtlz4.dimension-1)
 dtlz4.bound_up = [1.] + [1.]*(dtlz4.dimension-1)
 dtlz4.crits = 3
 
+def _dtlz4_batch(X, obj=3, alpha=100):
+    xc = X[:, :obj-1]
+    xm = X[:, obj-1:]
+    g = ((xm-0.5)**2).sum(axis=1)
+    return _dtlz_sphere(xc**alpha, g, obj)
+dtlz4.batch = _dtlz4_batch
+
 @evals_dec
 def dtlz5(ind, n_objs=3):
     """DTLZ5 multiobjective function. It returns a tuple of *obj* values. The
@@ -691,22 +922,17 @@ def dtlz5(ind, n_objs=3):
     """
     g = lambda x: sum([(a - 0.5)**2 for a in x])
     gval = g(ind[n_objs-1:])
-
-    theta = lambda x: pi / (4.0 * (1 + gval)) * (1 + 2 * gval * x)
-    fit = [(1 + gval) * cos(pi / 2.0 * ind[0]) * reduce(lambda x,y: x*y, [cos(theta(a)) for a in ind[1:]])]
-
-    for m in reversed(range(1, n_objs)):
-        if m == 1:
-            fit.append((1 + gval) * sin(pi / 2.0 * ind[0]))
-        else:
-            fit.append((1 + gval) * cos(pi / 2.0 * ind[0]) *
-                       reduce(lambda x,y: x*y, [cos(theta(a)) for a in ind[1:m-1]], 1) * sin(theta(ind[m-1])))
-    return fit
+    return _dtlz_theta_one(ind, gval, n_objs)
 dtlz5.dimension = 6  # 10
 dtlz5.nadir = [1.5, 1.5, 1.5]
 dtlz5.bound_low = [0.] + [0.]*(dtlz5.dimension-1)
 dtlz5.bound_up = [1.] + [1.]*(dtlz5.dimension-1)
 dtlz5.crits = 3
+
+def _dtlz5_batch(X, n_objs=3):
+    gval = ((X[:, n_objs-1:] - 0.5)**2).sum(axis=1)
+    return _dtlz_theta(X, gval, n_objs)
+dtlz5.batch = _dtlz5_batch
 # Bi-objective case has only one point in Pareto-front
 
 @evals_dec
@@ -717,23 +943,17 @@ def dtlz6(ind, n_objs=3):
     Optimization Test Problems. CEC 2002, p. 825-830, IEEE Press, 2002.
     """
     gval = sum([a**0.1 for a in ind[n_objs-1:]])
-    theta = lambda x: pi / (4.0 * (1 + gval)) * (1 + 2 * gval * x)
-
-    fit = [(1 + gval) * cos(pi / 2.0 * ind[0]) *
-           reduce(lambda x,y: x*y, [cos(theta(a)) for a in ind[1:]])]
-
-    for m in reversed(range(1, n_objs)):
-        if m == 1:
-            fit.append((1 + gval) * sin(pi / 2.0 * ind[0]))
-        else:
-            fit.append((1 + gval) * cos(pi / 2.0 * ind[0]) *
-                       reduce(lambda x,y: x*y, [cos(theta(a)) for a in ind[1:m-1]], 1) * sin(theta(ind[m-1])))
-    return fit
+    return _dtlz_theta_one(ind, gval, n_objs)
 dtlz6.dimension = 6  # 10
 dtlz6.nadir = [1.5, 1.5, 1.5]
 dtlz6.bound_low = [0.] + [0.]*(dtlz6.dimension-1)
 dtlz6.bound_up = [1.] + [1.]*(dtlz6.dimension-1)
 dtlz6.crits = 3
+
+def _dtlz6_batch(X, n_objs=3):
+    gval = (X[:, n_objs-1:]**0.1).sum(axis=1)
+    return _dtlz_theta(X, gval, n_objs)
+dtlz6.batch = _dtlz6_batch
 # Bi-objective case has only one point in Pareto-front
 
 @evals_dec
@@ -753,6 +973,72 @@ dtlz7.bound_low = [0.] + [0.]*(dtlz7.dimension-1)
 dtlz7.bound_up = [1.] + [1.]*(dtlz7.dimension-1)
 dtlz7.crits = 3
 
+def _dtlz7_batch(X, n_objs=3):
+    xc = X[:, :n_objs-1]
+    xm = X[:, n_objs-1:]
+    gval = 1 + 9.0 / xm.shape[1] * xm.sum(axis=1)
+    h = n_objs - (xc / (1.0 + gval)[:, None] * (1 + numpy.sin(3 * pi * xc))).sum(axis=1)
+    return numpy.column_stack((xc, (1 + gval) * h))
+dtlz7.batch = _dtlz7_batch
+
+def _instance(base, dimension, crits, bound_low, bound_up, nadir, *args):
+    """Return a new problem evaluating the objective function and the batch
+    path of the module-level problem *base* with the extra arguments *args*,
+    decorated by :func:`evals_dec` with its own counter and archive, and with
+    the given attributes."""
+    func, batch = base.__wrapped__, base.batch
+    if args:
+        problem = evals_dec(lambda individual: func(individual, *args))
+        problem.batch = lambda X: batch(X, *args)
+    else:
+        problem = evals_dec(func)
+        problem.batch = batch
+    problem.__name__ = func.__name__
+    problem.__doc__ = func.__doc__
+    problem.dimension = dimension
+    problem.nadir = nadir
+    problem.bound_low = bound_low
+    problem.bound_up = bound_up
+    problem.crits = crits
+    return problem
+
+# Problem, number k of distance variables recommended by Deb et al. and
+# nadir point for a number of objectives of the DTLZ family
+_dtlz_family = {
+    1: (dtlz1, 5, lambda n_objs: [1.] * n_objs),
+    2: (dtlz2, 10, lambda n_objs: [1.5] * n_objs),
+    3: (dtlz3, 10, lambda n_objs: [1.5] * n_objs),
+    4: (dtlz4, 10, lambda n_objs: [1.5] * n_objs),
+    5: (dtlz5, 10, lambda n_objs: [1.5] * n_objs),
+    6: (dtlz6, 10, lambda n_objs: [1.5] * n_objs),
+    7: (dtlz7, 20, lambda n_objs: [15.] * (n_objs - 1) + [5. * n_objs]),
+}
+
+def dtlz(number, n_objs=3, dimension=None):
+    """Return a new DTLZ*number* problem, 1 to 7, with *n_objs* objectives in
+    *dimension* variables, ``n_objs + k - 1`` by default where k is 5 for
+    DTLZ1, 20 for DTLZ7 and 10 otherwise. The problem is decorated by
+    :func:`evals_dec` with its own counter and archive, and has the batch
+    path and the nadir, bounds, dimension and crits attributes, so that
+    many-objective variants can be made, e.g. ``dtlz(2, 10)``. ::
+
+        problem = dtlz(2, n_objs=5)
+        values = problem(numpy.random.rand(100, problem.dimension))
+
+    The objectives are computed from cumulative products of the position
+    attributes, in O(n_objs) per individual.
+    """
+    if number not in _dtlz_family:
+        raise ValueError("There is no DTLZ%s problem" % number)
+    base, k, nadir = _dtlz_family[number]
+    if dimension is None:
+        dimension = n_objs + k - 1
+    if n_objs < 2 or dimension < n_objs:
+        raise ValueError("DTLZ%d needs at least 2 objectives and as many "
+                         "variables, got %d and %d" % (number, n_objs, dimension))
+    return _instance(base, dimension, n_objs, [0.] * dimension, [1.] * dimension,
+                     nadir(n_objs), n_objs)
+
 def fonseca(individual):
     """Fonseca and Fleming's multiobjective function.
     From: C. M. Fonseca and P. J. Fleming, "Multiobjective optimization and
@@ -833,6 +1119,12 @@ ep1.bound_up = [2., 2.]
 ep1.dimension = 2.
 ep1.crits = 2
 
+def _ep1_batch(X):
+    f1 = X[:, 0]
+    f2 = numpy.minimum(numpy.abs(X[:, 0] - 1.), 1.5-X[:, 0]) + X[:, 1] + 1
+    return numpy.column_stack((f1, f2))
+ep1.batch = _ep1_batch
+
 
 @evals_dec
 def ep2(xs):
@@ -854,17 +1146,104 @@ ep2.bound_up = [1., 1.]
 ep2.dimension = 2.
 ep2.crits = 2
 
-
-def get_problem(func_name):
-    if (func_name == 'zdt1'): return zdt1
-    if (func_name == 'zdt2'): return zdt2
-    if (func_name == 'zdt3'): return zdt3
-    if (func_name == 'zdt4'): return zdt4
-    if (func_name == 'zdt6'): return zdt6
-    if (func_name == 'dtlz1'): return dtlz1
-    if (func_name == 'dtlz2'): return dtlz2
-    if (func_name == 'dtlz3'): return dtlz3
-    if (func_name == 'dtlz4'): return dtlz4
-    if (func_name == 'dtlz5'): return dtlz5
-    if (func_name == 'dtlz6'): return dtlz6
-    if (func_name == 'dtlz7'): return dtlz7
+def _ep2_batch(X):
+    f1 = (X[:, 0] - 1.)*X[:, 1]*X[:, 1] + 1.
+    f2 = X[:, 1]
+    return numpy.column_stack((f1, f2))
+ep2.batch = _ep2_batch
+
+
+def _two_objectives(base, scalable=True):
+    """Return the builder of the bi-objective problem *base*, whose first
+    variable and other variables have the bounds of its first two ones."""
+    name = base.__wrapped__.__name__
+    def build(dimension=None, n_objs=None):
+        if dimension is None:
+            dimension = int(base.dimension)
+        if n_objs not in (None, base.crits):
+            raise ValueError("%s has %d objectives, got %d"
+                             % (name, base.crits, n_objs))
+        if dimension < 2 or not scalable and dimension != base.dimension:
+            raise ValueError("%s cannot have %d variables" % (name, dimension))
+        bound_low = base.bound_low[:1] + base.bound_low[1:2] * (dimension - 1)
+        bound_up = base.bound_up[:1] + base.bound_up[1:2] * (dimension - 1)
+        return _instance(base, dimension, base.crits, bound_low, bound_up,
+                         list(base.nadir))
+    return build
+
+def _dtlz_builder(number):
+    """Return the builder of the DTLZ*number* problem, which keeps the number
+    of distance variables of the module-level problem by default."""
+    base = _dtlz_family[number][0]
+    def build(dimension=None, n_objs=None):
+        if n_objs is None:
+            n_objs = base.crits
+        if dimension is None:
+            dimension = base.dimension + n_objs - base.crits
+        return dtlz(number, n_objs, dimension)
+    return build
+
+# Builders of the problems which can be run, called with the dimension and
+# the number of objectives, None for the defaults
+_registry = {
+    'zdt1': _two_objectives(zdt1),
+    'zdt2': _two_objectives(zdt2),
+    'zdt3': _two_objectives(zdt3),
+    'zdt4': _two_objectives(zdt4),
+    'zdt6': _two_objectives(zdt6),
+    'ep1': _two_objectives(ep1, scalable=False),
+    'ep2': _two_objectives(ep2, scalable=False),
+}
+# Problems whose builder takes any number of objectives
+_scalable_objectives = set()
+for number in _dtlz_family:
+    _registry['dtlz%d' % number] = _dtlz_builder(number)
+    _scalable_objectives.add('dtlz%d' % number)
+del number
+
+def register_problem(name, build, scalable_objectives=False):
+    """Register the problem *name*: *build* is called by :func:`get_problem`
+    with the dimension and the number of objectives, None for the defaults,
+    and returns a new problem decorated by :func:`evals_dec` with the batch,
+    dimension, nadir, bound_low, bound_up and crits attributes. Whether
+    *build* takes any number of objectives is given by
+    *scalable_objectives*."""
+    _registry[name] = build
+    if scalable_objectives:
+        _scalable_objectives.add(name)
+    else:
+        _scalable_objectives.discard(name)
+
+def has_scalable_objectives(func_name):
+    """Whether the registered problem *func_name* can be built with any
+    number of objectives, as the DTLZ problems."""
+    return func_name in _scalable_objectives
+
+def problem_names():
+    """Return the sorted names of the registered problems."""
+    return sorted(_registry)
+
+def get_problem(func_name, dimension=None, n_objs=None):
+    """Return a new instance of the registered problem *func_name* with
+    *dimension* variables and *n_objs* objectives, those of the module-level
+    problem by default. Every instance has its own evaluation counter and
+    archive, so that many of them can be run in the same process. ::
+
+        problem = get_problem('dtlz2', dimension=14, n_objs=5)
+    """
+    try:
+        build = _registry[func_name]
+    except KeyError:
+        raise ValueError("Unknown problem %r, choose one of %s"
+                         % (func_name, ', '.join(problem_names())))
+    return build(dimension, n_objs)
+
+
+def evaluate_chunk(func_name, individuals, n_objs=None):
+    '''Return the objective values of the rows of *individuals* for the
+    problem *func_name* with *n_objs* objectives. It is meant to be sent to
+    worker processes, where the evaluation counter and the archive of the
+    decorated problem would be lost, so the values are neither counted nor
+    archived: the parent process passes them to the *record* method of its
+    own problem.'''
+    return get_problem(func_name, individuals.shape[1], n_objs).evaluate(individuals)
@@ -0,0 +1,157 @@
+"""Logs of an NSGA-II run: one stats record (calls, hypervolume, uniformity
+and the optional quality indicators) per generation and the Pareto front
+found at the end.
+
+:class:`TextLog` writes the historical text files, one flushed line per
+record. :class:`NpyLog` buffers the records and writes them in bulk to
+``.npy`` files with full float precision, which numpy can load or
+memory-map. They can be exported to the text format with :func:`export_text`
+or from the command line::
+
+    python runlog.py log/stats_zdt1_30__nsga2_1.npy log/front_zdt1_30__nsga2_1.npy
+"""
+import os
+import sys
+
+import numpy
+
+
+class TextLog(object):
+    """Stats and front logged as text: ``'%d %f %f'`` lines, with one more
+    ``' %f'`` per indicator, written and flushed one by one, and
+    ``str(point)`` lines.
+
+    :param stats_path: Path of the stats file.
+    :param front_path: Path of the front file.
+    :param position: Position returned by :meth:`tell` to continue the stats
+                     from, e.g. when a run is resumed; the stats file is
+                     truncated there. A new file is started by default.
+    :param columns: Number of values of a record, 3 and the number of
+                    indicators and of the other values logged after them.
+    """
+    extension = 'txt'
+
+    def __init__(self, stats_path, front_path, position=None, columns=3):
+        self.line = '%d' + ' %f' * (columns - 1) + '\n'
+        if position is None:
+            self.stats_file = open(stats_path, 'w')
+        else:
+            self.stats_file = open(stats_path, 'r+')
+            self.stats_file.truncate(position)
+            self.stats_file.seek(position)
+        self.front_path = front_path
+
+    def write_stats(self, calls, hv, uni, *indicators):
+        self.stats_file.write(self.line % ((calls, hv, uni) + indicators))
+        self.stats_file.flush()
+
+    def write_front(self, front):
+        with open(self.front_path, 'w') as front_file:
+            for p in front:
+                front_file.write(str(p) +'\n')
+
+    def tell(self):
+        return self.stats_file.tell()
+
+    def close(self):
+        self.stats_file.close()
+
+
+class NpyLog(object):
+    """Stats and front logged as ``.npy`` files of ``float64``: the stats as
+    a ``(n, columns)`` array of the calls, the hypervolume, the uniformity
+    and the indicators, and the front as a ``(k, m)`` array.
+
+    The stats records are kept in memory and appended to the file by
+    batches of *buffer_size*, when :meth:`tell` is called and on
+    :meth:`close`, so a run makes a few large writes instead of one flushed
+    line per generation. The header of the file has a fixed size and is
+    rewritten after every batch, so the file is always a valid ``.npy``
+    array of the records written so far.
+    """
+    extension = 'npy'
+    header_size = 128
+
+    def __init__(self, stats_path, front_path, position=None, columns=3,
+                 buffer_size=100):
+        self.front_path = front_path
+        self.columns = columns
+        self.buffer_size = buffer_size
+        self.records = []
+        if position is None:
+            self.stats_file = open(stats_path, 'w+b')
+            self.size = 0
+        else:
+            self.stats_file = open(stats_path, 'r+b')
+            self.size = position
+            self.stats_file.truncate(self.header_size + 8 * self.columns * position)
+        self._write_header()
+
+    def _write_header(self):
+        header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }" % (
+            self.size, self.columns)
+        # Magic string, version 1.0, header length and the padded header
+        length = self.header_size - 10
+        header = header.ljust(length - 1) + '\n'
+        self.stats_file.seek(0)
+        self.stats_file.write(b'\x93NUMPY\x01\x00' +
+                              numpy.array(length, '<u2').tobytes() +
+                              header.encode('latin1'))
+        self.stats_file.seek(0, os.SEEK_END)
+
+    def write_stats(self, calls, hv, uni, *indicators):
+        self.records.append((calls, hv, uni) + indicators)
+        if len(self.records) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered records to the stats file."""
+        if not self.records:
+            return
+        self.stats_file.write(numpy.array(self.records, dtype='<f8').tobytes())
+        self.size += len(self.records)
+        self.records = []
+        self._write_header()
+        self.stats_file.flush()
+
+    def write_front(self, front):
+        points = numpy.array(front, dtype='<f8')
+        numpy.save(self.front_path, points.reshape(len(points), -1))
+
+    def tell(self):
+        """Flush the buffered records and return the number of records."""
+        self.flush()
+        return self.size
+
+    def close(self):
+        self.flush()
+        self.stats_file.close()
+
+
+def export_text(stats_path, front_path=None):
+    """Write the text version of the ``.npy`` stats file and, if given, of
+    the ``.npy`` front file of a run next to them, with the ``.txt``
+    extension. The files are the same as those written by :class:`TextLog`.
+    Return the paths of the written files.
+    """
+    written = []
+    stats = numpy.load(stats_path)
+    path = os.path.splitext(stats_path)[0] + '.txt'
+    line = '%d' + ' %f' * (stats.shape[1] - 1) + '\n'
+    with open(path, 'w') as stats_file:
+        for record in stats.tolist():
+            stats_file.write(line % tuple(record))
+    written.append(path)
+    if front_path is not None:
+        front = numpy.load(front_path)
+        path = os.path.splitext(front_path)[0] + '.txt'
+        with open(path, 'w') as front_file:
+            for p in front.tolist():
+                front_file.write(str(tuple(p)) +'\n')
+        written.append(path)
+    return written
+
+
+if __name__ == '__main__':
+    for path in export_text(*sys.argv[1:3]):
+        print(path)
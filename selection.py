@@ -0,0 +1,311 @@
+"""Non-dominated sorting, NSGA-II and SMS-EMOA selections working on the
+matrix of the objective values of a population instead of on the individuals
+one by one.
+"""
+import bisect
+
+import numpy
+
+from _hypervolume import contributions
+
+
+def sort_nondominated(objectives):
+    """Sort the rows of the ``(n, m)`` array *objectives* into Pareto fronts,
+    minimization is implicitly assumed. Return the list of the fronts, each
+    being a list of row indices.
+
+    The rows are processed in lexicographic order, so a row can only be
+    dominated by the rows before it and the fronts it is compared with are
+    found by a binary search (efficient non-dominated sort, ENS-BS). With two
+    objectives a front is tested in constant time, which makes the sort
+    O(n log n). With three objectives every front keeps the sorted staircase
+    of its rows in the last two objectives, a front is tested by a bisection
+    and the sort is O(n log^2 n) up to the insertions in the staircases.
+    With more objectives a front is tested at once with numpy, which is
+    O(m n^2) in the worst case: about 2 s for 20000 rows of 5 objectives.
+    """
+    objectives = numpy.asarray(objectives, dtype=numpy.float64)
+    n = len(objectives)
+    if n == 0:
+        return []
+    order = numpy.lexsort(objectives.T[::-1])
+    if objectives.shape[1] == 2:
+        return _sort_2d(objectives, order)
+    if objectives.shape[1] == 3:
+        return _sort_3d(objectives, order)
+    return _sort_nd(objectives, order)
+
+
+def _sort_2d(objectives, order):
+    # In lexicographic order the second objective is non-increasing within a
+    # front, so a row is dominated by a front if and only if it is dominated
+    # by the last row added to it, i.e. if (f2, f1) of that row is lower. The
+    # keys of the fronts are increasing, the first front not dominating the
+    # row is found by bisection.
+    fronts = []
+    keys = []
+    for i in order.tolist():
+        key = (objectives[i, 1], objectives[i, 0])
+        k = bisect.bisect_left(keys, key)
+        if k == len(fronts):
+            fronts.append([i])
+            keys.append(key)
+        else:
+            fronts[k].append(i)
+            keys[k] = key
+    return fronts
+
+
+def _sort_3d(objectives, order):
+    # The rows before a row in lexicographic order are lower or equal in the
+    # first objective, so one of them dominates it if it is lower or equal
+    # in the last two objectives and is not equal to it. Every front keeps
+    # the staircase of the non-dominated (f2, f3) of its rows, f2 ascending
+    # and f3 descending, with the f1 of the first row of every step: the
+    # step with the highest f2 lower or equal to that of the row has the
+    # lowest f3 among them.
+    fronts = []
+    stairs = []     # (f2s, f3s, f1s) of every front
+    values = objectives.tolist()
+
+    def dominated_by(k, f1, f2, f3):
+        f2s, f3s, f1s = stairs[k]
+        j = bisect.bisect_right(f2s, f2) - 1
+        if j < 0 or f3s[j] > f3:
+            return False
+        # An equal step only dominates the row if it is lower in f1
+        return f2s[j] < f2 or f3s[j] < f3 or f1s[j] < f1
+
+    for i in order.tolist():
+        f1, f2, f3 = values[i]
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if dominated_by(mid, f1, f2, f3):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append([])
+            stairs.append(([], [], []))
+        fronts[lo].append(i)
+
+        # The row is not dominated by the front, it is a new step unless it
+        # is a copy of a step, and removes the steps it dominates in (f2, f3)
+        f2s, f3s, f1s = stairs[lo]
+        j = bisect.bisect_left(f2s, f2)
+        if j < len(f2s) and f2s[j] == f2 and f3s[j] == f3:
+            continue
+        k = j
+        while k < len(f2s) and f3s[k] >= f3:
+            k += 1
+        f2s[j:k] = [f2]
+        f3s[j:k] = [f3]
+        f1s[j:k] = [f1]
+    return fronts
+
+
+def _sort_nd(objectives, order):
+    n, nobj = objectives.shape
+    fronts = []
+    members = []    # rows of every front, in a growing array
+    sizes = []
+
+    def dominated_by(k, p):
+        # The rows of the front come before p in lexicographic order, so one
+        # of them dominates p if it is lower or equal in every objective and
+        # is not equal to p.
+        rows = members[k][:sizes[k]]
+        weakly = rows[:, 0] <= p[0]
+        for m in range(1, nobj):
+            weakly &= rows[:, m] <= p[m]
+        return weakly.any() and (rows[weakly] != p).any()
+
+    for i in order.tolist():
+        p = objectives[i]
+        # The fronts dominating the row come first, find the first which
+        # does not
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if dominated_by(mid, p):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append([])
+            members.append(numpy.empty((16, nobj)))
+            sizes.append(0)
+        elif sizes[lo] == len(members[lo]):
+            members[lo] = numpy.resize(members[lo], (2 * sizes[lo], nobj))
+        fronts[lo].append(i)
+        members[lo][sizes[lo]] = p
+        sizes[lo] += 1
+    return fronts
+
+
+def crowding_distance(objectives):
+    """Return the crowding distances of the rows of the ``(n, m)`` array
+    *objectives*, computed the same way as DEAP's ``assignCrowdingDist``:
+    infinite for the extreme rows of every objective, otherwise the sum over
+    the objectives of the normalized distance between the two neighbours.
+    """
+    objectives = numpy.asarray(objectives, dtype=numpy.float64)
+    n, nobj = objectives.shape
+    distances = numpy.zeros(n)
+    if n == 0:
+        return distances
+    order = numpy.arange(n)
+    for m in range(nobj):
+        # Stable sorts of the previous order, ties are broken as in DEAP
+        order = order[numpy.argsort(objectives[order, m], kind='mergesort')]
+        values = objectives[order, m]
+        distances[order[0]] = float("inf")
+        distances[order[-1]] = float("inf")
+        if values[-1] == values[0]:
+            continue
+        norm = nobj * float(values[-1] - values[0])
+        distances[order[1:-1]] += (values[2:] - values[:-2]) / norm
+    return distances
+
+
+def sel_nsga2(individuals, k):
+    """Select *k* individuals with the NSGA-II environmental selection. This
+    is a drop-in replacement of DEAP's ``tools.selNSGA2``: the individuals
+    are sorted into fronts on the matrix of their weighted fitness values,
+    the crowding distance of every front used is stored in
+    ``fitness.crowding_dist`` (needed by ``selTournamentDCD``) and the last
+    front is truncated by decreasing crowding distance. ::
+
+        toolbox.register("select", sel_nsga2)
+
+    :param individuals: A list of individuals to select from.
+    :param k: The number of individuals to select.
+    """
+    if k == 0 or not individuals:
+        return []
+    # Weighted values are maximized
+    objectives = -numpy.array([ind.fitness.wvalues for ind in individuals])
+    values = numpy.array([ind.fitness.values for ind in individuals])
+
+    chosen = []
+    for front in sort_nondominated(objectives):
+        distances = crowding_distance(values[front])
+        for i, dist in zip(front, distances.tolist()):
+            individuals[i].fitness.crowding_dist = dist
+        if len(chosen) + len(front) <= k:
+            chosen.extend(individuals[i] for i in front)
+        else:
+            last = sorted((individuals[i] for i in front),
+                          key=lambda ind: ind.fitness.crowding_dist,
+                          reverse=True)
+            chosen.extend(last[:k - len(chosen)])
+        if len(chosen) >= k:
+            break
+    return chosen
+
+
+def select_nsga2(objectives, k):
+    """Select *k* rows of the ``(n, m)`` array *objectives* with the NSGA-II
+    environmental selection, minimization is implicitly assumed. Return the
+    array of the indices of the selected rows, front by front with the last
+    front truncated by decreasing crowding distance as in ``sel_nsga2``, and
+    the array of their crowding distances within their front.
+    """
+    objectives = numpy.asarray(objectives, dtype=numpy.float64)
+    chosen = []
+    distances = []
+    size = 0
+    for front in sort_nondominated(objectives):
+        front = numpy.array(front)
+        dist = crowding_distance(objectives[front])
+        if size + len(front) > k:
+            last = numpy.argsort(-dist, kind='mergesort')[:k - size]
+            front, dist = front[last], dist[last]
+        chosen.append(front)
+        distances.append(dist)
+        size += len(front)
+        if size >= k:
+            break
+    if not chosen:
+        return numpy.empty(0, dtype=int), numpy.empty(0)
+    return numpy.concatenate(chosen), numpy.concatenate(distances)
+
+
+def _truncate_by_contribution(points, k, ref=None):
+    """Return the positions of the *k* rows of *points* left after removing
+    one by one the row of the least hypervolume contribution to the
+    remaining rows, the first one in case of ties. *ref* is the maximum of
+    the rows plus one in every objective by default."""
+    if ref is None:
+        ref = points.max(axis=0) + 1.0
+    ref = [float(r) for r in ref]
+    keep = numpy.arange(len(points))
+    while len(keep) > k:
+        worst = numpy.argmin(contributions(points[keep], ref))
+        keep = numpy.delete(keep, worst)
+    return keep
+
+
+def sel_sms_emoa(individuals, k, ref=None):
+    """Select *k* individuals with the SMS-EMOA environmental selection:
+    whole fronts are kept as in ``sel_nsga2`` and the last front is
+    truncated by removing its individual of least exclusive hypervolume
+    contribution until *k* are left, the contributions being computed again
+    after every removal. The crowding distance of every front used is still
+    stored in ``fitness.crowding_dist`` for ``selTournamentDCD``. ::
+
+        toolbox.register("select", sel_sms_emoa)
+
+    :param individuals: A list of individuals to select from.
+    :param k: The number of individuals to select.
+    :param ref: Reference point of the contributions in the space of the
+                negated weighted fitness values (the objective values when
+                minimizing), by default the worst values of the last front
+                plus one.
+    """
+    if k == 0 or not individuals:
+        return []
+    # Weighted values are maximized
+    objectives = -numpy.array([ind.fitness.wvalues for ind in individuals])
+    values = numpy.array([ind.fitness.values for ind in individuals])
+
+    chosen = []
+    for front in sort_nondominated(objectives):
+        distances = crowding_distance(values[front])
+        for i, dist in zip(front, distances.tolist()):
+            individuals[i].fitness.crowding_dist = dist
+        if len(chosen) + len(front) > k:
+            kept = _truncate_by_contribution(objectives[front], k - len(chosen), ref)
+            front = [front[i] for i in kept]
+        chosen.extend(individuals[i] for i in front)
+        if len(chosen) >= k:
+            break
+    return chosen
+
+
+def select_sms_emoa(objectives, k, ref=None):
+    """Select *k* rows of the ``(n, m)`` array *objectives* with the SMS-EMOA
+    environmental selection of ``sel_sms_emoa``, minimization is implicitly
+    assumed. Return the array of the indices of the selected rows and the
+    array of their crowding distances within their whole front, as
+    ``select_nsga2``.
+    """
+    objectives = numpy.asarray(objectives, dtype=numpy.float64)
+    chosen = []
+    distances = []
+    size = 0
+    for front in sort_nondominated(objectives):
+        front = numpy.array(front)
+        dist = crowding_distance(objectives[front])
+        if size + len(front) > k:
+            kept = _truncate_by_contribution(objectives[front], k - size, ref)
+            front, dist = front[kept], dist[kept]
+        chosen.append(front)
+        distances.append(dist)
+        size += len(front)
+        if size >= k:
+            break
+    if not chosen:
+        return numpy.empty(0, dtype=int), numpy.empty(0)
+    return numpy.concatenate(chosen), numpy.concatenate(distances)
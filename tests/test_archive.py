@@ -0,0 +1,210 @@
+"""The archives of archive.py."""
+import os
+import pickle
+import sys
+import unittest
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _hypervolume
+import problems
+from archive import ParetoArchive, BoundedParetoArchive, EpsilonArchive
+
+
+def random_stream(rng, size, n_objs):
+    # Values on a coarse grid, so that ties and copies are frequent, and
+    # random ones
+    grid = rng.randint(0, 6, (size, n_objs)) / 5.0
+    values = rng.uniform(0., 1., (size, n_objs))
+    return numpy.where(rng.uniform(size=(size, 1)) < 0.5, grid, values)
+
+
+def non_dominated_stream(rng, size, n_objs):
+    # Distinct points of the unit simplex, which do not dominate each other
+    points = rng.uniform(0., 1., (size, n_objs))
+    return points / points.sum(axis=1)[:, None]
+
+
+class Removals(object):
+    # Observer of an archive keeping the vectors removed from it
+    def __init__(self):
+        self.vectors = []
+
+    def insert(self, vals):
+        pass
+
+    def remove(self, vals):
+        self.vectors.append(vals)
+
+
+def box_dominates(b1, b2):
+    return all(a <= b for a, b in zip(b1, b2))
+
+
+class ParetoArchiveTest(unittest.TestCase):
+    def test_update(self):
+        rng = numpy.random.RandomState(0)
+        for n_objs in (2, 3, 4):
+            for _ in range(20):
+                archive = ParetoArchive()
+                expected = []
+                for vals in random_stream(rng, 200, n_objs).tolist():
+                    vals = tuple(vals)
+                    self.assertEqual(archive.update(vals),
+                                     problems.update_pareto_front(vals, expected))
+                    self.assertEqual(sorted(archive), sorted(expected))
+                self.assertEqual(sorted(map(tuple, archive.points.tolist())), sorted(expected))
+
+    def test_update_many(self):
+        rng = numpy.random.RandomState(1)
+        for n_objs in (2, 3):
+            for _ in range(20):
+                archive = ParetoArchive()
+                expected = []
+                rows = random_stream(rng, 300, n_objs)
+                added = sum(problems.update_pareto_front(tuple(vals), expected)
+                            for vals in rows.tolist())
+                self.assertEqual(archive.update_many(rows), added)
+                self.assertEqual(sorted(archive), sorted(expected))
+
+    def test_sorted(self):
+        rng = numpy.random.RandomState(2)
+        for n_objs in (2, 3):
+            archive = ParetoArchive()
+            archive.update_many(random_stream(rng, 500, n_objs))
+            first = archive.points[:, 0]
+            self.assertTrue((first[1:] >= first[:-1]).all())
+            self.assertEqual([tuple(row) for row in archive.points.tolist()], list(archive))
+
+
+class BoundedParetoArchiveTest(unittest.TestCase):
+    def test_capacity(self):
+        rng = numpy.random.RandomState(3)
+        for n_objs in (2, 3):
+            for prune in ('crowding', 'hv'):
+                archive = BoundedParetoArchive(30, prune)
+                for vals in random_stream(rng, 1000, n_objs).tolist():
+                    archive.update(tuple(vals))
+                    self.assertLessEqual(len(archive), 30)
+                    first = archive.points[:, 0]
+                    self.assertTrue((first[1:] >= first[:-1]).all())
+                    self.assertEqual([tuple(row) for row in archive.points.tolist()],
+                                     list(archive))
+                archive.update_many(random_stream(rng, 500, n_objs))
+                self.assertLessEqual(len(archive), 30)
+
+    def test_discarded(self):
+        # No vector of the stream dominates another, every one is accepted
+        # and the archive is pruned back to its capacity minus its batch
+        rng = numpy.random.RandomState(4)
+        for n_objs in (2, 3):
+            for prune in ('crowding', 'hv'):
+                archive = BoundedParetoArchive(40, prune, slack=0.25)
+                removals = Removals()
+                archive.observers.append(removals)
+                discarded = 0
+                for i, vals in enumerate(non_dominated_stream(rng, 500, n_objs).tolist()):
+                    self.assertTrue(archive.update(tuple(vals)))
+                    self.assertEqual(archive.discarded, i + 1 - len(archive))
+                    if archive.discarded > discarded:
+                        self.assertEqual(len(archive), 30)
+                        discarded = archive.discarded
+                self.assertGreater(discarded, 0)
+                self.assertEqual(len(removals.vectors), archive.discarded)
+
+    def test_extremes(self):
+        # The crowding distance keeps the best vector of every objective
+        rng = numpy.random.RandomState(5)
+        for n_objs in (2, 3, 4):
+            archive = BoundedParetoArchive(20)
+            stream = non_dominated_stream(rng, 400, n_objs)
+            archive.update_many(stream)
+            for m in range(n_objs):
+                self.assertIn(tuple(stream[numpy.argmin(stream[:, m])]), list(archive))
+
+    def test_hv(self):
+        # The vectors of least hypervolume contribution are removed
+        rng = numpy.random.RandomState(6)
+        for n_objs in (2, 3):
+            for ref in (None, [1.5] * n_objs):
+                archive = BoundedParetoArchive(1000, 'hv', ref=ref)
+                archive.update_many(non_dominated_stream(rng, 60, n_objs))
+                points = archive.points
+                contributions = _hypervolume.contributions(
+                    points, ref or (points.max(axis=0) + 1.0).tolist())
+                expected = set(map(tuple, points[numpy.argsort(contributions)[10:]].tolist()))
+                archive._prune(10)
+                self.assertEqual(set(archive), expected)
+                self.assertEqual(archive.discarded, 10)
+                self.assertEqual(len(archive.points), 50)
+
+
+class EpsilonArchiveTest(unittest.TestCase):
+    def assertConsistent(self, archive):
+        n = len(archive)
+        self.assertEqual(len(archive._keys), n)
+        self.assertEqual(len(archive._index), n)
+        points = archive.points
+        for row, key in enumerate(archive._keys):
+            self.assertEqual(archive._index[key], row)
+            self.assertEqual(archive._boxes[row].tolist(), list(key))
+            self.assertEqual(tuple(numpy.floor(points[row] / archive.eps).astype(int)), key)
+            self.assertEqual(tuple(points[row]), tuple(archive[row]))
+
+    def test_boxes(self):
+        rng = numpy.random.RandomState(7)
+        for n_objs in (2, 3, 4):
+            eps = rng.uniform(0.02, 0.1, n_objs)
+            archive = EpsilonArchive(eps)
+            offered = []
+            for vals in random_stream(rng, 1500, n_objs).tolist():
+                vals = tuple(vals)
+                offered.append(vals)
+                archive.update(vals)
+                if len(offered) % 100 == 0:
+                    self.assertConsistent(archive)
+            self.assertConsistent(archive)
+            keys = archive._keys
+            # The archived boxes do not dominate each other
+            for b1 in keys:
+                for b2 in keys:
+                    self.assertFalse(b1 != b2 and box_dominates(b1, b2))
+            # Every vector offered is in a box dominated by an archived one
+            for vals in offered:
+                box = tuple(numpy.floor(numpy.array(vals) / eps).astype(int).tolist())
+                self.assertTrue(any(box_dominates(key, box) for key in keys))
+            self.assertTrue(set(archive) <= set(offered))
+
+    def test_same_box(self):
+        archive = EpsilonArchive([0.5, 0.5])
+        self.assertTrue(archive.update((0.4, 0.4)))
+        # Dominated, then closer to the corner, then dominating
+        self.assertFalse(archive.update((0.45, 0.45)))
+        self.assertTrue(archive.update((0.1, 0.3)))
+        self.assertFalse(archive.update((0.45, 0.05)))
+        self.assertTrue(archive.update((0.05, 0.2)))
+        self.assertEqual(list(archive), [(0.05, 0.2)])
+        # A box dominating the archived one replaces it
+        self.assertFalse(archive.update((0.6, 0.3)))
+        self.assertTrue(archive.update((0.3, -0.2)))
+        self.assertEqual(list(archive), [(0.3, -0.2)])
+        self.assertConsistent(archive)
+
+    def test_pickle(self):
+        rng = numpy.random.RandomState(8)
+        for n_objs in (2, 3):
+            archive = EpsilonArchive([0.05] * n_objs)
+            archive.update_many(random_stream(rng, 500, n_objs))
+            copy = pickle.loads(pickle.dumps(archive, 2))
+            self.assertEqual(list(copy), list(archive))
+            self.assertConsistent(copy)
+            for vals in random_stream(rng, 500, n_objs).tolist():
+                self.assertEqual(copy.update(tuple(vals)), archive.update(tuple(vals)))
+            self.assertEqual(list(copy), list(archive))
+            self.assertConsistent(copy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""The callback is called with the results of the run."""
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nsga2
+
+
+class CallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+        self.callback = os.path.join(self.directory, 'callback')
+        self.arguments = os.path.join(self.directory, 'arguments')
+        with open(self.callback, 'w') as f:
+            f.write('#!/bin/sh\nfor a in "$@"; do echo "$a"; done > %s\n' % self.arguments)
+        os.chmod(self.callback, stat.S_IRWXU)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_arguments(self, *args):
+        nsga2.main(['--func_name=zdt1', '--d=1', '--seed=1', '--task_id=3',
+                    '--callback=%s' % self.callback] + list(args),
+                   exe=os.path.join(self.directory, 'nsga2.py'))
+        with open(self.arguments) as f:
+            arguments = dict(line.rstrip('\n').split('=', 1) for line in f)
+        with open(nsga2.log_path('stats', 'zdt1', 1, 1)) as f:
+            stats = [line.split() for line in f]
+        return arguments, stats
+
+    def test_callback(self):
+        for engine in ('deap', 'array'):
+            arguments, stats = self.run_arguments('--max_calls=200', '--engine=%s' % engine)
+            self.assertEqual(arguments['--task_id'], '3')
+            self.assertEqual(arguments['--status'], 'D')
+            self.assertEqual(int(arguments['--calls']), nsga2.problem.evals)
+            self.assertAlmostEqual(float(arguments['--hyper_volume']), float(stats[-1][1]),
+                                   places=5)
+
+    def test_no_generation(self):
+        # A budget below two populations leaves only the initial one, which
+        # is logged and reported
+        for engine in ('deap', 'array'):
+            arguments, stats = self.run_arguments('--max_calls=30', '--engine=%s' % engine)
+            self.assertEqual(len(stats), 1)
+            self.assertEqual(int(stats[0][0]), 20)
+            self.assertEqual(int(arguments['--calls']), 20)
+            self.assertAlmostEqual(float(arguments['--hyper_volume']), float(stats[0][1]),
+                                   places=5)
+            self.assertAlmostEqual(float(arguments['--uniformity']), float(stats[0][2]),
+                                   places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
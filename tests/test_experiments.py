@@ -0,0 +1,60 @@
+"""The grids of runs of experiments.py."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import experiments
+import nsga2
+
+
+class GridTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_n_objs(self):
+        options, _ = experiments.parser.parse_args(
+            ['--func_names=dtlz2,zdt1,ep1', '--dims=1', '--seeds=1',
+             '--budgets=500', '--n_objs=4'])
+        tasks = experiments.make_tasks(options)
+        self.assertEqual(len(tasks), 3)
+        crits = {}
+        for args in tasks:
+            nsga2.main(args, exe=os.path.join(self.directory, 'nsga2.py'))
+            crits[args[0]] = nsga2.problem.crits
+        self.assertEqual(crits, {'--func_name=dtlz2': 4,
+                                 '--func_name=zdt1': 2,
+                                 '--func_name=ep1': 2})
+        self.assertIn('--n_objs=4', tasks[0])
+        self.assertNotIn('--n_objs=4', tasks[1])
+        self.assertNotIn('--n_objs=4', tasks[2])
+
+    def test_budgets(self):
+        options, _ = experiments.parser.parse_args(
+            ['--func_names=zdt1', '--dims=1', '--seeds=1,2', '--budgets=500,1000'])
+        tasks = experiments.make_tasks(options)
+        self.assertEqual([args[3] for args in tasks],
+                         ['--max_calls=500', '--max_calls=1000'] * 2)
+        # Runs bounded by their duration only
+        for budgets in ([], ['--budgets=']):
+            options, _ = experiments.parser.parse_args(
+                ['--func_names=zdt1', '--dims=1', '--seeds=1', '--max_duration=0.5'] + budgets)
+            tasks = experiments.make_tasks(options)
+            self.assertEqual(len(tasks), 1)
+            self.assertFalse([arg for arg in tasks[0] if arg.startswith('--max_calls')])
+            nsga2.main(tasks[0], exe=os.path.join(self.directory, 'nsga2.py'))
+            self.assertGreater(nsga2.problem.evals, 20)
+        options, _ = experiments.parser.parse_args(
+            ['--func_names=zdt1', '--dims=1', '--seeds=1'])
+        self.assertRaises(ValueError, experiments.make_tasks, options)
+
+
+if __name__ == '__main__':
+    unittest.main()
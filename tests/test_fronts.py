@@ -0,0 +1,92 @@
+"""The reference fronts of fronts.py are non-dominated and on the true Pareto
+front of their problem."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from math import pi
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fronts
+
+
+def dominated(points):
+    # Whether every point is weakly dominated by another, distinct one
+    better = (points[:, None, :] <= points[None, :, :]).all(axis=2)
+    different = (points[:, None, :] != points[None, :, :]).any(axis=2)
+    return (better & different).any(axis=0)
+
+
+# Residual of the equation of the true front of every problem, with the
+# default dimension and number of objectives
+FRONTS = {
+    'zdt1': lambda f: f[:, 1] - (1 - numpy.sqrt(f[:, 0])),
+    'zdt2': lambda f: f[:, 1] - (1 - f[:, 0] ** 2),
+    'zdt3': lambda f: f[:, 1] - (1 - numpy.sqrt(f[:, 0]) - f[:, 0] * numpy.sin(10 * pi * f[:, 0])),
+    'zdt4': lambda f: f[:, 1] - (1 - numpy.sqrt(f[:, 0])),
+    'zdt6': lambda f: f[:, 1] - (1 - f[:, 0] ** 2),
+    'ep1': lambda f: f[:, 1] - (numpy.minimum(numpy.abs(f[:, 0] - 1), 1.5 - f[:, 0]) + 1),
+    'ep2': lambda f: f[:, 0] - (1 - f[:, 1] ** 2),
+    'dtlz1': lambda f: f.sum(axis=1) - 0.5,
+    'dtlz2': lambda f: (f ** 2).sum(axis=1) - 1,
+    'dtlz3': lambda f: (f ** 2).sum(axis=1) - 1,
+    'dtlz4': lambda f: (f ** 2).sum(axis=1) - 1,
+    'dtlz7': lambda f: f[:, -1] - (2 * f.shape[1] -
+                                   (f[:, :-1] * (1 + numpy.sin(3 * pi * f[:, :-1]))).sum(axis=1)),
+}
+
+
+class ReferenceFrontTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.generate = fronts.generate
+
+    def tearDown(self):
+        fronts.generate = self.generate
+        shutil.rmtree(self.directory)
+
+    def test_generate(self):
+        for func_name in sorted(fronts._generators):
+            for n_objs in ((None, 2, 4) if func_name.startswith('dtlz') else (None,)):
+                front = fronts.generate(func_name, n_objs=n_objs, size=400)
+                self.assertEqual(front.shape[1], n_objs or (3 if func_name.startswith('dtlz')
+                                                            else 2))
+                self.assertGreater(len(front), 40, func_name)
+                self.assertTrue(numpy.isfinite(front).all())
+                self.assertFalse(dominated(front).any(), (func_name, n_objs))
+                if func_name in FRONTS:
+                    numpy.testing.assert_allclose(FRONTS[func_name](front), 0, atol=1e-12,
+                                                  err_msg='%s %s' % (func_name, n_objs))
+
+    def test_extremes(self):
+        # The corners of the simplex and the sphere are in the fronts
+        for func_name, scale in (('dtlz1', 0.5), ('dtlz2', 1.0)):
+            for n_objs in (3, 5):
+                front = fronts.generate(func_name, n_objs=n_objs, size=200)
+                for corner in scale * numpy.eye(n_objs):
+                    self.assertTrue((numpy.abs(front - corner) < 1e-12).all(axis=1).any())
+
+    def test_cache(self):
+        front = fronts.reference_front('dtlz2', n_objs=4, size=300, cache_dir=self.directory)
+        path = fronts.cache_path('dtlz2', n_objs=4, size=300, cache_dir=self.directory)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(path)])
+        numpy.testing.assert_array_equal(front, fronts.generate('dtlz2', n_objs=4, size=300))
+
+        # Read from the cache file without being generated again
+        def generate(*args, **kwargs):
+            raise AssertionError('generated again')
+
+        fronts.generate = generate
+        cached = fronts.reference_front('dtlz2', n_objs=4, size=300, cache_dir=self.directory)
+        self.assertIsInstance(cached, numpy.memmap)
+        numpy.testing.assert_array_equal(cached, front)
+        self.assertRaises(AssertionError, fronts.reference_front, 'dtlz2', n_objs=4, size=200,
+                          cache_dir=self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
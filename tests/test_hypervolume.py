@@ -0,0 +1,161 @@
+"""The hypervolume engines of _hypervolume."""
+import os
+import sys
+import threading
+import unittest
+from math import sqrt
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _hypervolume
+from _hypervolume import approx
+
+
+def random_fronts(rng, count, n_objs):
+    # Points on the unit sphere, dominated points included
+    fronts = []
+    for _ in range(count):
+        points = numpy.abs(rng.normal(size=(rng.randint(20, 200), n_objs)))
+        points /= numpy.sqrt((points ** 2).sum(axis=1))[:, None]
+        points[::5] *= 1.1
+        fronts.append(points)
+    return fronts
+
+
+class ConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = _hypervolume.backend
+        _hypervolume.set_backend("c")
+
+    def tearDown(self):
+        _hypervolume.set_backend(self.backend)
+
+    def test_hypervolume_many(self):
+        rng = numpy.random.RandomState(0)
+        for n_objs in (2, 3, 4, 5):
+            fronts = random_fronts(rng, 24, n_objs)
+            ref = [1.5] * n_objs
+            serial = [_hypervolume.hypervolume(front, ref) for front in fronts]
+            self.assertEqual(_hypervolume.hypervolume_many(fronts, ref, workers=4), serial)
+
+    def test_threads(self):
+        # The fronts computed at once from several threads, the GIL being
+        # released during fpli_hv, give the same hypervolumes as one by one
+        rng = numpy.random.RandomState(1)
+        fronts = [(front, [1.5] * front.shape[1])
+                  for n_objs in (3, 4, 5) for front in random_fronts(rng, 8, n_objs)]
+        serial = [_hypervolume.hypervolume(front, ref) for front, ref in fronts]
+        results = [[] for _ in range(8)]
+
+        def compute(result):
+            for _ in range(3):
+                result.append([_hypervolume.hypervolume(front, ref) for front, ref in fronts])
+
+        threads = [threading.Thread(target=compute, args=(result,)) for result in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            self.assertEqual(result, [serial] * 3)
+
+
+def exact_volume(points, ref):
+    points = [p for p in points if all(a < r for a, r in zip(p, ref))]
+    if not points:
+        return 0.0
+    return _hypervolume._backends['c'].hypervolume(numpy.array(points), ref)
+
+
+class ContributionsTest(unittest.TestCase):
+    def test_contributions(self):
+        # The hypervolume lost by removing every point, with ties, copies,
+        # dominated points and points beyond the reference point
+        rng = numpy.random.RandomState(5)
+        for n_objs in (2, 3, 4):
+            ref = [1.0] * n_objs
+            for trial in range(40):
+                size = rng.randint(1, 30)
+                points = numpy.where(rng.uniform(size=(size, n_objs)) < 0.5,
+                                     rng.randint(0, 6, (size, n_objs)) / 4.0,
+                                     rng.uniform(0., 1.1, (size, n_objs)))
+                points = numpy.vstack((points, points[:trial % 3]))
+                total = exact_volume(points.tolist(), ref)
+                expected = [total - exact_volume(numpy.delete(points, i, 0).tolist(), ref)
+                            for i in range(len(points))]
+                numpy.testing.assert_allclose(_hypervolume.contributions(points, ref),
+                                              expected, rtol=0, atol=1e-12)
+                numpy.testing.assert_allclose(_hypervolume._contributions(points.tolist(), ref),
+                                              expected, rtol=0, atol=1e-12)
+
+    def test_empty(self):
+        self.assertEqual(len(_hypervolume.contributions(numpy.empty((0, 3)), [1.0] * 3)), 0)
+        self.assertEqual(_hypervolume._contributions([], [1.0] * 3), [])
+        self.assertEqual(_hypervolume.contributions([[0.5, 0.5]], [1.0, 1.0]).tolist(), [0.25])
+
+
+class ApproximationTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = _hypervolume.backend
+        self.options = dict(approx._options)
+
+    def tearDown(self):
+        _hypervolume.set_backend(self.backend)
+        approx._options.clear()
+        approx._options.update(self.options)
+
+    def test_exact(self):
+        # Within four standard errors of the proportion of dominated samples
+        rng = numpy.random.RandomState(2)
+        for n_objs in (4, 5, 6):
+            ref = [1.5] * n_objs
+            for front in random_fronts(rng, 4, n_objs):
+                exact = _hypervolume._backends['c'].hypervolume(front, ref)
+                box = numpy.prod(1.5 - front.min(axis=0))
+                p = exact / box
+                for samples in (10000, 200000):
+                    estimate = approx.hypervolume_approximation(front, ref, samples=samples,
+                                                                seed=samples)
+                    self.assertLess(abs(estimate - exact),
+                                    4 * box * sqrt(p * (1 - p) / samples))
+                estimate = approx.hypervolume_approximation(front, ref, error=0.005)
+                self.assertLess(abs(estimate - exact), 4 * 0.005 * exact)
+
+    def test_samples(self):
+        # The estimate depends on the seed and the number of samples only
+        rng = numpy.random.RandomState(3)
+        front = random_fronts(rng, 1, 5)[0]
+        ref = [1.5] * 5
+        estimate = approx.hypervolume_approximation(front, ref, samples=50000, seed=7)
+        for chunk_size in (1, 1000, 2**22):
+            self.assertEqual(approx.hypervolume_approximation(
+                front, ref, samples=50000, seed=7, chunk_size=chunk_size), estimate)
+        self.assertEqual(approx.hypervolume_approximation(
+            front.tolist(), ref, samples=50000, seed=7), estimate)
+        self.assertNotEqual(approx.hypervolume_approximation(
+            front, ref, samples=50000, seed=8), estimate)
+        # Points beyond the reference point are ignored
+        beyond = numpy.vstack((front, [[1.6, 0.1, 0.1, 0.1, 0.1], [1.5] * 5]))
+        self.assertEqual(approx.hypervolume_approximation(
+            beyond, ref, samples=50000, seed=7), estimate)
+        self.assertEqual(approx.hypervolume_approximation(beyond[-2:], ref), 0.0)
+
+    def test_backend(self):
+        rng = numpy.random.RandomState(4)
+        _hypervolume.set_backend('approx', samples=20000, seed=3)
+        for n_objs in (2, 3, 4, 5):
+            front = random_fronts(rng, 1, n_objs)[0]
+            ref = [1.5] * n_objs
+            if n_objs < _hypervolume.APPROX_MIN_OBJECTIVES:
+                expected = _hypervolume._backends['c'].hypervolume(front, ref)
+            else:
+                expected = approx.hypervolume_approximation(front, ref, samples=20000, seed=3)
+            self.assertEqual(_hypervolume.hypervolume(front, ref), expected)
+        self.assertRaises(ValueError, _hypervolume.set_backend, 'approx', sample=10)
+        self.assertRaises(ValueError, _hypervolume.set_backend, 'c', samples=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
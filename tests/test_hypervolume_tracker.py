@@ -0,0 +1,141 @@
+"""The hypervolume of the tracker is the one of the whole archive."""
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _hypervolume
+import nsga2
+import problems
+from archive import BoundedParetoArchive, EpsilonArchive
+from tools import HypervolumeTracker
+
+
+def batch_volume(points, ref):
+    points = numpy.array(points, dtype=numpy.float64)
+    return _hypervolume.hypervolume(points, ref) if len(points) else 0.0
+
+
+class HypervolumeTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+        self.log_generation = nsga2.log_generation
+
+    def tearDown(self):
+        nsga2.log_generation = self.log_generation
+        shutil.rmtree(self.directory)
+
+    def assertVolume(self, volume, expected):
+        self.assertAlmostEqual(volume, expected, delta=1e-9 * max(1.0, expected))
+
+    def run_checked(self, *args):
+        volumes = []
+
+        def log_generation(log, tracker):
+            result = self.log_generation(log, tracker)
+            expected = batch_volume(nsga2.problem.pareto_front, nsga2.nadir)
+            self.assertVolume(tracker.volume, expected)
+            volumes.append(expected)
+            return result
+
+        nsga2.log_generation = log_generation
+        nsga2.main(['--d=1', '--seed=1', '--max_calls=2000'] + list(args),
+                   exe=os.path.join(self.directory, 'nsga2.py'))
+        self.assertTrue(volumes)
+
+    def test_runs(self):
+        for args in (['--func_name=zdt1'],
+                     ['--func_name=zdt1', '--engine=array'],
+                     ['--func_name=dtlz2'],
+                     ['--func_name=dtlz2', '--n_objs=4', '--engine=array'],
+                     ['--func_name=dtlz2', '--archive_size=50'],
+                     ['--func_name=dtlz2', '--archive=epsilon', '--archive_eps=0.05']):
+            self.run_checked(*args)
+
+    def test_archives(self):
+        rng = numpy.random.RandomState(0)
+        for n_objs in (2, 3, 5):
+            for archive in (None, BoundedParetoArchive(30, 'hv'),
+                            BoundedParetoArchive(30),
+                            EpsilonArchive([0.05] * n_objs)):
+                problem = problems.get_problem('dtlz2', n_objs=n_objs)
+                if archive is not None:
+                    problem.pareto_front = archive
+                tracker = HypervolumeTracker(problem.nadir)
+                tracker.watch(problem.pareto_front)
+                for _ in range(20):
+                    problem(rng.uniform(0., 1., (10, problem.dimension)))
+                    self.assertVolume(tracker.volume, batch_volume(
+                        problem.pareto_front, problem.nadir))
+
+    def test_streams(self):
+        # Insertions and removals with ties, copies and vectors beyond the
+        # reference point
+        rng = random.Random(1)
+        for dim in (2, 3, 4):
+            ref = [1.0] * dim
+            for _ in range(40):
+                tracker = HypervolumeTracker(ref)
+                points = []
+                for _ in range(60):
+                    if points and rng.random() < 0.4:
+                        tracker.remove(points.pop(rng.randrange(len(points))))
+                    else:
+                        if points and rng.random() < 0.2:
+                            vals = rng.choice(points)
+                        else:
+                            vals = tuple(rng.choice([0.0, 0.5, 1.0, 1.5, rng.random()])
+                                         for _ in range(dim))
+                        points.append(vals)
+                        tracker.insert(vals)
+                    if rng.random() < 0.3:
+                        self.assertVolume(tracker.volume, batch_volume(points, ref))
+                self.assertVolume(tracker.volume, batch_volume(points, ref))
+
+    def test_resync(self):
+        # Computed again on the whole set after every change
+        rng = numpy.random.RandomState(2)
+        for n_objs in (2, 3):
+            archive = BoundedParetoArchive(20)
+            tracker = HypervolumeTracker([1.0] * n_objs, resync=1)
+            tracker.watch(archive)
+            for vals in rng.uniform(0., 1., (100, n_objs)).tolist():
+                archive.update(tuple(vals))
+                self.assertEqual(tracker.volume, batch_volume(archive, [1.0] * n_objs))
+
+    def test_pickle(self):
+        rng = numpy.random.RandomState(3)
+        for n_objs in (2, 3, 4):
+            archive = BoundedParetoArchive(40, 'hv')
+            tracker = HypervolumeTracker([1.0] * n_objs)
+            tracker.watch(archive)
+            archive.update_many(rng.uniform(0., 1., (100, n_objs)))
+            archive, tracker = pickle.loads(pickle.dumps((archive, tracker), 2))
+            archive.update_many(rng.uniform(0., 1., (100, n_objs)))
+            self.assertVolume(tracker.volume, batch_volume(archive, [1.0] * n_objs))
+
+    def test_contribution(self):
+        rng = random.Random(4)
+        for dim in (2, 3, 4, 5):
+            ref = [1.0] * dim
+            for _ in range(100):
+                points = [[rng.choice([0.1, 0.5, 1.0, rng.random()])
+                           for _ in range(dim)] for _ in range(rng.randint(0, 12))]
+                point = [rng.choice([0.1, 0.5, rng.random()]) for _ in range(dim)]
+                expected = batch_volume(points + [point], ref) - batch_volume(points, ref)
+                self.assertAlmostEqual(_hypervolume.contribution(point, points, ref),
+                                       expected, delta=1e-12)
+                self.assertAlmostEqual(_hypervolume._contribution(point, points, ref),
+                                       expected, delta=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""The indicators of tools.py against their definitions on every pair of
+points."""
+import os
+import sys
+import unittest
+from math import sqrt
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools
+
+
+def distance(p, p2):
+    return sqrt(sum((e - e2)**2 for e, e2 in zip(p, p2)))
+
+
+def uniformity(front):
+    # The definition computed on every pair of points
+    min_dists = []
+    for p in front:
+        min_dist = min([distance(p, p2) for p2 in front if p != p2] or [float('inf')])
+        if min_dist == float('inf'):
+            raise ValueError('Distance cannot be infinite')
+        min_dists.append(min_dist)
+    avg_dist = sum(min_dists) / len(min_dists)
+    return sqrt(sum((dist - avg_dist)**2 for dist in min_dists))
+
+
+def nearest(point, targets, distance):
+    return min(distance(point, target) for target in targets)
+
+
+def igd_plus_distance(z, a):
+    return sqrt(sum(max(ai - zi, 0)**2 for zi, ai in zip(z, a)))
+
+
+def epsilon_distance(z, a):
+    return max(ai - zi for zi, ai in zip(z, a))
+
+
+def gd(front, optimal):
+    return sqrt(sum(nearest(p, optimal, distance)**2 for p in front)) / len(front)
+
+
+def igd(front, optimal):
+    return sum(nearest(z, front, distance) for z in optimal) / len(optimal)
+
+
+def igd_plus(front, optimal):
+    return sum(nearest(z, front, igd_plus_distance) for z in optimal) / len(optimal)
+
+
+def epsilon_additive(front, optimal):
+    return max(nearest(z, front, epsilon_distance) for z in optimal)
+
+
+def random_front(rng, size, n_objs):
+    # Points of a simplex, some on a coarse grid so that copies and ties
+    # are frequent
+    points = rng.uniform(0., 1., (size, n_objs))
+    points[::3] = rng.randint(0, 4, (len(points[::3]), n_objs)) / 3.0
+    points /= numpy.maximum(points.sum(axis=1), 1e-3)[:, None]
+    return [tuple(p) for p in points.tolist()]
+
+
+class UniformityTest(unittest.TestCase):
+    def test_uniformity(self):
+        rng = numpy.random.RandomState(0)
+        for n_objs in (2, 3, 5):
+            for size in (2, 3, 10, 100, 400):
+                front = random_front(rng, size, n_objs)
+                if len(set(front)) < 2:
+                    continue
+                self.assertAlmostEqual(tools.uniformity(front), uniformity(front),
+                                       delta=1e-12)
+                self.assertAlmostEqual(tools.uniformity(numpy.array(front)),
+                                       uniformity(front), delta=1e-12)
+
+    def test_nearest_distances(self):
+        # Distinct points by batches of any size
+        rng = numpy.random.RandomState(1)
+        for n_objs in (2, 3, 4):
+            points = numpy.unique(numpy.array(random_front(rng, 300, n_objs)), axis=0)
+            expected = [min(distance(p, p2) for p2 in points.tolist() if p != p2)
+                        for p in points.tolist()]
+            for block_size in (1, 7, 1000, 2**20):
+                numpy.testing.assert_allclose(
+                    tools._nearest_distances(points, block_size=block_size),
+                    expected, rtol=0, atol=1e-12)
+
+    def test_copies(self):
+        self.assertRaises(ValueError, tools.uniformity, [(0.5, 0.5)] * 3)
+        self.assertRaises(ZeroDivisionError, tools.uniformity, [])
+        front = [(0.0, 1.0), (0.0, 1.0), (1.0, 0.0), (0.5, 0.5)]
+        self.assertAlmostEqual(tools.uniformity(front), uniformity(front), delta=1e-12)
+
+
+class IndicatorsTest(unittest.TestCase):
+    def fronts(self, rng, n_objs):
+        # Fronts near the optimal one, on both of its sides so that some of
+        # their points dominate optimal ones, with dominated points and
+        # copies
+        optimal = numpy.array(random_front(rng, 150, n_objs))
+        for shift in (-0.1, 0.0, 0.05, 0.3):
+            front = optimal[rng.randint(0, len(optimal), 40)] + rng.normal(
+                shift, 0.05, (40, n_objs))
+            front[::4] += 0.5
+            front[1::7] = front[2::7][:len(front[1::7])]
+            yield front, optimal
+
+    def assertIndicators(self, front, optimal):
+        for indicator, expected in ((tools.gd, gd), (tools.igd, igd),
+                                    (tools.igd_plus, igd_plus),
+                                    (tools.epsilon_additive, epsilon_additive)):
+            self.assertAlmostEqual(indicator(front, optimal),
+                                   expected(front.tolist(), optimal.tolist()), delta=1e-12)
+
+    def test_indicators(self):
+        rng = numpy.random.RandomState(2)
+        for n_objs in (2, 3, 4):
+            for front, optimal in self.fronts(rng, n_objs):
+                self.assertIndicators(front, optimal)
+                self.assertIndicators(front[:1], optimal)
+
+    def test_negative_epsilon(self):
+        # A front dominating every optimal point
+        rng = numpy.random.RandomState(3)
+        for n_objs in (2, 3):
+            optimal = numpy.array(random_front(rng, 100, n_objs))
+            front = optimal - 0.2
+            self.assertAlmostEqual(tools.epsilon_additive(front, optimal), -0.2, delta=1e-12)
+            self.assertEqual(tools.igd_plus(front, optimal), 0.0)
+            self.assertIndicators(front, optimal)
+
+    def test_blocks(self):
+        rng = numpy.random.RandomState(4)
+        for n_objs in (2, 3):
+            for front, optimal in self.fronts(rng, n_objs):
+                expected = [nearest(z, front.tolist(), igd_plus_distance)
+                            for z in optimal.tolist()]
+                by_diff = lambda diff: numpy.sqrt((numpy.maximum(diff, 0) ** 2).sum(axis=-1))
+                for block_size in (1, 5, 100):
+                    numpy.testing.assert_allclose(
+                        tools._nearest_by(optimal, front, by_diff, block_size),
+                        expected, rtol=0, atol=1e-12)
+                    numpy.testing.assert_allclose(
+                        tools._nearest_distances(optimal, front, block_size),
+                        [nearest(z, front.tolist(), distance) for z in optimal.tolist()],
+                        rtol=0, atol=1e-12)
+
+    def test_empty(self):
+        optimal = numpy.array([[0.0, 1.0], [1.0, 0.0]])
+        for indicator in (tools.gd, tools.igd, tools.igd_plus, tools.epsilon_additive):
+            self.assertRaises(ZeroDivisionError, indicator, [], optimal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""The operators of operators.py against the definitions of DEAP."""
+import os
+import random
+import sys
+import unittest
+
+import numpy
+from deap import tools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import operators
+
+
+def dominates(f1, f2):
+    return all(a <= b for a, b in zip(f1, f2)) and any(a < b for a, b in zip(f1, f2))
+
+
+def tournaments(objectives, crowding, k, rng):
+    """selTournamentDCD of DEAP written row by row, with its random numbers
+    drawn from *rng* in the order of sel_tournament_dcd."""
+    n = len(objectives)
+    shuffles = rng.permutation(n).tolist(), rng.permutation(n).tolist()
+    coins = iter(rng.random_sample(k).tolist())
+
+    def tourn(i, j):
+        coin = next(coins)
+        if dominates(objectives[i], objectives[j]):
+            return i
+        if dominates(objectives[j], objectives[i]):
+            return j
+        if crowding[i] < crowding[j]:
+            return j
+        if crowding[i] > crowding[j]:
+            return i
+        return i if coin <= 0.5 else j
+
+    chosen = []
+    for i in range(0, k, 4):
+        chosen.append(tourn(shuffles[0][i], shuffles[0][i + 1]))
+        chosen.append(tourn(shuffles[0][i + 2], shuffles[0][i + 3]))
+        chosen.append(tourn(shuffles[1][i], shuffles[1][i + 1]))
+        chosen.append(tourn(shuffles[1][i + 2], shuffles[1][i + 3]))
+    return chosen
+
+
+def assert_quantiles(samples, expected, delta=0.015):
+    quantiles = numpy.linspace(0.05, 0.95, 19)
+    numpy.testing.assert_allclose(numpy.percentile(samples, 100 * quantiles),
+                                  numpy.percentile(expected, 100 * quantiles),
+                                  atol=delta)
+
+
+class SelTournamentDCDTest(unittest.TestCase):
+    def test_tournaments(self):
+        rng = numpy.random.RandomState(0)
+        for n, k in ((4, 4), (20, 20), (21, 12), (100, 100)):
+            for _ in range(20):
+                # Few values, so that dominance, crowding and coin all decide
+                objectives = rng.randint(0, 3, (n, 2)).astype(float)
+                crowding = rng.choice([0.0, 1.0, numpy.inf], n)
+                seed = rng.randint(1 << 30)
+                selected = operators.sel_tournament_dcd(
+                    objectives, crowding, k, numpy.random.RandomState(seed))
+                self.assertEqual(selected.tolist(), tournaments(
+                    objectives.tolist(), crowding.tolist(), k,
+                    numpy.random.RandomState(seed)))
+
+    def test_coin(self):
+        # Without dominance nor crowding every row wins half its tournaments
+        rng = numpy.random.RandomState(1)
+        objectives = numpy.column_stack([numpy.arange(100.), -numpy.arange(100.)])
+        wins = numpy.zeros(100)
+        for _ in range(200):
+            selected = operators.sel_tournament_dcd(objectives, numpy.zeros(100), 100, rng)
+            wins += numpy.bincount(selected, minlength=100)
+        self.assertAlmostEqual(wins.mean() / 200, 1.0)
+        self.assertLess(numpy.abs(wins / 200 - 1.0).max(), 0.25)
+
+    def test_k(self):
+        rng = numpy.random.RandomState(2)
+        objectives = rng.uniform(size=(20, 2))
+        for k in (2, 10, 21, 24):
+            self.assertRaises(ValueError, operators.sel_tournament_dcd,
+                              objectives, numpy.zeros(20), k, rng)
+
+
+class VariationTest(unittest.TestCase):
+    def test_crossover_bounds(self):
+        rng = numpy.random.RandomState(3)
+        for low, up in ((0.0, 1.0), ([-5.0, 0.0, 0.0], [5.0, 1.0, 0.5])):
+            lows, ups = operators._bounds(low, up, 3)
+            parents1 = rng.uniform(lows, ups, (2000, 3))
+            parents2 = rng.uniform(lows, ups, (2000, 3))
+            # Copies and genes on the bounds
+            parents2[:200] = parents1[:200]
+            parents1[200:400] = lows
+            parents2[400:600] = ups
+            children1, children2 = operators.cx_simulated_binary_bounded(
+                parents1, parents2, 20.0, low, up, rng)
+            for children in (children1, children2):
+                self.assertTrue(numpy.isfinite(children).all())
+                self.assertTrue((children >= lows).all() and (children <= ups).all())
+            numpy.testing.assert_array_equal(children1[:200], parents1[:200])
+            numpy.testing.assert_array_equal(children2[:200], parents2[:200])
+            # Half the genes of different parents are crossed
+            crossed = (children1[200:] != parents1[200:]).mean()
+            self.assertAlmostEqual(crossed, 0.5, delta=0.02)
+
+    def test_crossover_deap(self):
+        rng = numpy.random.RandomState(4)
+        random.seed(4)
+        for eta in (2.0, 20.0):
+            for x1, x2 in ((0.3, 0.6), (0.02, 0.1), (0.9, 0.95)):
+                children = operators.cx_simulated_binary_bounded(
+                    numpy.full((50000, 1), x1), numpy.full((50000, 1), x2), eta, 0.0, 1.0, rng)
+                expected = []
+                for _ in range(50000):
+                    expected.extend(tools.cxSimulatedBinaryBounded([x1], [x2], eta, 0.0, 1.0))
+                assert_quantiles(numpy.concatenate(children).ravel(),
+                                 numpy.array(expected).ravel())
+
+    def test_mutation_bounds(self):
+        rng = numpy.random.RandomState(5)
+        for low, up in ((0.0, 1.0), ([-5.0, 0.0, 0.0], [5.0, 1.0, 0.5])):
+            lows, ups = operators._bounds(low, up, 3)
+            population = rng.uniform(lows, ups, (5000, 3))
+            population[:500] = lows
+            population[500:1000] = ups
+            before = population.copy()
+            for indpb in (0.0, 1.0 / 3, 1.0):
+                mutants = operators.mut_polynomial_bounded(population, 20.0, low, up,
+                                                           indpb, rng)
+                numpy.testing.assert_array_equal(population, before)
+                self.assertTrue((mutants >= lows).all() and (mutants <= ups).all())
+                # A gene on a bound mutated beyond it stays there
+                changed = (mutants[1000:] != population[1000:]).mean()
+                if indpb == 0.0:
+                    self.assertEqual(changed, 0.0)
+                else:
+                    self.assertAlmostEqual(changed, indpb, delta=0.02)
+
+    def test_mutation_deap(self):
+        rng = numpy.random.RandomState(6)
+        random.seed(6)
+        for eta in (2.0, 20.0):
+            for x in (0.0, 0.05, 0.5, 1.0):
+                mutants = operators.mut_polynomial_bounded(
+                    numpy.full((50000, 1), x), eta, 0.0, 1.0, 1.0, rng)
+                expected = [tools.mutPolynomialBounded([x], eta, 0.0, 1.0, 1.0)[0][0]
+                            for _ in range(50000)]
+                assert_quantiles(mutants.ravel(), numpy.array(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
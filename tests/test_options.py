@@ -0,0 +1,41 @@
+"""The command line of nsga2 is checked before the run starts."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nsga2
+
+
+class OptionsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+        self.stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+
+    def tearDown(self):
+        sys.stderr.close()
+        sys.stderr = self.stderr
+        shutil.rmtree(self.directory)
+
+    def main(self, *args):
+        return nsga2.main(['--func_name=zdt1', '--d=1', '--seed=1', '--max_calls=200'] +
+                          list(args), exe=os.path.join(self.directory, 'nsga2.py'))
+
+    def test_mu(self):
+        for engine in ('deap', 'array'):
+            for mu in (10, 2, 0, -4):
+                with self.assertRaises(SystemExit) as raised:
+                    self.main('--mu=%d' % mu, '--engine=%s' % engine)
+                self.assertEqual(raised.exception.code, 2)
+        self.assertEqual(os.listdir(os.path.join(self.directory, 'log')), [])
+        for engine in ('deap', 'array'):
+            self.main('--mu=8', '--engine=%s' % engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
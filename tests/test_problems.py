@@ -0,0 +1,101 @@
+"""The batch path of the problems gives the objectives of the scalar one."""
+import os
+import sys
+import unittest
+from functools import reduce
+from math import cos, sin, pi
+from operator import mul
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import problems
+
+
+def random_rows(rng, problem, size=50):
+    low = numpy.broadcast_to(numpy.asarray(problem.bound_low, dtype=float),
+                             (int(problem.dimension),))
+    up = numpy.broadcast_to(numpy.asarray(problem.bound_up, dtype=float),
+                            (int(problem.dimension),))
+    rows = rng.uniform(low, up, (size, len(low)))
+    # Rows on the bounds too
+    rows[:5] = low
+    rows[5:10] = up
+    return rows
+
+
+def dtlz_reference(number, ind, obj):
+    """DTLZ1 to DTLZ5 with one product per objective, as defined by Deb et
+    al."""
+    xc, xm = ind[:obj-1], ind[obj-1:]
+    if number in (1, 3):
+        g = 100 * (len(xm) + sum((xi-0.5)**2 - cos(20*pi*(xi-0.5)) for xi in xm))
+    else:
+        g = sum((xi-0.5)**2 for xi in xm)
+    if number == 1:
+        f = [0.5 * reduce(mul, xc, 1) * (1 + g)]
+        f.extend(0.5 * reduce(mul, xc[:m], 1) * (1 - xc[m]) * (1 + g)
+                 for m in reversed(range(obj-1)))
+        return f
+    if number == 5:
+        theta = lambda x: pi / (4.0 * (1 + g)) * (1 + 2 * g * x)
+        f = [(1 + g) * cos(pi / 2.0 * ind[0]) *
+             reduce(lambda x, y: x*y, [cos(theta(a)) for a in ind[1:]])]
+        for m in reversed(range(1, obj)):
+            if m == 1:
+                f.append((1 + g) * sin(pi / 2.0 * ind[0]))
+            else:
+                f.append((1 + g) * cos(pi / 2.0 * ind[0]) *
+                         reduce(lambda x, y: x*y, [cos(theta(a)) for a in ind[1:m-1]], 1) *
+                         sin(theta(ind[m-1])))
+        return f
+    if number == 4:
+        xc = [xi**100 for xi in xc]
+    f = [(1.0+g) * reduce(mul, (cos(0.5*xi*pi) for xi in xc), 1.0)]
+    f.extend((1.0+g) * reduce(mul, (cos(0.5*xi*pi) for xi in xc[:m]), 1) * sin(0.5*xc[m]*pi)
+             for m in range(obj-2, -1, -1))
+    return f
+
+
+class BatchTest(unittest.TestCase):
+    def assertRows(self, problem, rows):
+        self.assertIsNotNone(problem.batch, problem.__name__)
+        batch = problem.evaluate(rows)
+        self.assertEqual(batch.shape, (len(rows), problem.crits))
+        scalar = numpy.array([problem(row) for row in rows.tolist()])
+        numpy.testing.assert_allclose(batch, scalar, rtol=1e-12, atol=1e-12,
+                                      err_msg=problem.__name__)
+
+    def test_registered(self):
+        rng = numpy.random.RandomState(0)
+        for name in problems.problem_names():
+            problem = problems.get_problem(name)
+            self.assertRows(problem, random_rows(rng, problem))
+            if name not in ('ep1', 'ep2'):
+                problem = problems.get_problem(name, int(problem.dimension) + 3)
+                self.assertRows(problem, random_rows(rng, problem))
+
+    def test_dtlz(self):
+        rng = numpy.random.RandomState(1)
+        for number in range(1, 8):
+            for n_objs in (2, 3, 5, 8):
+                for dimension in (None, n_objs + 1):
+                    problem = problems.dtlz(number, n_objs, dimension)
+                    self.assertEqual(problem.crits, n_objs)
+                    self.assertEqual(len(problem.nadir), n_objs)
+                    self.assertRows(problem, random_rows(rng, problem))
+
+    def test_dtlz_reference(self):
+        # The objectives from prefix products are those of the definition
+        rng = numpy.random.RandomState(2)
+        for number in range(1, 6):
+            for n_objs in (2, 3, 5, 8):
+                problem = problems.dtlz(number, n_objs)
+                for row in random_rows(rng, problem, 20).tolist():
+                    self.assertEqual(list(problem(row)),
+                                     dtlz_reference(number, row, n_objs))
+
+
+if __name__ == '__main__':
+    unittest.main()
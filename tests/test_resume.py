@@ -0,0 +1,86 @@
+"""A run stopped and resumed from its checkpoints logs the same stats as a
+run made at once."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nsga2
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.out_of_time = nsga2.out_of_time
+
+    def tearDown(self):
+        nsga2.out_of_time = self.out_of_time
+        shutil.rmtree(self.directory)
+
+    def run_stats(self, name, args, stop_every=None):
+        """Run nsga2 in its own directory, stopped by out_of_time every
+        *stop_every* generations and resumed until done, and return the
+        stats it logged."""
+        directory = os.path.join(self.directory, name)
+        os.makedirs(os.path.join(directory, 'log'))
+        # A seed whose runs find individuals already evaluated
+        args = ['--func_name=ep1', '--d=1', '--seed=5', '--max_calls=6000',
+                '--checkpoint_every=2', '--resume'] + args
+        while True:
+            generations = [0]
+
+            def out_of_time(start):
+                generations[0] += 1
+                return generations[0] == stop_every
+
+            nsga2.out_of_time = out_of_time
+            nsga2.main(args, exe=os.path.join(directory, 'nsga2.py'))
+            if stop_every is None or generations[0] < stop_every:
+                break
+        with open(nsga2.log_path('stats', 'ep1', 1, 5), 'rb') as f:
+            return f.read()
+
+    def test_resume(self):
+        for engine in ('deap', 'array'):
+            for cache_size in (0, 5000):
+                args = ['--engine=%s' % engine, '--cache_size=%d' % cache_size]
+                name = '%s_%d' % (engine, cache_size)
+                expected = self.run_stats(name, args)
+                resumed = self.run_stats(name + '_resumed', args, 5)
+                self.assertEqual(resumed, expected)
+                if cache_size:
+                    self.assertGreater(nsga2.problem.hits, 0)
+
+    def test_parameters(self):
+        # A checkpoint saved by another run is refused, the logs and the
+        # checkpoint are left as they are
+        directory = os.path.join(self.directory, 'parameters')
+        os.makedirs(os.path.join(directory, 'log'))
+        exe = os.path.join(directory, 'nsga2.py')
+        args = ['--func_name=zdt1', '--d=1', '--seed=1', '--max_calls=2000',
+                '--checkpoint_every=2', '--resume']
+        generations = [0]
+
+        def out_of_time(start):
+            generations[0] += 1
+            return generations[0] == 3
+
+        nsga2.out_of_time = out_of_time
+        nsga2.main(args, exe=exe)
+        nsga2.out_of_time = self.out_of_time
+        paths = [nsga2.log_path('stats', 'zdt1', 1, 1),
+                 nsga2.log_path('checkpoint', 'zdt1', 1, 1, 'pkl')]
+        saved = [open(path, 'rb').read() for path in paths]
+        for other in (['--engine=array'], ['--mu=8'], ['--selection=sms_emoa'],
+                      ['--dimension=10']):
+            self.assertRaises(ValueError, nsga2.main, args + other, exe=exe)
+            self.assertEqual([open(path, 'rb').read() for path in paths], saved)
+        nsga2.main(args, exe=exe)
+        self.assertGreater(nsga2.problem.evals, 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
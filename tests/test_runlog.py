@@ -0,0 +1,97 @@
+"""The logs of runlog.py written, resumed and exported."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runlog import TextLog, NpyLog, export_text
+
+
+def random_records(rng, size, columns):
+    records = rng.uniform(0., 1., (size, columns))
+    records[:, 0] = numpy.arange(1, size + 1) * 100
+    return records.tolist()
+
+
+class RunLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def paths(self, name, ext):
+        return (os.path.join(self.directory, 'stats_%s.%s' % (name, ext)),
+                os.path.join(self.directory, 'front_%s.%s' % (name, ext)))
+
+    def test_npy(self):
+        rng = numpy.random.RandomState(0)
+        for columns in (3, 5):
+            records = random_records(rng, 50, columns)
+            stats_path, front_path = self.paths('npy_%d' % columns, 'npy')
+            log = NpyLog(stats_path, front_path, columns=columns, buffer_size=7)
+            for i, record in enumerate(records[:30]):
+                log.write_stats(*record)
+                # The file holds every batch written so far
+                self.assertEqual(numpy.load(stats_path).tolist(),
+                                 records[:(i + 1) // 7 * 7])
+            self.assertEqual(log.tell(), 30)
+            log.close()
+            self.assertEqual(numpy.load(stats_path).tolist(), records[:30])
+
+            # Resumed at the 20th record, the next ones replace the last 10
+            log = NpyLog(stats_path, front_path, 20, columns=columns, buffer_size=7)
+            self.assertEqual(numpy.load(stats_path).tolist(), records[:20])
+            for record in records[20:]:
+                log.write_stats(*record)
+            front = rng.uniform(0., 1., (40, 2))
+            log.write_front([tuple(p) for p in front.tolist()])
+            log.close()
+            self.assertEqual(numpy.load(stats_path).tolist(), records)
+            numpy.testing.assert_array_equal(numpy.load(front_path), front)
+
+    def test_text(self):
+        rng = numpy.random.RandomState(1)
+        records = random_records(rng, 40, 4)
+        stats_path, front_path = self.paths('text', 'txt')
+        log = TextLog(stats_path, front_path, columns=4)
+        for record in records[:25]:
+            log.write_stats(*record)
+        log.close()
+        with open(stats_path) as f:
+            position = len(''.join(f.readlines()[:15]))
+        log = TextLog(stats_path, front_path, position, columns=4)
+        for record in records[15:]:
+            log.write_stats(*record)
+        log.close()
+        with open(stats_path) as f:
+            lines = f.readlines()
+        self.assertEqual(lines, ['%d %f %f %f\n' % tuple(record) for record in records])
+
+    def test_export_text(self):
+        # The text export of the .npy files are the files of TextLog
+        rng = numpy.random.RandomState(2)
+        records = random_records(rng, 30, 4)
+        front = [tuple(p) for p in rng.uniform(0., 1., (20, 3)).tolist()]
+        logs = (NpyLog(*self.paths('run', 'npy'), columns=4, buffer_size=8),
+                TextLog(*self.paths('text', 'txt'), columns=4))
+        for log in logs:
+            for record in records:
+                log.write_stats(*record)
+            log.write_front(front)
+            log.close()
+        written = export_text(*self.paths('run', 'npy'))
+        self.assertEqual(written, list(self.paths('run', 'txt')))
+        for path, expected in zip(written, self.paths('text', 'txt')):
+            with open(path) as f, open(expected) as g:
+                self.assertEqual(f.read(), g.read())
+        self.assertEqual(export_text(self.paths('run', 'npy')[0]), written[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
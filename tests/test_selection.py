@@ -0,0 +1,162 @@
+"""The selections of selection.py against their definitions on every pair of
+rows."""
+import array
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy
+from deap import base, creator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _hypervolume
+import nsga2
+from selection import (sort_nondominated, crowding_distance, _truncate_by_contribution,
+                       sel_sms_emoa, select_sms_emoa)
+
+if not hasattr(creator, "FitnessSelection"):
+    creator.create("FitnessSelection", base.Fitness, weights=(-1.0, -1.0, -1.0))
+    creator.create("IndividualSelection", array.array, typecode='d',
+                   fitness=creator.FitnessSelection)
+
+
+def naive_ranks(objectives):
+    n = len(objectives)
+    dominates = [[(objectives[i] <= objectives[j]).all() and
+                  (objectives[i] < objectives[j]).any() for j in range(n)]
+                 for i in range(n)]
+    ranks = [None] * n
+    rank = 0
+    while None in ranks:
+        front = [j for j in range(n) if ranks[j] is None and not any(
+            dominates[i][j] for i in range(n) if ranks[i] is None)]
+        for j in front:
+            ranks[j] = rank
+        rank += 1
+    return ranks
+
+
+def exact_contributions(points, ref):
+    # The hypervolume lost by removing every row
+    volume = lambda rows: _hypervolume._backends['c'].hypervolume(rows, ref) if len(rows) else 0.0
+    total = volume(points)
+    return numpy.array([total - volume(numpy.delete(points, i, 0)) for i in range(len(points))])
+
+
+def random_population(rng, size, m):
+    # Few values, so that there are several fronts, ties and copies
+    objectives = numpy.round(rng.rand(size, m), 1)
+    return numpy.vstack((objectives, objectives[:3]))
+
+
+class SortNondominatedTest(unittest.TestCase):
+    def test_ranks(self):
+        rng = numpy.random.RandomState(0)
+        for m in (2, 3, 4):
+            for trial in range(30):
+                objectives = numpy.round(rng.rand(rng.randint(1, 60), m), trial % 3)
+                objectives = numpy.vstack((objectives, objectives[:5]))
+                ranks = [None] * len(objectives)
+                for rank, front in enumerate(sort_nondominated(objectives)):
+                    for i in front:
+                        ranks[i] = rank
+                self.assertEqual(ranks, naive_ranks(objectives))
+
+
+class SmsEmoaTest(unittest.TestCase):
+    def test_truncate(self):
+        # Every row removed has the least contribution of the rows left
+        rng = numpy.random.RandomState(1)
+        for m in (2, 3, 4):
+            for _ in range(10):
+                points = rng.rand(rng.randint(2, 25), m)
+                ref = points.max(axis=0) + 1.0
+                keep = numpy.arange(len(points))
+                for k in range(len(points) - 1, 0, -1):
+                    kept = _truncate_by_contribution(points, k)
+                    self.assertEqual(len(kept), k)
+                    self.assertTrue(set(kept.tolist()) <= set(keep.tolist()))
+                    removed = keep.tolist().index(
+                        (set(keep.tolist()) - set(kept.tolist())).pop())
+                    contributions = exact_contributions(points[keep], ref)
+                    self.assertLessEqual(contributions[removed], contributions.min() + 1e-12)
+                    keep = kept
+                self.assertEqual(_truncate_by_contribution(points, len(points)).tolist(),
+                                 list(range(len(points))))
+
+    def test_select(self):
+        rng = numpy.random.RandomState(2)
+        for m in (2, 3):
+            for trial in range(20):
+                objectives = random_population(rng, rng.randint(5, 40), m)
+                k = rng.randint(1, len(objectives) + 1)
+                ref = [2.0] * m if trial % 2 else None
+                chosen, distances = select_sms_emoa(objectives, k, ref)
+                self.assertEqual(len(chosen), k)
+                self.assertEqual(len(set(chosen.tolist())), k)
+                size = 0
+                for front in sort_nondominated(objectives):
+                    if size + len(front) > k:
+                        # The last front is truncated by contribution
+                        kept = _truncate_by_contribution(objectives[front], k - size, ref)
+                        front = [front[i] for i in kept]
+                        self.assertEqual(chosen[size:].tolist(), front)
+                        break
+                    self.assertEqual(chosen[size:size + len(front)].tolist(), front)
+                    numpy.testing.assert_array_equal(distances[size:size + len(front)],
+                                                     crowding_distance(objectives[front]))
+                    size += len(front)
+                    if size == k:
+                        break
+
+    def test_individuals(self):
+        # sel_sms_emoa selects the individuals of the rows of select_sms_emoa
+        rng = numpy.random.RandomState(3)
+        for trial in range(20):
+            objectives = random_population(rng, rng.randint(5, 40), 3)
+            individuals = []
+            for values in objectives.tolist():
+                ind = creator.IndividualSelection(values)
+                ind.fitness.values = values
+                individuals.append(ind)
+            k = rng.randint(1, len(objectives) + 1)
+            chosen, distances = select_sms_emoa(objectives, k)
+            selected = sel_sms_emoa(individuals, k)
+            index = dict((id(ind), i) for i, ind in enumerate(individuals))
+            self.assertEqual([index[id(ind)] for ind in selected], chosen.tolist())
+            self.assertEqual([ind.fitness.crowding_dist for ind in selected],
+                             distances.tolist())
+        self.assertEqual(sel_sms_emoa([], 4), [])
+
+
+class SmsEmoaRunTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_runs(self):
+        for func_name, engine in (('zdt1', 'deap'), ('zdt1', 'array'), ('dtlz2', 'array')):
+            population, logbook = nsga2.main(
+                ['--func_name=%s' % func_name, '--d=1', '--seed=1', '--max_calls=2000',
+                 '--selection=sms_emoa', '--engine=%s' % engine],
+                exe=os.path.join(self.directory, 'nsga2.py'))
+            if engine == 'array':
+                genes, values = population
+                numpy.testing.assert_array_equal(values, nsga2.problem.evaluate(genes))
+            else:
+                values = numpy.array([ind.fitness.values for ind in population])
+            self.assertEqual(len(values), 20)
+            self.assertGreater(len(logbook), 50)
+            # The archive weakly dominates the final population
+            front = numpy.asarray(nsga2.problem.pareto_front)
+            self.assertTrue(all(((front <= v).all(axis=1)).any() for v in values))
+
+
+if __name__ == '__main__':
+    unittest.main()
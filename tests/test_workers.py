@@ -0,0 +1,48 @@
+"""The pool of workers is stopped when a run raises."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nsga2
+
+
+class WorkersTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'log'))
+        self.log_generation = nsga2.log_generation
+        self.stop_workers = nsga2.stop_workers
+
+    def tearDown(self):
+        nsga2.log_generation = self.log_generation
+        nsga2.stop_workers = self.stop_workers
+        shutil.rmtree(self.directory)
+
+    def test_raise(self):
+        for engine in ('deap', 'array'):
+            stopped = []
+
+            def log_generation(log, tracker):
+                raise KeyboardInterrupt
+
+            def stop_workers(pool):
+                stopped.append(pool)
+                self.stop_workers(pool)
+
+            nsga2.log_generation = log_generation
+            nsga2.stop_workers = stop_workers
+            self.assertRaises(KeyboardInterrupt, nsga2.main,
+                              ['--func_name=zdt1', '--d=1', '--seed=1', '--max_calls=2000',
+                               '--workers=2', '--engine=%s' % engine],
+                              exe=os.path.join(self.directory, 'nsga2.py'))
+            self.assertEqual(len(stopped), 1)
+            self.assertIsNotNone(stopped[0])
+            self.assertIs(nsga2.toolbox.map.func, map)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 """
 from math import hypot, sqrt
 from functools import wraps
+from bisect import bisect_left, bisect_right, insort
 from itertools import repeat
 import sys
 import os
@@ -12,12 +13,7 @@ try:
 except ImportError:
     numpy = False
 
-try:
-    # try importing the C version
-    from _hypervolume import hv
-except ImportError:
-    # fallback on python version
-    from _hypervolume import pyhv as hv
+import _hypervolume as hv
 
 class translate(object):
     """Decorator for evaluation functions, it translates the objective
@@ -250,47 +246,152 @@ class bound(object):
         elif type == "clip":
             self.bound = self._clip
 
+def _objective_values(front):
+    """Return the ``(n, m)`` array of the objective values of a *front*
+    given either as individuals with a fitness or as objective vectors."""
+    front = list(front) if not hasattr(front, "shape") else front
+    if len(front) and hasattr(front[0], "fitness"):
+        front = [ind.fitness.values for ind in front]
+    return numpy.asarray(front, dtype=numpy.float64)
+
 def diversity(first_front, first, last):
     """Given a Pareto front `first_front` and the two extreme points of the
     optimal Pareto front, this function returns a metric of the diversity
     of the front as explained in the original NSGA-II article by K. Deb.
     The smaller the value is, the better the front is.
+
+    The front may be given as individuals or as an ``(n, 2)`` array of
+    objective values, sorted along the front.
     """
-    df = hypot(first_front[0].fitness.values[0] - first[0],
-               first_front[0].fitness.values[1] - first[1])
-    dl = hypot(first_front[-1].fitness.values[0] - last[0],
-               first_front[-1].fitness.values[1] - last[1])
-    dt = [hypot(first.fitness.values[0] - second.fitness.values[0],
-                first.fitness.values[1] - second.fitness.values[1])
-          for first, second in zip(first_front[:-1], first_front[1:])]
-
-    if len(first_front) == 1:
+    values = _objective_values(first_front)
+    df = hypot(values[0, 0] - first[0], values[0, 1] - first[1])
+    dl = hypot(values[-1, 0] - last[0], values[-1, 1] - last[1])
+    dt = numpy.hypot(values[1:, 0] - values[:-1, 0],
+                     values[1:, 1] - values[:-1, 1])
+
+    if len(values) == 1:
         return df + dl
 
-    dm = sum(dt)/len(dt)
-    di = sum(abs(d_i - dm) for d_i in dt)
+    dm = dt.sum()/len(dt)
+    di = numpy.abs(dt - dm).sum()
     delta = (df + dl + di)/(df + dl + len(dt) * dm )
-    return delta
+    return float(delta)
 
 def convergence(first_front, optimal_front):
     """Given a Pareto front `first_front` and the optimal Pareto front,
     this function returns a metric of convergence
     of the front as explained in the original NSGA-II article by K. Deb.
     The smaller the value is, the closer the front is to the optimal one.
+
+    The front may be given as individuals or as an array of objective
+    values, the optimal front as an array of objective values. The
+    distances to the optimal front are computed in bulk by
+    :func:`_nearest_distances`.
+    """
+    values = _objective_values(first_front)
+    if len(values) == 0:
+        raise ZeroDivisionError('The front is empty')
+    optimal = numpy.asarray(optimal_front, dtype=numpy.float64)
+    distances = _nearest_distances(values, optimal)
+    return float(distances.sum()) / len(distances)
+
+def _front_and_reference(front, optimal_front):
+    values = _objective_values(front)
+    if len(values) == 0:
+        raise ZeroDivisionError('The front is empty')
+    return values, numpy.asarray(optimal_front, dtype=numpy.float64)
+
+def _nearest_by(points, targets, distance, block_size=2**20):
+    # Smallest distance from every row of points to the rows of targets,
+    # where distance maps the differences targets - points along the last
+    # axis to their distances. The distance has to be non-decreasing in
+    # every difference and not lower than the largest one, as the IGD+ and
+    # the additive epsilon distances.
+    if points.shape[1] != 2:
+        # Blocks of r points against all the targets, r chosen so that a
+        # block holds about block_size differences
+        rows = max(1, block_size // max(targets.size, 1))
+        result = numpy.empty(len(points))
+        for start in range(0, len(points), rows):
+            diff = targets[None, :, :] - points[start:start + rows, None, :]
+            result[start:start + rows] = distance(diff).min(axis=1)
+        return result
+
+    # A dominated target is never nearer than the target dominating it, the
+    # others sorted by the first objective have a decreasing second one
+    targets = targets[numpy.lexsort(targets.T[::-1])]
+    keep = numpy.ones(len(targets), dtype=bool)
+    keep[1:] = targets[1:, 1] < numpy.minimum.accumulate(targets[:, 1])[:-1]
+    targets = targets[keep]
+    size = len(targets)
+    values = lambda rows, cols: distance(targets[cols] - points[rows])
+
+    # The targets next to a point along the front bound its distance, the
+    # nearer ones are below the point plus the bound in both objectives:
+    # a window of the sorted targets
+    n = len(points)
+    position = numpy.searchsorted(targets[:, 0], points[:, 0])
+    rows = numpy.repeat(numpy.arange(n), 3)
+    cols = numpy.clip((position[:, None] + numpy.arange(-1, 2)).ravel(), 0, size - 1)
+    bound = values(rows, cols).reshape(n, 3).min(axis=1)
+    limit = bound + numpy.abs(bound) * 1e-9
+    lo = numpy.searchsorted(-targets[:, 1], -(points[:, 1] + limit), 'left')
+    hi = numpy.searchsorted(targets[:, 0], points[:, 0] + limit, 'right')
+    return numpy.minimum(bound, _windows_minimum(lo, hi, size, values, block_size))
+
+def gd(front, optimal_front):
+    """Return the generational distance of a *front* to the *optimal_front*
+    as defined by Van Veldhuizen: the square root of the sum of the squared
+    distances of its points to the optimal front, divided by their number.
+    :func:`convergence` is the mean of the same distances. The smaller the
+    value is, the closer the front is to the optimal one.
+
+    The front may be given as individuals or as an array of objective
+    values, the optimal front as an array of objective values.
     """
-    distances = []
+    values, optimal = _front_and_reference(front, optimal_front)
+    distances = _nearest_distances(values, optimal)
+    return sqrt(float((distances ** 2).sum())) / len(distances)
+
+def igd(front, optimal_front):
+    """Return the inverted generational distance of a *front*: the mean
+    distance of the points of the *optimal_front* to the nearest point of
+    the front. It measures both the convergence and the spread of the
+    front, the smaller the better.
+
+    The distances are computed in bulk by :func:`_nearest_distances`, so a
+    reference front of many thousands of points can be used every
+    generation.
+    """
+    values, optimal = _front_and_reference(front, optimal_front)
+    return float(_nearest_distances(optimal, values).mean())
+
+def igd_plus(front, optimal_front):
+    """Return the IGD+ indicator of a *front* (Ishibuchi et al., 2015),
+    weakly Pareto compliant: as :func:`igd` with the distance from a
+    reference point z to a point a of the front being the norm of
+    ``max(a - z, 0)``, i.e. only the objectives where a is worse than z
+    count. Minimization is assumed, the smaller the better.
+
+    With two objectives every reference point is only compared with the
+    points of the front in a window along it, otherwise the distances are
+    computed by blocks of reference points against the whole front, with
+    bounded memory.
+    """
+    values, optimal = _front_and_reference(front, optimal_front)
+    distance = lambda diff: numpy.sqrt((numpy.maximum(diff, 0) ** 2).sum(axis=-1))
+    return float(_nearest_by(optimal, values, distance).mean())
 
-    for ind in first_front:
-        distances.append(float("inf"))
-        for opt_ind in optimal_front:
-            dist = 0.
-            for i in xrange(len(opt_ind)):
-                dist += (ind.fitness.values[i] - opt_ind[i])**2
-            if dist < distances[-1]:
-                distances[-1] = dist
-        distances[-1] = sqrt(distances[-1])
+def epsilon_additive(front, optimal_front):
+    """Return the additive epsilon indicator of a *front* (Zitzler et al.,
+    2003): the smallest value to subtract from every objective of its
+    points for the front to weakly dominate every point of the
+    *optimal_front*. Minimization is assumed, the smaller the better.
 
-    return sum(distances) / len(distances)
+    The values are computed as the distances of :func:`igd_plus`.
+    """
+    values, optimal = _front_and_reference(front, optimal_front)
+    return float(_nearest_by(optimal, values, lambda diff: diff.max(axis=-1)).max())
 
 
 def hypervolume(front, ref=None):
@@ -307,32 +408,316 @@ def hypervolume(front, ref=None):
         ref = numpy.max(wobj, axis=0) + 1
     return hv.hypervolume(wobj, ref)
 
+def _morton_keys(points, low, high, bits):
+    # Z-order keys of the points quantized on a grid of 2**bits cells per
+    # objective between low and high
+    scale = (2**bits - 1) / numpy.where(high > low, high - low, 1.0)
+    cells = numpy.clip((points - low) * scale, 0, 2**bits - 1).astype(numpy.uint64)
+    keys = numpy.zeros(len(points), dtype=numpy.uint64)
+    for bit in range(bits - 1, -1, -1):
+        for i in range(points.shape[1]):
+            keys = (keys << numpy.uint64(1)) | ((cells[:, i] >> numpy.uint64(bit)) & numpy.uint64(1))
+    return keys
+
+def _nearest_distances(points, targets=None, block_size=2**20):
+    """Return the Euclidean distance from every row of the array *points* to
+    the nearest row of the array *targets*, or to the nearest other row of
+    *points* when *targets* is not given, in which case the rows have to be
+    distinct and the distance is infinite for a single row.
+
+    An upper bound of the distance of every point is first given by the
+    targets next to it in Z-order and in the order of the objective of
+    largest range. Only the targets closer than this bound along that
+    objective are then compared with the point, by batches of at most about
+    *block_size* pairs, so that the cost is far below the n * n pairs of the
+    distance matrix for points spread over a front.
+    """
+    self_distances = targets is None
+    if self_distances:
+        targets = points
+    n, m = points.shape
+    distances = numpy.empty(n)
+    distances.fill(float('inf'))
+    if n == 0 or len(targets) == 0:
+        return distances
+
+    low, high = targets.min(axis=0), targets.max(axis=0)
+    axis = numpy.argmax(high - low)
+    order = numpy.argsort(targets[:, axis], kind='mergesort')
+    targets = targets[order]
+    keys = targets[:, axis]
+    if self_distances:
+        # Index of every point in the targets, to exclude it
+        index = numpy.empty(n, dtype=numpy.intp)
+        index[order] = numpy.arange(n)
+
+    def squared_distances(rows, cols):
+        squared = numpy.zeros(len(rows))
+        for i in range(m):
+            diff = points[rows, i] - targets[cols, i]
+            squared += diff * diff
+        if self_distances:
+            squared[cols == index[rows]] = float('inf')
+        return squared
+
+    def neighbours_bound(sorted_cols, position):
+        # Smallest distance to the two targets on each side of the points
+        # in a sorted order of the targets
+        offsets = numpy.arange(-2, 3)
+        rows = numpy.repeat(numpy.arange(n), len(offsets))
+        cols = sorted_cols[numpy.clip((position[:, None] + offsets).ravel(),
+                                      0, len(targets) - 1)]
+        return squared_distances(rows, cols).reshape(n, -1).min(axis=1)
+
+    identity = numpy.arange(len(targets))
+    if self_distances:
+        position = index
+    else:
+        position = numpy.searchsorted(keys, points[:, axis])
+    bound = neighbours_bound(identity, position)
+
+    bits = min(16, 62 // m)
+    target_keys = _morton_keys(targets, low, high, bits)
+    z_order = numpy.argsort(target_keys, kind='mergesort')
+    if self_distances:
+        position = numpy.empty(n, dtype=numpy.intp)
+        position[z_order] = identity
+        position = position[index]
+    else:
+        point_keys = _morton_keys(points, low, high, bits)
+        position = numpy.searchsorted(target_keys[z_order], point_keys)
+    bound = numpy.minimum(bound, neighbours_bound(z_order, position))
+    bound = numpy.sqrt(bound) * (1 + 1e-9)
+
+    lo = numpy.searchsorted(keys, points[:, axis] - bound, 'left')
+    hi = numpy.searchsorted(keys, points[:, axis] + bound, 'right')
+    distances = _windows_minimum(lo, hi, len(targets), squared_distances, block_size)
+    return numpy.sqrt(distances)
+
+def _windows_minimum(lo, hi, size, values, block_size):
+    # Smallest values(rows, cols) of every row i over the columns lo[i] to
+    # hi[i] of its window, at least one of the size columns, computed by
+    # batches of at most about block_size pairs
+    n = len(lo)
+    result = numpy.empty(n)
+    counts = numpy.maximum(hi - lo, 1)
+    lo = numpy.minimum(lo, size - 1)
+    ends = numpy.cumsum(counts)
+    start = 0
+    while start < n:
+        done = ends[start - 1] if start else 0
+        stop = max(start + 1, numpy.searchsorted(ends, done + block_size, 'right'))
+        c = counts[start:stop]
+        first = numpy.cumsum(c) - c
+        rows = numpy.repeat(numpy.arange(start, stop), c)
+        cols = numpy.repeat(lo[start:stop] - first, c) + numpy.arange(c.sum())
+        result[start:stop] = numpy.minimum.reduceat(values(rows, cols), first)
+        start = stop
+    return result
+
 def uniformity(front):
     '''Return the uniformity of a *front*. Uniformity (UD) definition taken
     from Yu. Evtushenko article "Nonuniform covering method as applied to
     multicriteria" article.
 
+    The distance of every point to its nearest neighbour, identical points
+    excluded, is computed in bulk on the distinct points of the front.
+
     :param front: The Pareto front estimate consisting of non-dominated
-    solutions in objective space.
+    solutions in objective space, as a sequence of points or a ``(n, m)``
+    array.
     '''
-    min_dists = []
-    for ind in front:
-        p = ind
-        min_dist = float('inf')
-        for ind2  in front:
-            p2 = ind2
-            if p != p2:
-                dist = sqrt(sum([(e-e2)**2 for e, e2 in zip(p, p2)]))
-                if dist < min_dist:
-                    min_dist = dist
-        if min_dist == float('inf'):
-            raise ValueError('Distance cannot be infinite')
-        min_dists.append(min_dist)
-
-    avg_dist = sum(min_dists) / len(min_dists)
-
-    dist_squared_sum = 0
-    for dist in min_dists:
-        dist_squared_sum += (dist - avg_dist)**2
-
-    return sqrt(dist_squared_sum)
+    points = numpy.asarray(front, dtype=numpy.float64)
+    if len(points) == 0:
+        raise ZeroDivisionError('The front is empty')
+    distinct, inverse = numpy.unique(points, axis=0, return_inverse=True)
+    min_dists = _nearest_distances(distinct)[inverse.ravel()]
+    if numpy.isinf(min_dists).any():
+        raise ValueError('Distance cannot be infinite')
+
+    avg_dist = min_dists.sum() / len(min_dists)
+    return sqrt(((min_dists - avg_dist)**2).sum())
+
+
+class HypervolumeTracker(object):
+    """Hypervolume of a set of objective vectors updated from the vectors
+    inserted into and removed from it, instead of being recomputed on the
+    whole set. Minimization is implicitly assumed and *ref* is the reference
+    point; the vectors which are not strictly better than it in every
+    objective are ignored.
+
+    The changes are applied when :attr:`volume` is read, a vector inserted
+    and removed in between being skipped. Each one adds or subtracts the
+    exclusive contribution of the vector to the others:
+
+    * with two objectives, from the staircase of the non-dominated vectors
+      sorted by the first objective, in O(log n) plus the vectors it
+      dominates or uncovers;
+    * with three objectives, with :func:`~_hypervolume.contribution` in
+      O(n) and a hypervolume computation on the few vectors next to it;
+    * with more objectives, the hypervolume of the whole set is computed
+      again by ``fpli_hv`` once the changes are applied.
+
+    The hypervolume is computed exactly on the whole set every *resync*
+    changes, which bounds the rounding errors accumulated by the updates.
+    The tracker observes an archive of :mod:`archive` with :meth:`watch`::
+
+        tracker = HypervolumeTracker(nadir)
+        tracker.watch(problem.pareto_front)
+        for gen in range(ngen):
+            ...
+            hv = tracker.volume
+
+    :param ref: The reference point, it has to be of the same
+                dimensionality as the points.
+    """
+    def __init__(self, ref, resync=1000):
+        self.ref = [float(r) for r in ref]
+        self.dim = len(self.ref)
+        self.resync = resync
+        self._volume = 0.0
+        # Changes not applied yet, as (1 or -1, vector)
+        self._pending = []
+        # Changes applied since the last exact computation
+        self._applied = 0
+        # Two objectives: every vector and the non-dominated ones, sorted
+        self._all = []
+        self._front = []
+        # More objectives: every vector as a row, rows of every vector
+        self._data = None
+        self._size = 0
+        self._rows = {}
+
+    def watch(self, archive):
+        """Insert the vectors of *archive* and follow its changes."""
+        for vals in archive:
+            self.insert(vals)
+        archive.observers.append(self)
+
+    def insert(self, vals):
+        """Add the objective vector *vals*."""
+        self._pending.append((1, vals))
+
+    def remove(self, vals):
+        """Remove the objective vector *vals*, which was added before."""
+        self._pending.append((-1, vals))
+
+    @property
+    def volume(self):
+        """The hypervolume of the vectors, once the changes are applied."""
+        if self._pending:
+            self._apply()
+        return self._volume
+
+    def _apply(self):
+        ref = self.ref
+        net = {}
+        changes = []
+        for sign, vals in self._pending:
+            key = tuple(float(v) for v in vals)
+            if all(v < r for v, r in zip(key, ref)):
+                if key not in net:
+                    changes.append(key)
+                net[key] = net.get(key, 0) + sign
+        self._pending = []
+        # The insertions first, so that most removed vectors are dominated
+        if self.dim == 2:
+            insert, remove = self._insert_2d, self._remove_2d
+        else:
+            insert, remove = self._insert_rows, self._remove_rows
+        applied = 0
+        for key in changes:
+            for _ in range(net[key]):
+                self._volume += insert(key)
+                applied += 1
+        for key in changes:
+            for _ in range(-net[key]):
+                self._volume -= remove(key)
+                applied += 1
+        self._applied += applied
+        if (applied and self.dim > 3) or self._applied >= self.resync:
+            self._resync()
+
+    def _resync(self):
+        if self.dim == 2:
+            points = self._front
+        else:
+            points = self._data[:self._size] if self._size else []
+        self._volume = hv.hypervolume(points, self.ref) if len(points) else 0.0
+        self._applied = 0
+
+    def _insert_2d(self, p):
+        a, b = p
+        insort(self._all, p)
+        front = self._front
+        i = bisect_right(front, (a, float('inf')))
+        if i and front[i - 1][1] <= b:
+            return 0.0
+        # The vectors of the front dominated by p follow it
+        k = bisect_left(front, (a, -float('inf')))
+        j = k
+        while j < len(front) and front[j][1] >= b:
+            j += 1
+        end = front[j][0] if j < len(front) else self.ref[0]
+        x, height = a, front[k - 1][1] if k else self.ref[1]
+        area = 0.0
+        for q in front[k:j]:
+            area += (q[0] - x) * (height - b)
+            x, height = q
+        area += (end - x) * (height - b)
+        front[k:j] = [p]
+        return area
+
+    def _remove_2d(self, p):
+        a, b = p
+        points = self._all
+        i = bisect_left(points, p)
+        del points[i]
+        front = self._front
+        k = bisect_left(front, p)
+        if i < len(points) and points[i] == p or k == len(front) or front[k] != p:
+            return 0.0
+        # The vectors uncovered lie between p and the next vector of the front
+        top = front[k - 1][1] if k else self.ref[1]
+        end = front[k + 1][0] if k + 1 < len(front) else self.ref[0]
+        uncovered = []
+        for q in points[i:bisect_left(points, (end, -float('inf')))]:
+            if q[1] < (uncovered[-1][1] if uncovered else top):
+                uncovered.append(q)
+        x, height = a, top
+        area = 0.0
+        for q in uncovered:
+            area += (q[0] - x) * (height - b)
+            x, height = q
+        area += (end - x) * (height - b)
+        front[k:k + 1] = uncovered
+        return area
+
+    def _insert_rows(self, p):
+        n = self._size
+        if self._data is None:
+            self._data = numpy.empty((16, self.dim))
+        elif n == len(self._data):
+            self._data = numpy.resize(self._data, (2 * n, self.dim))
+        self._data[n] = p
+        self._rows.setdefault(p, []).append(n)
+        self._size = n + 1
+        if self.dim == 3:
+            return hv.contribution(p, self._data[:n], self.ref)
+        return 0.0
+
+    def _remove_rows(self, p):
+        rows = self._rows[p]
+        row = rows.pop()
+        if not rows:
+            del self._rows[p]
+        last = self._size - 1
+        if row != last:
+            moved = tuple(self._data[last].tolist())
+            self._data[row] = self._data[last]
+            moved_rows = self._rows[moved]
+            moved_rows[moved_rows.index(last)] = row
+        self._size = last
+        if self.dim == 3:
+            return hv.contribution(p, self._data[:last], self.ref)
+        return 0.0